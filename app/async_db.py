@@ -0,0 +1,74 @@
+"""
+Async engine and sessions for the FastAPI backend (app/backend.py).
+
+Same database as app.db, reached through an async driver: aiosqlite for
+SQLite, asyncpg for Postgres. ASYNC_DATABASE_URL overrides the URL derived
+from DATABASE_URL. Imported only by the backend and app/crud/async_*, so the
+Streamlit pages do not need the async drivers installed.
+
+The SQLite PRAGMA profile and pool options from app.db apply here too. The
+async pool is SQLAlchemy's own AsyncAdaptedQueuePool: TimedQueuePool blocks
+on a thread queue and cannot be used under asyncio.
+
+When both URLs name the same database, the async engine shares app.db's
+result cache and search indexes (app.db.share_caches), so the Streamlit
+pages' writes invalidate what the backend serves and each index is held once.
+"""
+import os
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db import (
+    DATABASE_URL, _is_memory_sqlite, apply_sqlite_pragmas, engine, pool_options_from_env, share_caches,
+    sqlite_pragmas_from_env,
+)
+from app.query_metrics import instrument_engine
+
+# sync driver name -> async driver name
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Swap url's driver for its async counterpart; async URLs pass through."""
+    url = make_url(url)
+    if url.get_dialect().is_async:
+        return url.render_as_string(hide_password=False)
+    if url.drivername not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver known for '{url.drivername}'. Set ASYNC_DATABASE_URL.")
+    return url.set(drivername=ASYNC_DRIVERS[url.drivername]).render_as_string(hide_password=False)
+
+
+def build_async_engine(url: str, sqlite_pragmas: dict | None = None, pool_options: dict | None = None,
+                       sync_engine=None):
+    """
+    Create an AsyncEngine for url with the same PRAGMA profile and pool sizing as build_engine.
+
+    sync_engine, a sync engine on the same database, is where the async
+    sessions' caches and indexes are kept; it also serves the reads that
+    app/crud/async_listings.py moves off the event loop.
+    """
+    kwargs = {}
+    if pool_options and not _is_memory_sqlite(url):
+        kwargs.update(pool_options)
+    async_engine = create_async_engine(url, **kwargs)
+    # connect and cursor events live on the sync engine the async one wraps
+    apply_sqlite_pragmas(async_engine.sync_engine, sqlite_pragmas)
+    instrument_engine(async_engine.sync_engine)
+    if sync_engine is not None:
+        share_caches(async_engine.sync_engine, sync_engine)
+    return async_engine
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(DATABASE_URL)
+
+# Each in-memory SQLite engine is its own database, so there is nothing to share
+_same_database = ASYNC_DATABASE_URL == to_async_url(DATABASE_URL) and not _is_memory_sqlite(DATABASE_URL)
+async_engine = build_async_engine(ASYNC_DATABASE_URL, sqlite_pragmas_from_env(), pool_options_from_env(),
+                                  sync_engine=engine if _same_database else None)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession,
+                                       autoflush=False, expire_on_commit=False)
@@ -0,0 +1,229 @@
+"""
+In-memory prefix index for search-box autocomplete.
+
+Distinct listing-title words are kept in a sorted array, so every word
+starting with a prefix sits in one contiguous slice found with two bisects.
+Each word carries the number of listings whose title contains it, and
+suggestions are the most frequent words in that slice. Category names are
+suggested the same way, weighted by how many listings they hold.
+
+Results for one- and two-letter prefixes (the widest slices) are memoized
+and patched in place as word counts change. Like app/fuzzy_index.py, one index is loaded per engine
+on first use (app/index_registry.py) and session hooks then apply committed
+Listing writes to it incrementally.
+"""
+import heapq
+import threading
+from bisect import bisect_left, insort
+from typing import NamedTuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.fuzzy_index import tokenize
+from app.index_registry import IndexRegistry
+from app.models.listing import Listing
+
+DEFAULT_SUGGESTIONS = 8
+MAX_SUGGESTIONS = 20
+# Prefixes this short match the most words; their top-k is memoized
+MEMO_PREFIX_LENGTH = 2
+
+_PENDING_KEY = "autocomplete_pending"
+
+
+class Suggestion(NamedTuple):
+    text: str
+    count: int
+    kind: str  # "word" or "category"
+
+
+class AutocompleteIndex:
+    """Sorted word array with per-word listing counts."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._words = []          # sorted distinct words
+        self._counts = {}         # word -> number of listings using it
+        self._categories = {}     # category -> number of listings
+        self._listings = {}       # listing id -> (words, category)
+        self._memo = {}           # short prefix -> top MAX_SUGGESTIONS words
+
+    def __len__(self):
+        return len(self._listings)
+
+    def load(self, rows):
+        """Replace the contents with (id, title, category) rows."""
+        with self._lock:
+            self._counts.clear()
+            self._categories.clear()
+            self._listings.clear()
+            self._memo.clear()
+            for listing_id, title, category in rows:
+                words = frozenset(tokenize(title))
+                self._listings[listing_id] = (words, category)
+                for word in words:
+                    self._counts[word] = self._counts.get(word, 0) + 1
+                if category:
+                    self._categories[category] = self._categories.get(category, 0) + 1
+            self._words = sorted(self._counts)
+
+    def upsert(self, listing_id, title, category):
+        with self._lock:
+            old_words, old_category = self._listings.get(listing_id, (frozenset(), None))
+            words = frozenset(tokenize(title))
+            self._listings[listing_id] = (words, category)
+            for word in old_words - words:
+                self._add_word(word, -1)
+            for word in words - old_words:
+                self._add_word(word, 1)
+            if category != old_category:
+                self._add_category(old_category, -1)
+                self._add_category(category, 1)
+
+    def remove(self, listing_id):
+        with self._lock:
+            entry = self._listings.pop(listing_id, None)
+            if entry is None:
+                return
+            words, category = entry
+            for word in words:
+                self._add_word(word, -1)
+            self._add_category(category, -1)
+
+    def _add_category(self, category, delta):
+        if not category:
+            return
+        n = self._categories.get(category, 0) + delta
+        if n > 0:
+            self._categories[category] = n
+        else:
+            self._categories.pop(category, None)
+
+    def _add_word(self, word, delta):
+        n = self._counts.get(word, 0) + delta
+        if n > 0:
+            if n == delta:
+                insort(self._words, word)
+            self._counts[word] = n
+        else:
+            del self._counts[word]
+            del self._words[bisect_left(self._words, word)]
+        # Patch memoized top lists instead of recomputing them on every write
+        for prefix in {word[:i] for i in range(1, MEMO_PREFIX_LENGTH + 1)}:
+            top = self._memo.get(prefix)
+            if top is None:
+                continue
+            rest = [(w, c) for w, c in top if w != word]
+            if delta < 0 and len(rest) < len(top) and len(top) == MAX_SUGGESTIONS:
+                # A listed word lost weight; an unlisted one may now outrank it
+                del self._memo[prefix]
+                continue
+            if n > 0:
+                rest.append((word, n))
+            rest.sort(key=lambda wc: (-wc[1], wc[0]))
+            self._memo[prefix] = rest[:MAX_SUGGESTIONS]
+
+    def _top_words(self, prefix: str, limit: int) -> list[tuple[str, int]]:
+        memoize = len(prefix) <= MEMO_PREFIX_LENGTH
+        if memoize and prefix in self._memo:
+            return self._memo[prefix][:limit]
+        lo = bisect_left(self._words, prefix)
+        hi = bisect_left(self._words, prefix + "\uffff", lo)
+        counts = self._counts
+        top = heapq.nsmallest(
+            MAX_SUGGESTIONS if memoize else limit,
+            ((-counts[w], w) for w in self._words[lo:hi]),
+        )
+        top = [(w, -neg) for neg, w in top]
+        if memoize:
+            self._memo[prefix] = top
+        return top[:limit]
+
+    def suggest(self, text: str, limit: int = DEFAULT_SUGGESTIONS) -> list[Suggestion]:
+        """
+        Complete the last word of text, most common first.
+
+        Earlier words are kept as typed ("graphing calc" -> "graphing
+        calculator"). Categories are only offered for single-word input.
+        """
+        if limit < 1 or limit > MAX_SUGGESTIONS:
+            raise ValueError(f"limit must be between 1 and {MAX_SUGGESTIONS}")
+        words = (text or "").lower().split()
+        if not words or text[-1].isspace():
+            return []
+        *lead, prefix = words
+        head = " ".join(lead + [""])
+
+        with self._lock:
+            found = [Suggestion(head + w, n, "word") for w, n in self._top_words(prefix, limit)]
+            if not lead:
+                found += [
+                    Suggestion(c, n, "category") for c, n in self._categories.items()
+                    if c.lower().startswith(prefix)
+                ]
+        found.sort(key=lambda s: (-s.count, s.text))
+        return found[:limit]
+
+
+def _load_index(db: Session) -> AutocompleteIndex:
+    index = AutocompleteIndex()
+    index.load(db.execute(select(Listing.id, Listing.title, Listing.category)))
+    return index
+
+
+def _apply_changes(index: AutocompleteIndex, changes):
+    for op, listing_id, title, category in changes:
+        if op == "remove":
+            index.remove(listing_id)
+        else:
+            index.upsert(listing_id, title, category)
+
+
+_registry = IndexRegistry(_load_index, _apply_changes)
+
+
+def get_autocomplete_index(db: Session) -> AutocompleteIndex:
+    """Return the index for the session's database, loading it on first use."""
+    return _registry.get(db)
+
+
+def reset_autocomplete_index(engine):
+    """Drop the cached index so the next lookup reloads it (after raw SQL writes)."""
+    _registry.reset(engine)
+
+
+def queue_listing_changes(session: Session, upserts=(), removals=()):
+    """
+    Queue index updates for listing writes that bypass the ORM flush (bulk
+    INSERT/DELETE statements). They are applied on commit, or dropped on
+    rollback, like the ORM changes below. upserts are (id, title, category) rows.
+    """
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    pending.extend(("upsert", listing_id, title, category) for listing_id, title, category in upserts)
+    pending.extend(("remove", listing_id, None, None) for listing_id in removals)
+
+
+# ---- keep loaded indexes in sync with committed ORM writes ----
+
+@event.listens_for(Session, "after_flush")
+def _collect_listing_changes(session, flush_context):
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    for obj in session.new | session.dirty:
+        if isinstance(obj, Listing):
+            pending.append(("upsert", obj.id, obj.title, obj.category))
+    for obj in session.deleted:
+        if isinstance(obj, Listing):
+            pending.append(("remove", obj.id, None, None))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_listing_changes(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        _registry.apply(session, pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_listing_changes(session):
+    session.info.pop(_PENDING_KEY, None)
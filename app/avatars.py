@@ -0,0 +1,108 @@
+"""
+Shared cache of small avatar images as data URIs.
+
+Listing cards show the owner's profile picture inline, which used to mean
+reading and base64-encoding the full upload for every card on every rerun
+(a seller with 30 listings: 30 reads per page view). Avatars are now shrunk
+once to a square the size of ``.owner-avatar`` and kept in a process-wide LRU
+bounded by total bytes.
+
+Entries are keyed on (path, mtime, file size, pixels), so replacing a
+profile picture produces a new key and the old entry simply ages out.
+"""
+import base64
+import io
+import os
+import threading
+from collections import OrderedDict
+
+from PIL import Image as PILImage, ImageOps
+
+# .owner-avatar is 40x40 CSS px; render at 2x so it stays sharp on HiDPI screens
+DEFAULT_AVATAR_PIXELS = 80
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024
+AVATAR_FORMAT = "WEBP"
+AVATAR_QUALITY = 85
+
+
+def render_avatar(path: str, pixels: int = DEFAULT_AVATAR_PIXELS) -> bytes:
+    """Center-crop the image at path to a pixels x pixels WebP (like object-fit: cover)."""
+    with PILImage.open(path) as img:
+        img.draft("RGB", (pixels * 2, pixels * 2))
+        img = ImageOps.exif_transpose(img)
+        img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+        img = ImageOps.fit(img, (pixels, pixels), PILImage.Resampling.LANCZOS)
+        out = io.BytesIO()
+        img.save(out, AVATAR_FORMAT, quality=AVATAR_QUALITY)
+    return out.getvalue()
+
+
+class AvatarCache:
+    """Thread-safe LRU of avatar data URIs, bounded by the bytes it holds."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, render=render_avatar):
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+        self.max_bytes = max_bytes
+        self._render = render
+        self._lock = threading.Lock()
+        # (path, mtime_ns, size, pixels) -> data URI, least recently used first
+        self._entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def data_uri(self, path: str | None, pixels: int = DEFAULT_AVATAR_PIXELS) -> str | None:
+        """Return a data URI for the avatar at path, or None if it is missing or unreadable."""
+        if not path:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, pixels)
+
+        with self._lock:
+            uri = self._entries.get(key)
+            if uri is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return uri
+            self.misses += 1
+
+        # Decode outside the lock so other sessions are not blocked
+        try:
+            data = self._render(path, pixels)
+        except (OSError, ValueError, PILImage.DecompressionBombError):
+            return None
+        uri = f"data:image/{AVATAR_FORMAT.lower()};base64,{base64.b64encode(data).decode()}"
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = uri
+                self.nbytes += len(uri)
+            self._entries.move_to_end(key)
+            while self.nbytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= len(evicted)
+        return uri
+
+
+_avatar_cache = AvatarCache()
+
+
+def get_avatar_cache() -> AvatarCache:
+    return _avatar_cache
+
+
+def avatar_data_uri(path: str | None, pixels: int = DEFAULT_AVATAR_PIXELS) -> str | None:
+    """Data URI of the shrunk avatar at path, served from the shared cache."""
+    return _avatar_cache.data_uri(path, pixels)
@@ -1,18 +1,381 @@
-from fastapi import FastAPI, Request, UploadFile, File
-from fastapi.responses import RedirectResponse, JSONResponse
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, UploadFile, File
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import RedirectResponse, JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
+from starlette.datastructures import MutableHeaders
 from starlette.exceptions import HTTPException as StarletteHTTPException
 import os
 
-app = FastAPI()
+from app.async_db import AsyncSessionLocal, async_engine
+from app.crud import async_favorites, async_listings, async_messages, async_reviews
+from app.crud.listings import DEFAULT_PAGE_SIZE, ForbiddenAction
+from app.crud.messages import MAX_MESSAGE_PAGE_SIZE, MESSAGE_PAGE_SIZE
+from app.db import engine
+from app.message_hub import hub
+from app.query_metrics import profile_request
+from app.schema import ensure_schema
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    ensure_schema(engine)
+    yield
+    await async_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+#====== Database Session ======#
+# One AsyncSession per request. Handlers await every query, so a single
+# uvicorn worker keeps serving other requests while one waits on the database.
+#==============================#
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Count and time each request's SQL; the totals are logged by app.query_metrics
+# and returned in X-SQL-* headers for quick checks from the client side.
+# Plain ASGI rather than @app.middleware("http"), which relays every chunk of
+# a streamed response through an extra task: that doubled the memory and
+# send cost of each open event stream.
+class ProfileSQLMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        with profile_request(f"{scope['method']} {scope['path']}") as profile:
+            async def send_with_sql_headers(message):
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers["X-SQL-Queries"] = str(profile.count)
+                    headers["X-SQL-Time-Ms"] = f"{profile.total * 1000.0:.3f}"
+                await send(message)
+
+            await self.app(scope, receive, send_with_sql_headers)
+
+
+app.add_middleware(ProfileSQLMiddleware)
+
+
+@app.exception_handler(ValueError)
+async def validation_error_handler(request: Request, exc: ValueError):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+
+@app.exception_handler(ForbiddenAction)
+async def forbidden_handler(request: Request, exc: ForbiddenAction):
+    return JSONResponse(status_code=403, content={"detail": str(exc)})
+
+
+#====== Request Bodies ======#
+# There is no auth layer on the API yet: callers pass user ids, as the
+# Streamlit pages do with their session state.
+#============================#
+
+class ListingIn(BaseModel):
+    user_id: int
+    title: str
+    description: str
+    price: float
+    condition: str = "Good"
+    category: str = "Other"
+    contact_email: str | None = None
+    contact_phone: str | None = None
+    image_urls: list[str] = []
+
+
+class MessageIn(BaseModel):
+    sender_id: int
+    receiver_id: int
+    content: str
+    listing_id: int | None = None
+
+
+class ReviewIn(BaseModel):
+    reviewer_id: int
+    reviewed_user_id: int
+    rating: float
+    comment: str | None = None
+    listing_id: int | None = None
+
+
+# Works for ORM rows and app.result_cache snapshots alike
+def _listing_json(listing) -> dict:
+    return {
+        "id": listing.id,
+        "title": listing.title,
+        "description": listing.description,
+        "price": listing.price,
+        "condition": listing.condition,
+        "category": listing.category,
+        "is_sold": bool(listing.is_sold),
+        "user_id": listing.user_id,
+        "created_at": listing.created_at,
+        "contact_email": listing.contact_email,
+        "contact_phone": listing.contact_phone,
+        "images": [
+            {"id": img.id, "url": img.url, "thumbnail_url": img.thumbnail_url, "display_url": img.display_url}
+            for img in listing.images
+        ],
+    }
+
+
+def _message_json(msg) -> dict:
+    return {
+        "id": msg.id,
+        "sender_id": msg.sender_id,
+        "receiver_id": msg.receiver_id,
+        "listing_id": msg.listing_id,
+        "content": msg.content,
+        "created_at": msg.created_at,
+        "is_read": bool(msg.is_read),
+    }
+
+
+def _review_json(review) -> dict:
+    return {
+        "id": review.id,
+        "reviewer_id": review.reviewer_id,
+        "reviewed_user_id": review.reviewed_user_id,
+        "listing_id": review.listing_id,
+        "rating": review.rating,
+        "comment": review.comment,
+        "created_at": review.created_at,
+    }
+
 
 @app.get("/")
 def root():
     return {"message": "Welcome to the Campus Market API!!"}
 
+
+#====== Listings ======#
+
 @app.get("/listings")
-def get_listings():
-#Placeholder for actual DB call
-    return [{"id": 1, "title": "Sample Listing", "price": 100}]
+async def get_listings(keyword: str | None = None, min_price: float | None = None, max_price: float | None = None,
+                       condition: list[str] | None = Query(None), category: list[str] | None = Query(None),
+                       fuzzy: bool = False, sort: str | None = None, cursor: str | None = None,
+                       limit: int = DEFAULT_PAGE_SIZE, facets: bool = False,
+                       db: AsyncSession = Depends(get_db)):
+    """One page of listings; pass next_cursor back as cursor for the next one."""
+    page = await async_listings.search_listings_page(
+        db, keyword=keyword, min_price=min_price, max_price=max_price,
+        conditions=condition, categories=category, fuzzy=fuzzy, cursor=cursor, limit=limit,
+        sort=sort or ("relevance" if keyword else "newest"), with_facets=facets,
+    )
+    return {"items": [_listing_json(l) for l in page.items], "next_cursor": page.next_cursor, "facets": page.facets}
+
+
+@app.get("/listings/suggestions")
+async def get_suggestions(text: str, db: AsyncSession = Depends(get_db)):
+    return await async_listings.get_search_suggestions(db, text)
+
+
+@app.get("/listings/{listing_id}")
+async def get_listing(listing_id: int, db: AsyncSession = Depends(get_db)):
+    listing = await async_listings.get_listing(db, listing_id)
+    if listing is None:
+        raise HTTPException(status_code=404, detail="Listing not found")
+    return _listing_json(listing)
+
+
+@app.post("/listings", status_code=201)
+async def create_listing(body: ListingIn, db: AsyncSession = Depends(get_db)):
+    listing = await async_listings.create_listing(db, **body.model_dump())
+    return _listing_json(listing)
+
+
+@app.post("/listings/{listing_id}/sold")
+async def mark_listing_sold(listing_id: int, user_id: int, db: AsyncSession = Depends(get_db)):
+    if not await async_listings.mark_listing_sold(db, listing_id, user_id):
+        raise HTTPException(status_code=404, detail="Listing not found")
+    return {"id": listing_id, "is_sold": True}
+
+
+@app.get("/users/{user_id}/listings")
+async def get_user_listings(user_id: int, db: AsyncSession = Depends(get_db)):
+    return [_listing_json(l) for l in await async_listings.get_user_listings(db, user_id)]
+
+
+#====== Favorites ======#
+
+@app.get("/users/{user_id}/favorites")
+async def get_favorites(user_id: int, db: AsyncSession = Depends(get_db)):
+    return [fav.listing_id for fav in await async_favorites.get_user_favorites(db, user_id)]
+
+
+@app.put("/users/{user_id}/favorites/{listing_id}")
+async def add_favorite(user_id: int, listing_id: int, db: AsyncSession = Depends(get_db)):
+    if await async_listings.get_listing(db, listing_id) is None:
+        raise HTTPException(status_code=404, detail="Listing not found")
+    if not await async_favorites.is_favorited(db, user_id, listing_id):
+        await async_favorites.add_favorite(db, user_id, listing_id)
+    return {"listing_id": listing_id, "favorited": True}
+
+
+@app.delete("/users/{user_id}/favorites/{listing_id}")
+async def remove_favorite(user_id: int, listing_id: int, db: AsyncSession = Depends(get_db)):
+    await async_favorites.remove_favorite(db, user_id, listing_id)
+    return {"listing_id": listing_id, "favorited": False}
+
+
+#====== Messages ======#
+
+@app.get("/users/{user_id}/messages")
+async def get_messages(user_id: int, db: AsyncSession = Depends(get_db)):
+    return [_message_json(m) for m in await async_messages.get_user_messages(db, user_id)]
+
+
+@app.get("/users/{user_id}/conversations")
+async def get_conversations(user_id: int, db: AsyncSession = Depends(get_db)):
+    return [c._asdict() for c in await async_messages.get_conversations(db, user_id)]
+
+
+@app.get("/users/{user_id}/conversations/{other_user_id}/messages")
+async def get_conversation_messages(user_id: int, other_user_id: int, listing_id: int | None = None,
+                                    before_id: int | None = None, limit: int = MESSAGE_PAGE_SIZE,
+                                    db: AsyncSession = Depends(get_db)):
+    """Latest messages of one chat, oldest first; pass next_before_id back as before_id for older ones."""
+    page = await async_messages.get_conversation_page(db, user_id, other_user_id, listing_id, before_id, limit)
+    return {"items": [_message_json(m) for m in page.items], "next_before_id": page.next_before_id}
+
+
+@app.post("/users/{user_id}/conversations/{other_user_id}/read")
+async def mark_conversation_read(user_id: int, other_user_id: int, up_to_id: int, listing_id: int | None = None,
+                                 db: AsyncSession = Depends(get_db)):
+    marked = await async_messages.mark_conversation_read(db, user_id, other_user_id, listing_id, up_to_id)
+    return {"marked": marked}
+
+
+@app.get("/users/{user_id}/messages/since")
+async def get_new_messages(user_id: int, last_seen_id: int = 0, db: AsyncSession = Depends(get_db)):
+    """Messages newer than last_seen_id, oldest first; poll again with the last id returned."""
+    return [_message_json(m) for m in await async_messages.get_messages_since(db, user_id, last_seen_id)]
+
+
+@app.post("/messages", status_code=201)
+async def send_message(body: MessageIn, db: AsyncSession = Depends(get_db)):
+    return _message_json(await async_messages.send_message(db, **body.model_dump()))
+
+
+@app.post("/messages/{message_id}/read")
+async def mark_message_read(message_id: int, db: AsyncSession = Depends(get_db)):
+    msg = await async_messages.mark_as_read(db, message_id)
+    if msg is None:
+        raise HTTPException(status_code=404, detail="Message not found")
+    return _message_json(msg)
+
+
+#====== Event Stream ======#
+# Server-Sent Events for one user: new messages (sent and received) and the
+# unread total, pushed by app.message_hub as they commit. Message events
+# carry the message id as the SSE id, so a reconnecting client's
+# Last-Event-ID header (or ?last_seen_id=) is caught up from the database
+# before live events. A resync event means the connection fell behind and
+# the client should fetch /users/{id}/messages/since. A comment line every
+# EVENTS_HEARTBEAT_SECONDS keeps idle streams open through proxies.
+#==========================#
+
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+
+
+def _sse(event: str, data, event_id: int | None = None) -> str:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append("data: " + json.dumps(jsonable_encoder(data), separators=(",", ":")))
+    return "\n".join(lines) + "\n\n"
+
+
+async def _event_stream(sub, backlog: list, last_id: int):
+    try:
+        for msg in backlog:
+            yield _sse("message", _message_json(msg), msg.id)
+            last_id = msg.id
+        if len(backlog) == MAX_MESSAGE_PAGE_SIZE:
+            # more than one catch-up batch missed; let the client page through it
+            yield _sse("resync", {"last_seen_id": last_id})
+        while True:
+            try:
+                event = await asyncio.wait_for(sub.get(), EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if event["type"] == "message":
+                msg = event["message"]
+                # subscribed before the catch-up read, so a message can arrive twice
+                if msg.id <= last_id:
+                    continue
+                last_id = msg.id
+                # one event object is shared by every stream of the user: encode it once
+                if "sse" not in event:
+                    event["sse"] = _sse("message", _message_json(msg), msg.id)
+                yield event["sse"]
+            elif event["type"] == "unread":
+                yield _sse("unread", {"unread_count": event["unread_count"]})
+            else:
+                yield _sse("resync", {"last_seen_id": last_id})
+    finally:
+        hub.unsubscribe(sub)
+
+
+@app.get("/users/{user_id}/events")
+async def stream_events(user_id: int, request: Request, last_seen_id: int | None = None,
+                        db: AsyncSession = Depends(get_db)):
+    """Push this user's new messages and unread total as Server-Sent Events."""
+    header = request.headers.get("last-event-id", "")
+    if last_seen_id is None and header.isdigit():
+        last_seen_id = int(header)
+    # Subscribe first so nothing sent during the catch-up read is missed
+    sub = hub.subscribe(user_id)
+    try:
+        backlog = [] if last_seen_id is None else await async_messages.get_messages_since(db, user_id, last_seen_id)
+        # Give the pooled connection back now: the stream may stay open for hours
+        await db.close()
+    except BaseException:
+        hub.unsubscribe(sub)
+        raise
+    return StreamingResponse(
+        _event_stream(sub, backlog, last_seen_id or 0),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # also runs when the client left before the stream started
+        background=BackgroundTask(hub.unsubscribe, sub),
+    )
+
+
+@app.get("/events/stats")
+def event_stats():
+    return hub.stats()
+
+
+#====== Reviews ======#
+
+@app.get("/users/{user_id}/reviews")
+async def get_reviews(user_id: int, db: AsyncSession = Depends(get_db)):
+    reviews = await async_reviews.get_reviews_for_user(db, user_id)
+    return {
+        "average_rating": await async_reviews.get_user_average_rating(db, user_id),
+        "reviews": [_review_json(r) for r in reviews],
+    }
+
+
+@app.post("/reviews", status_code=201)
+async def create_review(body: ReviewIn, db: AsyncSession = Depends(get_db)):
+    if await async_reviews.has_user_reviewed(db, body.reviewer_id, body.reviewed_user_id):
+        raise HTTPException(status_code=409, detail="You have already reviewed this user")
+    return _review_json(await async_reviews.create_review(db, **body.model_dump()))
 
 
 # Upload endpoint for images/files
@@ -28,7 +391,8 @@ async def upload_file(file: UploadFile = File(...)):
 
 @app.exception_handler(StarletteHTTPException)
 async def custom_404_handler(request: Request, exc: StarletteHTTPException):
-    if exc.status_code == 404:
+    # Unknown paths go home; a 404 from a matched route (e.g. a missing listing) stays a 404
+    if exc.status_code == 404 and "endpoint" not in request.scope:
       return RedirectResponse(url="/")
     return JSONResponse(status_code=exc.status_code,
 content={"detail": exc.detail})
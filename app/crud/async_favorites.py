@@ -0,0 +1,39 @@
+"""Async variant of app/crud/favorites.py for the FastAPI backend."""
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.favorite import Favorite
+
+
+async def is_favorited(db: AsyncSession, user_id: int, listing_id: int) -> bool:
+    favorite_id = await db.scalar(
+        select(Favorite.id).where(Favorite.user_id == user_id, Favorite.listing_id == listing_id).limit(1)
+    )
+    return favorite_id is not None
+
+
+async def add_favorite(db: AsyncSession, user_id: int, listing_id: int):
+    db.add(Favorite(user_id=user_id, listing_id=listing_id))
+    await db.commit()
+
+
+async def remove_favorite(db: AsyncSession, user_id: int, listing_id: int):
+    await db.execute(
+        delete(Favorite).where(Favorite.user_id == user_id, Favorite.listing_id == listing_id)
+    )
+    await db.commit()
+
+
+async def get_user_favorites(db: AsyncSession, user_id: int) -> list[Favorite]:
+    return list(await db.scalars(select(Favorite).where(Favorite.user_id == user_id)))
+
+
+async def get_favorited_listing_ids(db: AsyncSession, user_id: int, listing_ids) -> set:
+    """Return which of listing_ids user_id has favorited, in one query."""
+    listing_ids = set(listing_ids)
+    if not listing_ids:
+        return set()
+    rows = await db.scalars(
+        select(Favorite.listing_id).where(Favorite.user_id == user_id, Favorite.listing_id.in_(listing_ids))
+    )
+    return set(rows)
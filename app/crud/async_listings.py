@@ -0,0 +1,144 @@
+"""
+Async variant of app/crud/listings.py for the FastAPI backend.
+
+Field validation is shared with the sync CRUD (validate_listing_fields /
+validate_listing_updates), and the result cache's session hooks see these
+writes like the sync ones. The search and page reads reuse the sync
+implementations (FTS, fuzzy and cursor code as is) and return
+ListingSnapshots from the shared result cache. Index builds, fuzzy scoring
+and snapshotting are CPU-bound, so when the async engine has a sync engine
+on the same database (app.async_db) those reads run in a worker thread on
+it, off the event loop; otherwise they go through AsyncSession.run_sync.
+"""
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+
+from app.autocomplete import DEFAULT_SUGGESTIONS
+from app.crud import listings as sync_listings
+from app.crud.listings import (
+    DEFAULT_PAGE_SIZE, ForbiddenAction, ListingPage, _new_image, validate_listing_fields, validate_listing_updates,
+)
+from app.db import session_engine
+from app.models.listing import Listing
+from app.saved_search_index import get_saved_search_index, percolate_listing
+
+
+async def _run_read(db: AsyncSession, fn, *args, **params):
+    """
+    Run fn(sync_session, *args, **params) off the event loop when possible.
+
+    The worker thread uses its own session on the shared sync engine, so it
+    sees committed data only, not db's pending changes.
+    """
+    engine = session_engine(db.sync_session)
+    if engine.dialect.is_async:
+        # No sync engine to share: run on the loop through the async driver
+        return await db.run_sync(fn, *args, **params)
+
+    def read():
+        with Session(engine, autoflush=False, expire_on_commit=False) as sync_db:
+            return fn(sync_db, *args, **params)
+    return await asyncio.to_thread(read)
+
+
+#====== Writes ======#
+
+async def create_listing(db: AsyncSession, title, description, price, image_urls: list | None = None,
+                         user_id: int | None = None, condition: str = "Good", contact_email: str = None,
+                         contact_phone: str = None, category: str = "Other") -> Listing:
+    """Create a listing with its images; same rules as the sync create_listing (keyword style only)."""
+    listing = Listing(
+        **validate_listing_fields(user_id, title, description, price, condition, category),
+        contact_email=contact_email,
+        contact_phone=contact_phone,
+    )
+    listing.images.extend(_new_image(entry) for entry in image_urls or [])
+    db.add(listing)
+    await db.flush()
+    # Alert users whose saved searches this listing satisfies, in the same
+    # commit; a first use builds the percolator index in the worker thread
+    await _run_read(db, get_saved_search_index)
+    await db.run_sync(percolate_listing, listing)
+    await db.commit()
+    await db.refresh(listing, ["images"])
+    return listing
+
+
+async def update_listing(db: AsyncSession, listing_id: int, title: str = None, description: str = None,
+                         price: float = None, condition: str = None, category: str = None,
+                         add_images: list = None, remove_image_ids: list = None) -> Listing | None:
+    listing = await get_listing(db, listing_id)
+    if not listing:
+        return None
+
+    for field, value in validate_listing_updates(title, description, price, condition, category).items():
+        setattr(listing, field, value)
+    if add_images:
+        listing.images.extend(_new_image(entry) for entry in add_images)
+    if remove_image_ids:
+        for img in listing.images[:]:
+            if img.id in remove_image_ids:
+                listing.images.remove(img)
+                await db.delete(img)
+
+    await db.commit()
+    await db.refresh(listing, ["images"])
+    return listing
+
+
+async def delete_listing(db: AsyncSession, listing_id: int) -> bool:
+    """Delete one listing with the same cleanup as the sync delete_listings_bulk."""
+    return await db.run_sync(sync_listings.delete_listings_bulk, [listing_id]) == 1
+
+
+async def mark_listing_sold(db: AsyncSession, listing_id: int, user_id: int) -> bool:
+    listing = await db.get(Listing, listing_id)
+    if not listing:
+        return False
+    if listing.user_id != user_id:
+        raise ForbiddenAction("You do not own this listing")
+    listing.is_sold = True
+    await db.commit()
+    return True
+
+
+#====== Reads ======#
+
+async def get_listing(db: AsyncSession, listing_id: int) -> Listing | None:
+    """The listing with its images loaded, or None."""
+    return await db.get(Listing, listing_id, options=[selectinload(Listing.images)])
+
+
+async def get_user_listings(db: AsyncSession, user_id: int) -> list[Listing]:
+    """A seller's listings, newest first, with images loaded."""
+    result = await db.scalars(
+        select(Listing)
+        .options(selectinload(Listing.images))
+        .where(Listing.user_id == user_id)
+        .order_by(Listing.id.desc())
+    )
+    return list(result)
+
+
+async def get_listings_page(db: AsyncSession, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE,
+                            sort: str = "newest") -> ListingPage:
+    """Cached sync get_listings_page; items are ListingSnapshots."""
+    return await _run_read(db, sync_listings.cached_listing_read, sync_listings.get_listings_page,
+                           cursor=cursor, limit=limit, sort=sort)
+
+
+async def search_listings_page(db: AsyncSession, **params) -> ListingPage:
+    """Cached sync search_listings_page (same keyword arguments); items are ListingSnapshots."""
+    return await _run_read(db, sync_listings.cached_listing_read, sync_listings.search_listings_page, **params)
+
+
+async def get_search_facets(db: AsyncSession, **params) -> dict:
+    """Cached sync get_search_facets (same keyword arguments)."""
+    return await _run_read(db, sync_listings.cached_listing_read, sync_listings.get_search_facets, **params)
+
+
+async def get_search_suggestions(db: AsyncSession, text: str, limit: int = DEFAULT_SUGGESTIONS) -> list:
+    return await _run_read(db, sync_listings.get_search_suggestions, text, limit)
@@ -0,0 +1,143 @@
+"""
+Async variant of app/crud/messages.py for the FastAPI backend.
+
+Keeps the conversations summary rows current with the same statements as the
+sync CRUD, inside the message's transaction. Once a write has committed it is
+published to app.message_hub for the participants' open event streams.
+"""
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.crud.messages import (
+    MAX_MESSAGE_PAGE_SIZE,
+    MESSAGE_PAGE_SIZE,
+    ConversationSummary,
+    MessagePage,
+    _message_page,
+    conversation_page_query,
+    conversation_participants,
+    conversation_read_all_update,
+    conversation_read_update,
+    conversation_unread_decrement,
+    conversation_upsert,
+    conversations_query,
+    latest_message_id_query,
+    messages_since_query,
+    unread_count_query,
+    validate_message_content,
+)
+from app.message_hub import hub
+from app.models.message import Message
+from app.models.user import User
+
+
+async def _publish_unread_count(db: AsyncSession, user_id: int):
+    # Only worth a query when the user has a stream open on this worker
+    if hub.has_subscribers(user_id):
+        hub.publish(user_id, {"type": "unread", "unread_count": await get_unread_message_count(db, user_id)})
+
+
+async def _record_message(db: AsyncSession, msg: Message):
+    dialect_name = db.get_bind().dialect.name
+    for user_id, other_user_id, unread in conversation_participants(msg):
+        await db.execute(conversation_upsert(dialect_name, msg, user_id, other_user_id, unread))
+
+
+async def send_message(db: AsyncSession, sender_id: int, receiver_id: int, content: str,
+                       listing_id: int = None) -> Message:
+    if await db.get(User, sender_id) is None:
+        raise ValueError("Sender does not exist")
+    if await db.get(User, receiver_id) is None:
+        raise ValueError("Receiver does not exist")
+    validate_message_content(content)
+
+    msg = Message(sender_id=sender_id, receiver_id=receiver_id, content=content, listing_id=listing_id)
+    db.add(msg)
+    await db.flush()
+    await _record_message(db, msg)
+    await db.commit()
+    await db.refresh(msg)
+    event = {"type": "message", "message": msg}
+    hub.publish(msg.sender_id, event)
+    if msg.receiver_id != msg.sender_id:
+        hub.publish(msg.receiver_id, event)
+        await _publish_unread_count(db, msg.receiver_id)
+    return msg
+
+
+async def get_user_messages(db: AsyncSession, user_id: int) -> list[Message]:
+    result = await db.scalars(
+        select(Message)
+        .where(or_(Message.sender_id == user_id, Message.receiver_id == user_id))
+        .order_by(Message.created_at.desc())
+    )
+    return list(result)
+
+
+async def get_conversations(db: AsyncSession, user_id: int) -> list[ConversationSummary]:
+    """A user's conversation summaries, latest message first."""
+    result = await db.execute(conversations_query(user_id))
+    return [ConversationSummary(*row) for row in result]
+
+
+async def get_conversation_page(db: AsyncSession, user_id: int, other_user_id: int, listing_id: int = None,
+                                before_id: int = None, limit: int = MESSAGE_PAGE_SIZE) -> MessagePage:
+    """The latest limit messages between two users about one listing (or none) before before_id."""
+    rows = (await db.scalars(conversation_page_query(user_id, other_user_id, listing_id, before_id, limit))).all()
+    return _message_page(rows, limit)
+
+
+async def get_messages_since(db: AsyncSession, user_id: int, last_seen_id: int,
+                             limit: int = MAX_MESSAGE_PAGE_SIZE) -> list[Message]:
+    """Messages to or from user_id newer than last_seen_id, oldest first (at most limit)."""
+    return list(await db.scalars(messages_since_query(user_id, last_seen_id, limit)))
+
+
+async def get_unread_message_count(db: AsyncSession, user_id: int) -> int:
+    return await db.scalar(unread_count_query(user_id))
+
+
+async def get_latest_message_id(db: AsyncSession, user_id: int) -> int:
+    return await db.scalar(latest_message_id_query(user_id)) or 0
+
+
+async def mark_as_read(db: AsyncSession, message_id: int) -> Message | None:
+    msg = await db.get(Message, message_id)
+    if msg:
+        newly_read = not msg.is_read and msg.sender_id != msg.receiver_id
+        if newly_read:
+            await db.execute(conversation_read_update(msg))
+        msg.is_read = True
+        await db.commit()
+        if newly_read:
+            await _publish_unread_count(db, msg.receiver_id)
+    return msg
+
+
+async def mark_conversation_read(db: AsyncSession, user_id: int, other_user_id: int, listing_id: int | None,
+                                 up_to_id: int) -> int:
+    """Mark the messages other_user_id sent user_id in one conversation read, up to up_to_id."""
+    try:
+        result = await db.execute(conversation_read_all_update(user_id, other_user_id, listing_id, up_to_id))
+        marked = result.rowcount
+        if marked and other_user_id != user_id:
+            await db.execute(conversation_unread_decrement(user_id, other_user_id, listing_id, marked))
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    if marked and other_user_id != user_id:
+        await _publish_unread_count(db, user_id)
+    return marked
+
+
+async def get_received_messages(db: AsyncSession, user_id: int) -> list[Message]:
+    """Messages received by user_id, newest first, with the sender loaded."""
+    result = await db.scalars(
+        select(Message)
+        .options(joinedload(Message.sender))
+        .where(Message.receiver_id == user_id)
+        .order_by(Message.created_at.desc())
+    )
+    return list(result)
@@ -0,0 +1,99 @@
+"""
+Async variant of app/crud/reviews.py for the FastAPI backend.
+
+Uses the same rating validation and the same user_rating_stats upsert as the
+sync CRUD, inside the review's transaction.
+"""
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.reviews import rating_stats_upsert, validate_rating, validate_review
+from app.models.review import Review
+from app.models.user_rating_stats import UserRatingStats
+
+
+async def _adjust_rating_stats(db: AsyncSession, user_id: int, rating_delta: float, count_delta: int):
+    await db.flush()
+    await db.execute(rating_stats_upsert(db.get_bind().dialect.name, user_id, rating_delta, count_delta))
+
+
+async def create_review(db: AsyncSession, reviewer_id: int, reviewed_user_id: int, rating: float,
+                        comment: str = None, listing_id: int = None) -> Review:
+    """Create a review for a user."""
+    validate_review(reviewer_id, reviewed_user_id, rating)
+    review = Review(
+        reviewer_id=reviewer_id,
+        reviewed_user_id=reviewed_user_id,
+        rating=rating,
+        comment=comment,
+        listing_id=listing_id,
+    )
+    db.add(review)
+    await _adjust_rating_stats(db, reviewed_user_id, float(rating), 1)
+    await db.commit()
+    await db.refresh(review)
+    return review
+
+
+async def get_reviews_for_user(db: AsyncSession, user_id: int) -> list[Review]:
+    """Reviews received by a user, most recent first."""
+    result = await db.scalars(
+        select(Review)
+        .where(Review.reviewed_user_id == user_id)
+        .order_by(Review.created_at.desc(), Review.id.desc())
+    )
+    return list(result)
+
+
+async def get_user_average_rating(db: AsyncSession, user_id: int):
+    """Average rating for a user; None if no reviews."""
+    stats = await db.get(UserRatingStats, user_id)
+    return stats.average if stats else None
+
+
+async def get_average_ratings(db: AsyncSession, user_ids) -> dict:
+    """Map user id -> average rating; users without reviews are left out."""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return {}
+    rows = await db.scalars(
+        select(UserRatingStats)
+        .where(UserRatingStats.user_id.in_(user_ids), UserRatingStats.rating_count > 0)
+    )
+    return {stats.user_id: stats.average for stats in rows}
+
+
+async def has_user_reviewed(db: AsyncSession, reviewer_id: int, reviewed_user_id: int) -> bool:
+    review_id = await db.scalar(
+        select(Review.id)
+        .where(Review.reviewer_id == reviewer_id, Review.reviewed_user_id == reviewed_user_id)
+        .limit(1)
+    )
+    return review_id is not None
+
+
+async def update_review(db: AsyncSession, review_id: int, rating: float = None,
+                        comment: str = None) -> Review | None:
+    review = await db.get(Review, review_id)
+    if not review:
+        return None
+    if rating is not None:
+        validate_rating(rating)
+        rating_delta = float(rating) - review.rating
+        review.rating = rating
+        await _adjust_rating_stats(db, review.reviewed_user_id, rating_delta, 0)
+    if comment is not None:
+        review.comment = comment
+    await db.commit()
+    await db.refresh(review)
+    return review
+
+
+async def delete_review(db: AsyncSession, review_id: int) -> bool:
+    review = await db.get(Review, review_id)
+    if not review:
+        return False
+    await db.delete(review)
+    await _adjust_rating_stats(db, review.reviewed_user_id, -review.rating, -1)
+    await db.commit()
+    return True
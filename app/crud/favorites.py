@@ -43,3 +43,16 @@ def remove_favorite(db: Session, user_id: int, listing_id: int):
 
 def get_user_favorites(db: Session, user_id: int):
     return db.query(Favorite).filter(Favorite.user_id == user_id).all()
+
+
+def get_favorited_listing_ids(db: Session, user_id: int, listing_ids) -> set:
+    """Return which of listing_ids user_id has favorited, in one query."""
+    listing_ids = set(listing_ids)
+    if not listing_ids:
+        return set()
+    rows = (
+        db.query(Favorite.listing_id)
+        .filter(Favorite.user_id == user_id, Favorite.listing_id.in_(listing_ids))
+        .all()
+    )
+    return {listing_id for (listing_id,) in rows}
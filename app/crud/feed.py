@@ -0,0 +1,70 @@
+from dataclasses import dataclass
+
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.crud.favorites import get_favorited_listing_ids
+from app.crud.reviews import get_average_ratings
+from app.result_cache import ListingSnapshot, snapshot_listings
+
+#====== Listing Feed Assembly ======#
+# Everything a home.py listing card shows besides the listing itself (owner
+# name, avatar, rating, the viewer's favorite heart) fetched for a whole page
+# at once: one query per kind of data instead of a few queries per card.
+#===================================#
+
+
+@dataclass(frozen=True)
+class ListingCard:
+    """View model for one listing card on the home feed."""
+    listing: ListingSnapshot
+    owner_id: int
+    owner_exists: bool
+    owner_name: str
+    owner_picture: str | None
+    owner_rating: float | None
+    # None when nobody is logged in or the viewer owns the listing
+    is_favorited: bool | None
+
+
+def build_listing_cards(db: Session, listings, viewer_id: int | None = None) -> list[ListingCard]:
+    """
+    Turn a page of listings into ListingCards in a constant number of queries.
+
+    listings may be ORM rows or ListingSnapshots (from cached_listing_read);
+    ORM rows are snapshotted with one query for all their images. Owners,
+    average ratings and the viewer's favorites are then one query each.
+    """
+    listings = list(listings)
+    if not listings:
+        return []
+    if not all(isinstance(l, ListingSnapshot) for l in listings):
+        listings = snapshot_listings(db, listings)
+
+    owner_ids = {l.user_id for l in listings}
+    owners = {
+        row.id: row
+        for row in db.query(User.id, User.full_name, User.display_name, User.profile_picture)
+        .filter(User.id.in_(owner_ids))
+    }
+    ratings = get_average_ratings(db, owners)
+    favorited = set()
+    if viewer_id is not None:
+        favorited = get_favorited_listing_ids(
+            db, viewer_id, [l.id for l in listings if l.user_id != viewer_id]
+        )
+
+    cards = []
+    for l in listings:
+        owner = owners.get(l.user_id)
+        name = (owner.full_name or owner.display_name) if owner else None
+        cards.append(ListingCard(
+            listing=l,
+            owner_id=l.user_id,
+            owner_exists=owner is not None,
+            owner_name=name or f"User {l.user_id}",
+            owner_picture=owner.profile_picture if owner else None,
+            owner_rating=ratings.get(l.user_id),
+            is_favorited=None if viewer_id is None or viewer_id == l.user_id else l.id in favorited,
+        ))
+    return cards
@@ -1,20 +1,104 @@
+import base64
+import json
+from typing import NamedTuple
+
 from sqlalchemy.orm import Session
 from app.models.listing import Listing
 from app.models.image import Image
-from sqlalchemy import or_
-from rapidfuzz import fuzz
+from app.models.favorite import Favorite
+from app.models.message import Message
+from app.crud.messages import rebuild_conversations
+from app.models.review import Review
+from app.models.saved_search import SavedSearchMatch
+from sqlalchemy import and_, case, delete, insert, literal, or_, select, tuple_, update, func as sqlfunc
+from app.search_index import fts_available, build_match_query, apply_fts_match, bm25_rank
+from app.fuzzy_index import get_fuzzy_index, queue_listing_changes as queue_fuzzy_index_changes
+from app.autocomplete import DEFAULT_SUGGESTIONS, get_autocomplete_index, queue_listing_changes as queue_autocomplete_changes
+from app.saved_search_index import percolate_listing, percolate_listings
+from app.result_cache import bump_catalogue_version, get_result_cache, make_cache_key, snapshot_listings
 
 # Allowed values for the listing condition. Keep in sync with UI options.
 ALLOWED_CONDITIONS = ["New", "Like New", "Good", "Fair", "For Parts"]
 # Allowed categories for listings
 ALLOWED_CATEGORIES = ["Books", "Electronics", "Furniture", "Clothing", "Hobby", "Other"]
 
+# Sort orders accepted by get_listings, search_listings and the page functions
+ALLOWED_SORTS = ["relevance", "newest", "oldest", "price_asc", "price_desc"]
+# Upper bound on fuzzy matches kept after the SQL filters, and the number of
+# index hits checked against those filters per query
+FUZZY_CANDIDATE_LIMIT = 500
+
+
+#====== Listing Field Validation ======#
+# Shared by the CRUD below and the async variant in app/crud/async_listings.py,
+# so both reject the same input with the same messages.
+#======================================#
+
+def clean_price(price, negative_message: str = "Price cannot be negative") -> float:
+    try:
+        price_val = float(price)
+    except (TypeError, ValueError):
+        raise ValueError("Price must be a number")
+    if price_val < 0:
+        raise ValueError(negative_message)
+    return price_val
+
+
+def _clean_choice(value, allowed: list, label: str) -> str:
+    if not isinstance(value, str):
+        raise ValueError(f"{label} must be a string")
+    value_clean = value.strip()
+    if value_clean not in allowed:
+        raise ValueError(f"Invalid {label.lower()} '{value}'. Allowed: {allowed}")
+    return value_clean
+
+
+def validate_listing_fields(user_id, title, description, price, condition="Good", category="Other") -> dict:
+    """Check a new listing's fields; returns the cleaned Listing column values."""
+    if user_id is None:
+        raise ValueError("user_id is required")
+    if title is None or description is None or price is None:
+        raise ValueError("title, description, and price are required")
+    return {
+        "title": title,
+        "description": description,
+        "price": clean_price(price),
+        "user_id": user_id,
+        "condition": _clean_choice("Good" if condition is None else condition, ALLOWED_CONDITIONS, "Condition"),
+        "category": _clean_choice("Other" if category is None else category, ALLOWED_CATEGORIES, "Category"),
+    }
+
+
+def validate_listing_updates(title=None, description=None, price=None, condition=None, category=None) -> dict:
+    """Check the fields of a listing edit; returns the cleaned values that were given."""
+    updates = {}
+    if title is not None:
+        updates["title"] = title
+    if description is not None:
+        updates["description"] = description
+    if price is not None:
+        updates["price"] = clean_price(price, "Price must be non-negative")
+    if condition is not None:
+        updates["condition"] = _clean_choice(condition, ALLOWED_CONDITIONS, "Condition")
+    if category is not None:
+        updates["category"] = _clean_choice(category, ALLOWED_CATEGORIES, "Category")
+    return updates
+
 
 #====== CRUD Operations for Listings ======#
 # These CRUD functions are used in home.py and future API endpoints
 # for creating, reading, and deleting listings along with their images.
 #=========================================#
 
+# Image columns from plain paths or app.storage.StoredImage (original + variants)
+def _image_fields(entry) -> dict:
+    if isinstance(entry, str):
+        return {"url": entry}
+    return {"url": entry.url, "thumbnail_url": entry.thumbnail_url, "display_url": entry.display_url}
+
+def _new_image(entry) -> Image:
+    return Image(**_image_fields(entry))
+
 # Create a listing
 def create_listing(db: Session, title, description=None, price: float = None, image_urls: list | None = None,
                    user_id: int | None = None, condition: str = "Good", contact_email: str = None,
@@ -25,6 +109,8 @@ def create_listing(db: Session, title, description=None, price: float = None, im
     Supports two call styles:
     - Keyword/standard: create_listing(db, title="T", description="D", price=1.0, image_urls=[], user_id=1, ...)
     - Legacy positional: create_listing(db, user_id, title, description, price, condition, category)
+
+    image_urls entries are file paths or StoredImages from app.storage.save_listing_image.
     """
     # Default images list
     if image_urls is None:
@@ -51,61 +137,28 @@ def create_listing(db: Session, title, description=None, price: float = None, im
         category = legacy_category
         image_urls = []
 
-    # Validate presence of required fields
-    if user_id is None:
-        raise ValueError("user_id is required")
-    if title is None or description is None or price is None:
-        raise ValueError("title, description, and price are required")
-
-    # Validate and normalize price
-    try:
-        price_val = float(price)
-    except (TypeError, ValueError):
-        raise ValueError("Price must be a number")
-    if price_val < 0:
-        raise ValueError("Price cannot be negative")
-
-    # Validate condition
-    if condition is None:
-        condition = "Good"
-    if not isinstance(condition, str):
-        raise ValueError("Condition must be a string")
-    condition_clean = condition.strip()
-    if condition_clean not in ALLOWED_CONDITIONS:
-        raise ValueError(f"Invalid condition '{condition}'. Allowed: {ALLOWED_CONDITIONS}")
-
-    # Validate and set category
-    if category is None:
-        category = "Other"
-    if not isinstance(category, str):
-        raise ValueError("Category must be a string")
-    category_clean = category.strip()
-    if category_clean not in ALLOWED_CATEGORIES:
-        raise ValueError(f"Invalid category '{category}'. Allowed: {ALLOWED_CATEGORIES}")
-
     listing = Listing(
-        title=title,
-        description=description,
-        price=price_val,
-        user_id=user_id,
-        condition=condition_clean,
-        category=category_clean,
+        **validate_listing_fields(user_id, title, description, price, condition, category),
         contact_email=contact_email,
         contact_phone=contact_phone,
     )
 
     # Attach images
-    images = [Image(url=url) for url in image_urls]
+    images = [_new_image(entry) for entry in image_urls]
     listing.images.extend(images)
     
     db.add(listing)
+    db.flush()
+    # Alert users whose saved searches this listing satisfies, in the same commit
+    percolate_listing(db, listing)
     db.commit()
     db.refresh(listing)
     return listing
 
 # Query all listings
-def get_listings(db: Session):
-    return db.query(Listing).all()
+def get_listings(db: Session, sort: str = "newest"):
+    columns, descending = _sort_columns(sort)
+    return _order_by(db.query(Listing), columns, descending).all()
 
 # Get a listing by ID
 def get_listing(db: Session, listing_id: int):
@@ -113,12 +166,8 @@ def get_listing(db: Session, listing_id: int):
 
 # Delete a listing
 def delete_listing(db: Session, listing_id: int):
-    listing = get_listing(db, listing_id)
-    if listing:
-        db.delete(listing)
-        db.commit()
-        return True
-    return False
+    """Delete one listing with the same cleanup as delete_listings_bulk; False if it does not exist."""
+    return delete_listings_bulk(db, [listing_id]) == 1
 
 # Update a listing
 def update_listing(db: Session, listing_id: int, title: str = None, description: str = None,
@@ -128,39 +177,11 @@ def update_listing(db: Session, listing_id: int, title: str = None, description:
         return None
 
     # Update fields if provided
-    if title is not None:
-        listing.title = title
-    if description is not None:
-        listing.description = description
-    if price is not None:
-        try:
-            price_val = float(price)
-        except (TypeError, ValueError):
-            raise ValueError("Price must be a number")
-        if price_val < 0:
-            raise ValueError("Price must be non-negative")
-        listing.price = price_val
-    
-
-    # Update condition if provided
-    if condition is not None:
-        if not isinstance(condition, str):
-            raise ValueError("Condition must be a string")
-        condition_clean = condition.strip()
-        if condition_clean not in ALLOWED_CONDITIONS:
-            raise ValueError(f"Invalid condition '{condition}'. Allowed: {ALLOWED_CONDITIONS}")
-        listing.condition = condition_clean
-    # Update category if provided
-    if category is not None:
-        if not isinstance(category, str):
-            raise ValueError("Category must be a string")
-        category_clean = category.strip()
-        if category_clean not in ALLOWED_CATEGORIES:
-            raise ValueError(f"Invalid category '{category}'. Allowed: {ALLOWED_CATEGORIES}")
-        listing.category = category_clean
+    for field, value in validate_listing_updates(title, description, price, condition, category).items():
+        setattr(listing, field, value)
     # Add new images
     if add_images:
-        new_images = [Image(url=url) for url in add_images]
+        new_images = [_new_image(entry) for entry in add_images]
         listing.images.extend(new_images)
 
     # Remove specific images by ID
@@ -177,15 +198,12 @@ def update_listing(db: Session, listing_id: int, title: str = None, description:
 
 # ====== Search Listings Functionality ======#
 # This function allows searching listings by keywords in title or description,
-# as well as filtering by price range. It supports both exact and fuzzy matches.
+# as well as filtering by price range. Keyword hits can be ranked by BM25
+# when the SQLite full-text index (app/search_index.py) is available.
 #============================================#
 
-def search_listings(db, keyword: str = None, threshold: int = 60,
-                    min_price: float = None, max_price: float = None,
-                    conditions: list = None, categories: list = None):
-    # --- Start with all listings ---
-    q = db.query(Listing)
-
+def _apply_filters(q, min_price: float = None, max_price: float = None,
+                   conditions: list = None, categories: list = None):
     # --- Apply price filters early ---
     if min_price is not None:
         q = q.filter(Listing.price >= min_price)
@@ -200,22 +218,367 @@ def search_listings(db, keyword: str = None, threshold: int = 60,
     if categories:
         if isinstance(categories, (list, tuple, set)) and len(categories) > 0:
             q = q.filter(Listing.category.in_(list(categories)))
-    # --- Keyword filter (case-insensitive substring in title or description) ---
-    if keyword and keyword.strip():
-        kw = f"%{keyword.strip()}%"
-        q = q.filter(
-            or_(
-                Listing.title.ilike(kw),
-                Listing.description.ilike(kw)
-            )
+    return q
+
+
+def _filtered_fuzzy_scores(db, q, keyword: str, threshold: int) -> dict:
+    """
+    Map listing id -> fuzzy score for the best matches that pass q's filters.
+
+    Index hits are checked against the filters FUZZY_CANDIDATE_LIMIT at a
+    time, best first, until FUZZY_CANDIDATE_LIMIT of them pass, so better
+    scoring listings that are filtered out never crowd out the ones that match.
+    """
+    hits = get_fuzzy_index(db).search(keyword, threshold=threshold)
+    id_query = q.with_entities(Listing.id)
+    scores = {}
+    for start in range(0, len(hits), FUZZY_CANDIDATE_LIMIT):
+        chunk = hits[start:start + FUZZY_CANDIDATE_LIMIT]
+        passing = {row[0] for row in id_query.filter(Listing.id.in_([i for i, _ in chunk]))}
+        for listing_id, score in chunk:
+            if listing_id in passing:
+                scores[listing_id] = score
+                if len(scores) == FUZZY_CANDIDATE_LIMIT:
+                    return scores
+    return scores
+
+
+def _apply_keyword(db, q, keyword: str = None, threshold: int = 60, fuzzy: bool = False):
+    """
+    Restrict q to listings matching keyword.
+
+    Returns (query, fuzzy_scores, rank). fuzzy_scores maps listing id ->
+    score in fuzzy mode; rank is the BM25 expression when the FTS index did
+    the matching. Either is None when it does not apply, and the query is
+    None if nothing can match. No ordering is applied here; see _sort_columns.
+    """
+    if not (keyword and keyword.strip()):
+        return q, None, None
+
+    # --- Fuzzy keyword match: candidates from the index, filters in SQL ---
+    if fuzzy:
+        scores = _filtered_fuzzy_scores(db, q, keyword, threshold)
+        if not scores:
+            return None, {}, None
+        return q.filter(Listing.id.in_(list(scores))), scores, None
+
+    # --- Keyword filter ---
+    # On SQLite with the FTS5 index, match words against title/description
+    # and rank by BM25. Elsewhere fall back to a case-insensitive substring.
+    match_query = build_match_query(keyword)
+    if match_query and fts_available(db):
+        return apply_fts_match(q, match_query, rank=False), None, bm25_rank()
+
+    kw = f"%{keyword.strip()}%"
+    q = q.filter(
+        or_(
+            Listing.title.ilike(kw),
+            Listing.description.ilike(kw)
         )
+    )
+    return q, None, None
+
+
+# Sort name -> ordered key columns and direction, each walkable on an index:
+# the primary key for newest/oldest, ix_listings_price_id for price. The last
+# column must be unique so every row has a distinct position (keyset pages).
+LISTING_SORTS = {
+    "newest": ([Listing.id], True),
+    "oldest": ([Listing.id], False),
+    "price_asc": ([Listing.price, Listing.id], False),
+    "price_desc": ([Listing.price, Listing.id], True),
+}
 
-    listings = q.all()
 
-    # --- If no keyword provided, just return filtered results ---
+def _sort_columns(sort: str, rank=None):
+    """
+    Resolve a sort name to (key columns, descending).
+
+    "relevance" orders by BM25 when rank is given and falls back to
+    "newest" otherwise (no keyword, or fuzzy scores sorted by the caller).
+    """
+    if sort == "relevance":
+        if rank is None:
+            return LISTING_SORTS["newest"]
+        # Ties go newest first; -id keeps every key ascending for the cursor
+        return [rank, -Listing.id], False
+    if sort not in LISTING_SORTS:
+        raise ValueError(f"Invalid sort '{sort}'. Allowed: {ALLOWED_SORTS}")
+    return LISTING_SORTS[sort]
+
+
+def _order_by(q, columns, descending):
+    return q.order_by(*[c.desc() if descending else c.asc() for c in columns])
+
+
+def search_listings(db, keyword: str = None, threshold: int = 60,
+                    min_price: float = None, max_price: float = None,
+                    conditions: list = None, categories: list = None,
+                    fuzzy: bool = False, sort: str = "relevance"):
+    """
+    Search listings by keyword and filters.
+
+    With fuzzy=True the keyword is matched against the in-memory fuzzy index
+    (app/fuzzy_index.py) so misspellings like "calculater" still hit;
+    only listings scoring at least `threshold` (0-100) are returned.
+    Results follow `sort` (one of ALLOWED_SORTS); "relevance" puts the best
+    keyword match first and means "newest" when there is no keyword.
+    """
+    # --- Start with all listings ---
+    q = _apply_filters(db.query(Listing), min_price, max_price, conditions, categories)
+    q, scores, rank = _apply_keyword(db, q, keyword, threshold, fuzzy)
+    if q is None:
+        return []
+
+    columns, descending = _sort_columns(sort, rank)
+    listings = _order_by(q, columns, descending).all()
+    if scores and sort == "relevance":
+        # Stable sort: equal scores stay newest first
+        listings.sort(key=lambda l: scores[l.id], reverse=True)
     return listings
 
 
+# ====== Paginated Listing Queries ======#
+# Keyset ("seek") pagination: each page continues strictly after the sort key
+# of the previous page's last row, so the database walks an index from that
+# point instead of counting past OFFSET rows. Cost per page stays flat no
+# matter how deep the user scrolls or how big the catalogue is.
+#=========================================#
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class ListingPage(NamedTuple):
+    items: list
+    next_cursor: str | None
+    # Facet counts for the whole query (not just this page), see get_search_facets
+    facets: dict | None = None
+
+
+def _encode_cursor(sort: str, values: list) -> str:
+    raw = json.dumps([sort, values], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str, sort: str, n_values: int) -> list:
+    try:
+        cursor_sort, values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort or len(values) != n_values:
+        raise ValueError("Cursor does not match the requested sort order")
+    return values
+
+
+def _check_limit(limit):
+    if not isinstance(limit, int) or limit < 1 or limit > MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be an integer between 1 and {MAX_PAGE_SIZE}")
+
+
+def _paginate(q, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE, sort: str = "newest",
+              rank=None) -> ListingPage:
+    _check_limit(limit)
+    columns, descending = _sort_columns(sort, rank)
+    if cursor:
+        values = _decode_cursor(cursor, sort, len(columns))
+        key, after = (columns[0], values[0]) if len(columns) == 1 else (tuple_(*columns), tuple_(*values))
+        q = q.filter(key < after if descending else key > after)
+
+    # The sort key is selected alongside each row so the cursor can carry
+    # computed keys (BM25 scores) as well as plain columns
+    q = _order_by(q, columns, descending).add_columns(
+        *[c.label(f"sort_key_{i}") for i, c in enumerate(columns)]
+    )
+    # Fetch one extra row to learn whether another page exists
+    rows = q.limit(limit + 1).all()
+    items = [row[0] for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = _encode_cursor(sort, list(rows[limit - 1][1:]))
+    return ListingPage(items, next_cursor)
+
+
+def _paginate_scored(q, scores: dict, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE) -> ListingPage:
+    """Relevance pages for fuzzy search over the FUZZY_CANDIDATE_LIMIT best filtered matches."""
+    _check_limit(limit)
+    ranked = sorted(q.all(), key=lambda l: (-scores[l.id], -l.id))
+    if cursor:
+        score, listing_id = _decode_cursor(cursor, "relevance", 2)
+        ranked = [l for l in ranked if (-scores[l.id], -l.id) > (-score, -listing_id)]
+    items = ranked[:limit]
+    next_cursor = None
+    if len(ranked) > limit:
+        last = items[-1]
+        next_cursor = _encode_cursor("relevance", [float(scores[last.id]), last.id])
+    return ListingPage(items, next_cursor)
+
+
+def get_listings_page(db: Session, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE,
+                      sort: str = "newest") -> ListingPage:
+    """Return one page of listings plus the cursor for the next page (None at the end)."""
+    return _paginate(db.query(Listing), cursor, limit, sort)
+
+
+def search_listings_page(db: Session, keyword: str = None, threshold: int = 60,
+                         min_price: float = None, max_price: float = None,
+                         conditions: list = None, categories: list = None,
+                         fuzzy: bool = False, cursor: str = None,
+                         limit: int = DEFAULT_PAGE_SIZE, sort: str = "relevance",
+                         with_facets: bool = False) -> ListingPage:
+    """
+    Paginated search_listings, ordered by `sort` like search_listings.
+
+    With with_facets=True the page also carries get_search_facets() counts
+    for the same query.
+    """
+    facets = None
+    if with_facets:
+        facets = get_search_facets(db, keyword, threshold, min_price, max_price,
+                                   conditions, categories, fuzzy)
+
+    q = _apply_filters(db.query(Listing), min_price, max_price, conditions, categories)
+    q, scores, rank = _apply_keyword(db, q, keyword, threshold, fuzzy)
+    if q is None:
+        return ListingPage([], None, facets)
+    if scores and sort == "relevance":
+        return _paginate_scored(q, scores, cursor, limit)._replace(facets=facets)
+    return _paginate(q, cursor, limit, sort, rank)._replace(facets=facets)
+
+
+# ====== Faceted Search Counts ======#
+# How many results each category, condition and price bucket would give for
+# the current query, so the sidebar can show counts next to every option.
+#===================================#
+
+# (lower bound inclusive, upper bound exclusive); None means unbounded
+PRICE_BUCKETS = [(0, 25), (25, 50), (50, 100), (100, 250), (250, 500), (500, None)]
+
+
+def _price_bucket_label(low, high) -> str:
+    if high is None:
+        return f"${low}+"
+    if low == 0:
+        return f"Under ${high}"
+    return f"${low}–${high}"
+
+
+def get_search_facets(db: Session, keyword: str = None, threshold: int = 60,
+                      min_price: float = None, max_price: float = None,
+                      conditions: list = None, categories: list = None,
+                      fuzzy: bool = False) -> dict:
+    """
+    Count results per category, condition and price bucket for a search.
+
+    Each facet ignores its own filter but honours the others, so the
+    category counts say how many results picking that category would give
+    with the current condition and price filters. Everything comes from one
+    GROUP BY (category, condition, price bucket, inside price range) pass;
+    the combinations are folded into the three facets in Python.
+
+    Returns {"total": int, "categories": {name: n}, "conditions": {name: n},
+    "price_buckets": [{"label", "min", "max", "count"}, ...]}.
+    """
+    bucket = case(
+        *[(Listing.price < high, i) for i, (_, high) in enumerate(PRICE_BUCKETS) if high is not None],
+        else_=len(PRICE_BUCKETS) - 1,
+    )
+    price_checks = []
+    if min_price is not None:
+        price_checks.append(Listing.price >= min_price)
+    if max_price is not None:
+        price_checks.append(Listing.price <= max_price)
+    in_price = case((and_(*price_checks), 1), else_=0) if price_checks else literal(1)
+
+    q = db.query(
+        Listing.category, Listing.condition,
+        bucket.label("bucket"), in_price.label("in_price"),
+        sqlfunc.count(Listing.id),
+    ).group_by(Listing.category, Listing.condition, "bucket", "in_price")
+    if fuzzy and keyword and keyword.strip():
+        # Count every fuzzy match, not only the capped candidates: the facet
+        # filters are applied in Python below, so none can go in first
+        hits = get_fuzzy_index(db).search(keyword, threshold=threshold)
+        rows = []
+        for start in range(0, len(hits), FUZZY_CANDIDATE_LIMIT):
+            chunk = [listing_id for listing_id, _ in hits[start:start + FUZZY_CANDIDATE_LIMIT]]
+            rows.extend(q.filter(Listing.id.in_(chunk)).all())
+    else:
+        q, _, _ = _apply_keyword(db, q, keyword, threshold, fuzzy)
+        rows = q.all() if q is not None else []
+
+    wanted_categories = set(categories) if categories else None
+    wanted_conditions = set(conditions) if conditions else None
+    by_category = {c: 0 for c in ALLOWED_CATEGORIES}
+    by_condition = {c: 0 for c in ALLOWED_CONDITIONS}
+    by_bucket = [0] * len(PRICE_BUCKETS)
+    total = 0
+
+    for category, condition, bucket_idx, inside, n in rows:
+        category_ok = wanted_categories is None or category in wanted_categories
+        condition_ok = wanted_conditions is None or condition in wanted_conditions
+        if condition_ok and inside:
+            by_category[category] = by_category.get(category, 0) + n
+        if category_ok and inside:
+            by_condition[condition] = by_condition.get(condition, 0) + n
+        if category_ok and condition_ok:
+            by_bucket[bucket_idx] += n
+            if inside:
+                total += n
+
+    return {
+        "total": total,
+        "categories": by_category,
+        "conditions": by_condition,
+        "price_buckets": [
+            {"label": _price_bucket_label(low, high), "min": low, "max": high, "count": n}
+            for (low, high), n in zip(PRICE_BUCKETS, by_bucket)
+        ],
+    }
+
+
+# ====== Search Suggestions ======#
+# Autocomplete for the search boxes, served from the in-memory prefix index
+# in app/autocomplete.py rather than a query per keystroke.
+#=================================#
+
+def get_search_suggestions(db: Session, text: str, limit: int = DEFAULT_SUGGESTIONS) -> list:
+    """Return Suggestion(text, count, kind) completions for a partial query."""
+    return get_autocomplete_index(db).suggest(text, limit)
+
+
+# ====== Cached Listing Reads ======#
+# Run the read functions above through app/result_cache.py so Streamlit
+# reruns that don't change the query skip the database. Results hold
+# ListingSnapshot rows and are shared between sessions: treat them as
+# read-only. Every listing write above invalidates them.
+#==================================#
+
+_CACHEABLE_READS = {get_listings, search_listings, get_listings_page, search_listings_page, get_search_facets}
+
+
+def cached_listing_read(db: Session, read_fn, **params):
+    """
+    Return read_fn(db, **params) from the result cache, computing it on a miss.
+
+    read_fn must be one of get_listings, search_listings, get_listings_page,
+    search_listings_page or get_search_facets. Listings in the result are
+    ListingSnapshot objects rather than ORM rows.
+    """
+    if read_fn not in _CACHEABLE_READS:
+        raise ValueError(f"{getattr(read_fn, '__name__', read_fn)!r} is not a cacheable listing read")
+
+    def compute():
+        result = read_fn(db, **params)
+        if isinstance(result, ListingPage):
+            return result._replace(items=snapshot_listings(db, result.items))
+        if isinstance(result, list):
+            return snapshot_listings(db, result)
+        return result
+
+    return get_result_cache(db).get_or_compute(make_cache_key(read_fn.__name__, params), compute)
+
+
 # ====== Mark Item As Sold Functionality ======#
 # This function allows users to mark their items
 #as sold
@@ -243,3 +606,166 @@ def mark_listing_sold(db: Session, listing_id: int, user_id: int) -> Listing:
     listing.is_sold = True
     db.commit()
     return True
+
+
+# ====== Bulk Listing Operations ======#
+# For seeding and admin cleanups: one transaction and a handful of set-based
+# statements per call instead of a commit (and a refresh or load) per
+# listing. Nothing is written unless every listing passes validation. The
+# rows bypass the ORM flush, so the in-memory search indexes are updated
+# explicitly; the FTS table follows through its SQLite triggers.
+#======================================#
+
+# Ids per IN (...) list; keeps well under SQLite's bound-parameter limit
+BULK_CHUNK_SIZE = 5000
+
+_BULK_FIELDS = {"title", "description", "price", "user_id", "condition", "category",
+                "contact_email", "contact_phone", "image_urls"}
+
+
+def _chunks(ids: list, size: int = BULK_CHUNK_SIZE):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def _bulk_listing_ids(db: Session, listing_ids, user_id: int | None = None) -> list[int]:
+    """The listing_ids that exist; with user_id, ForbiddenAction if any is someone else's."""
+    found = []
+    for chunk in _chunks(sorted(set(listing_ids))):
+        for listing_id, owner_id in db.execute(select(Listing.id, Listing.user_id).where(Listing.id.in_(chunk))):
+            if user_id is not None and owner_id != user_id:
+                raise ForbiddenAction(f"You do not own listing {listing_id}")
+            found.append(listing_id)
+    return found
+
+
+def _insert_listing_rows(db: Session, rows: list[dict]) -> list[int]:
+    """INSERT the rows; returns their ids in row order."""
+    if db.get_bind().dialect.name != "sqlite":
+        return db.scalars(insert(Listing).returning(Listing.id, sort_by_parameter_order=True), rows).all()
+    # SQLite cannot return ids of a multi-row INSERT in a guaranteed order, so
+    # SQLAlchemy would fall back to one INSERT per row. Instead: the first
+    # INSERT takes the database write lock (held until commit) and gets
+    # max(id) + 1, so the other rows can be given the ids after it and go in
+    # as one executemany.
+    first_id = db.scalar(insert(Listing).returning(Listing.id), rows[0])
+    ids = list(range(first_id, first_id + len(rows)))
+    if len(rows) > 1:
+        db.execute(insert(Listing), [dict(row, id=listing_id) for listing_id, row in zip(ids[1:], rows[1:])])
+    return ids
+
+
+def create_listings_bulk(db: Session, listings: list[dict], percolate: bool = True) -> list[int]:
+    """
+    Create many listings (and their images) in one transaction; returns the new ids in input order.
+
+    Each dict takes create_listing's keyword arguments (title, description,
+    price, user_id, condition, category, contact_email, contact_phone,
+    image_urls). All are validated before anything is written; a bad one
+    raises ValueError naming its position. With percolate, saved-search
+    alerts are recorded as create_listing would.
+    """
+    rows, images = [], []
+    for i, data in enumerate(listings):
+        unknown = set(data) - _BULK_FIELDS
+        try:
+            if unknown:
+                raise ValueError(f"Unknown field(s) {sorted(unknown)}")
+            row = validate_listing_fields(data.get("user_id"), data.get("title"), data.get("description"),
+                                          data.get("price"), data.get("condition"), data.get("category"))
+        except ValueError as e:
+            raise ValueError(f"Listing {i}: {e}") from None
+        row["contact_email"] = data.get("contact_email")
+        row["contact_phone"] = data.get("contact_phone")
+        rows.append(row)
+        images.append(data.get("image_urls") or [])
+    if not rows:
+        return []
+
+    try:
+        ids = _insert_listing_rows(db, rows)
+        image_rows = [
+            dict(_image_fields(entry), listing_id=listing_id)
+            for listing_id, entries in zip(ids, images)
+            for entry in entries
+        ]
+        if image_rows:
+            db.execute(insert(Image), image_rows)
+        for listing_id, row in zip(ids, rows):
+            row["id"] = listing_id
+        if percolate:
+            percolate_listings(db, rows)
+        queue_fuzzy_index_changes(db, upserts=((r["id"], r["title"], r["description"]) for r in rows))
+        queue_autocomplete_changes(db, upserts=((r["id"], r["title"], r["category"]) for r in rows))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    bump_catalogue_version(db)
+    return ids
+
+
+def delete_listings_bulk(db: Session, listing_ids, user_id: int | None = None) -> int:
+    """
+    Delete listings with their images, favorites and saved-search alerts in one transaction.
+
+    Messages and reviews that mention a listing are kept with listing_id
+    cleared, and the participants' conversation summaries are rebuilt.
+    Every delete path goes through here (delete_listing is the one-id case),
+    so a deleted listing leaves the same state behind whichever removed it.
+    With user_id, every listing must belong to that user
+    (ForbiddenAction otherwise). Unknown ids are skipped; returns how many
+    listings were deleted. Image files on disk are left to the caller
+    (app.storage.remove_image_files).
+    """
+    try:
+        ids = _bulk_listing_ids(db, listing_ids, user_id)
+        deleted = 0
+        # Clearing listing_id merges these chats into the pair's no-listing
+        # conversation, so both sides' summaries are rebuilt below
+        participants = set()
+        for chunk in _chunks(ids):
+            for sender_id, receiver_id in db.execute(
+                select(Message.sender_id, Message.receiver_id).where(Message.listing_id.in_(chunk)).distinct()
+            ):
+                participants.update((sender_id, receiver_id))
+            db.execute(delete(Image).where(Image.listing_id.in_(chunk)))
+            db.execute(delete(Favorite).where(Favorite.listing_id.in_(chunk)))
+            db.execute(delete(SavedSearchMatch).where(SavedSearchMatch.listing_id.in_(chunk)))
+            db.execute(update(Message).where(Message.listing_id.in_(chunk)).values(listing_id=None))
+            db.execute(update(Review).where(Review.listing_id.in_(chunk)).values(listing_id=None))
+            deleted += db.execute(delete(Listing).where(Listing.id.in_(chunk))).rowcount
+        if participants:
+            rebuild_conversations(db, participants, commit=False)
+        queue_fuzzy_index_changes(db, removals=ids)
+        queue_autocomplete_changes(db, removals=ids)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    if deleted:
+        bump_catalogue_version(db)
+    return deleted
+
+
+def mark_sold_bulk(db: Session, listing_ids, user_id: int | None = None) -> int:
+    """
+    Mark listings sold in one transaction; returns how many changed.
+
+    With user_id, every listing must belong to that user (ForbiddenAction
+    otherwise), as in mark_listing_sold.
+    """
+    try:
+        ids = _bulk_listing_ids(db, listing_ids, user_id)
+        marked = 0
+        for chunk in _chunks(ids):
+            marked += db.execute(
+                update(Listing).where(Listing.id.in_(chunk), Listing.is_sold.is_(False)).values(is_sold=True)
+            ).rowcount
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    if marked:
+        bump_catalogue_version(db)
+    return marked
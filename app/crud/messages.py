@@ -1,8 +1,305 @@
-from sqlalchemy.orm import Session
+from typing import NamedTuple
+from datetime import datetime
+
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import and_, case, delete, func as sqlfunc, insert, literal, or_, select, text, union_all, update
+from app.db import upsert_insert
+from app.models.conversation import Conversation
 from app.models.message import Message
 from app.models.user import User
+from app.models.listing import Listing
 from sqlalchemy.orm import joinedload
 
+# Characters of the latest message kept in conversations.last_message_preview
+PREVIEW_LENGTH = 100
+
+# Shared with app/crud/async_messages.py
+def validate_message_content(content: str):
+    if not content.strip():
+        raise ValueError("Message content cannot be empty")
+
+#====== Conversation Summaries ======#
+# conversations holds one row per participant per (user pair, listing) with
+# the latest message and that participant's unread count, so the Messages
+# sidebar is one index range however long the history is. send_message and
+# mark_as_read keep it current in their own transaction; the statement
+# builders below are shared with app/crud/async_messages.py.
+#====================================#
+
+class ConversationSummary(NamedTuple):
+    other_user_id: int
+    listing_id: int | None
+    other_name: str
+    listing_title: str | None
+    last_message_at: datetime | None
+    preview: str
+    last_sender_id: int
+    unread_count: int
+
+def _conversation_key(user_id: int, other_user_id: int, listing_id: int | None):
+    return and_(
+        Conversation.user_id == user_id,
+        Conversation.other_user_id == other_user_id,
+        # matches the unique index expression, so this is an index seek
+        sqlfunc.coalesce(Conversation.listing_id, 0) == (listing_id or 0),
+    )
+
+# (owner, other user, unread delta) for each conversations row a new message touches
+def conversation_participants(msg: Message) -> list[tuple]:
+    rows = [(msg.sender_id, msg.receiver_id, 0)]
+    if msg.receiver_id != msg.sender_id:
+        rows.append((msg.receiver_id, msg.sender_id, 1))
+    return rows
+
+def _latest_message_values(msg: Message, unread) -> dict:
+    return {
+        "last_message_id": msg.id,
+        "last_message_at": select(Message.created_at).where(Message.id == msg.id).scalar_subquery(),
+        "last_message_preview": msg.content[:PREVIEW_LENGTH],
+        "last_sender_id": msg.sender_id,
+        "unread_count": unread,
+    }
+
+# INSERT ... ON CONFLICT moving a participant's row to a new (flushed)
+# message, creating it for the pair's first message. Keyed on the unique
+# index, so two first messages sent at once cannot both insert.
+def conversation_upsert(dialect_name: str, msg: Message, user_id: int, other_user_id: int, unread: int):
+    stmt = upsert_insert(dialect_name)(Conversation.__table__).values(
+        user_id=user_id, other_user_id=other_user_id, listing_id=msg.listing_id,
+        **_latest_message_values(msg, unread),
+    )
+    return stmt.on_conflict_do_update(
+        # Spelled like ux_conversations_user_other_listing so the index matches
+        index_elements=[Conversation.user_id, Conversation.other_user_id, text("coalesce(listing_id, 0)")],
+        set_={
+            "last_message_id": stmt.excluded.last_message_id,
+            "last_message_at": stmt.excluded.last_message_at,
+            "last_message_preview": stmt.excluded.last_message_preview,
+            "last_sender_id": stmt.excluded.last_sender_id,
+            "unread_count": Conversation.__table__.c.unread_count + stmt.excluded.unread_count,
+        },
+    )
+
+# UPDATE taking a message that was just marked read off its receiver's count
+def conversation_read_update(msg: Message):
+    return (
+        update(Conversation)
+        .where(_conversation_key(msg.receiver_id, msg.sender_id, msg.listing_id),
+               Conversation.unread_count > 0)
+        .values(unread_count=Conversation.unread_count - 1)
+        .execution_options(synchronize_session=False)
+    )
+
+# UPDATE marking other_user_id's messages to user_id in one conversation read,
+# up to and including up_to_id; a range on the history index
+def conversation_read_all_update(user_id: int, other_user_id: int, listing_id: int | None, up_to_id: int):
+    return (
+        update(Message)
+        .where(
+            Message.sender_id == other_user_id,
+            Message.receiver_id == user_id,
+            Message.listing_id == listing_id if listing_id is not None else Message.listing_id.is_(None),
+            Message.id <= up_to_id,
+            Message.is_read.isnot(True),
+        )
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+
+# UPDATE taking count messages just marked read off user_id's unread count
+def conversation_unread_decrement(user_id: int, other_user_id: int, listing_id: int | None, count: int):
+    return (
+        update(Conversation)
+        .where(_conversation_key(user_id, other_user_id, listing_id))
+        .values(unread_count=case((Conversation.unread_count > count, Conversation.unread_count - count), else_=0))
+        .execution_options(synchronize_session=False)
+    )
+
+def _record_message(db: Session, msg: Message):
+    dialect_name = db.get_bind().dialect.name
+    for user_id, other_user_id, unread in conversation_participants(msg):
+        db.execute(conversation_upsert(dialect_name, msg, user_id, other_user_id, unread))
+
+def conversations_query(user_id: int):
+    """A user's conversation summaries, latest message first."""
+    other = aliased(User)
+    return (
+        select(
+            Conversation.other_user_id,
+            Conversation.listing_id,
+            # same fallback order as the pages' get_username; blank names are skipped too
+            sqlfunc.coalesce(sqlfunc.nullif(other.display_name, ""), sqlfunc.nullif(other.full_name, ""), other.email),
+            Listing.title,
+            Conversation.last_message_at,
+            Conversation.last_message_preview,
+            Conversation.last_sender_id,
+            Conversation.unread_count,
+        )
+        .join(other, other.id == Conversation.other_user_id)
+        .outerjoin(Listing, Listing.id == Conversation.listing_id)
+        .where(Conversation.user_id == user_id)
+        # ids grow with time, so this walks ix_conversations_user_id_last_message_id backwards
+        .order_by(Conversation.last_message_id.desc())
+    )
+
+def get_conversations(db: Session, user_id: int) -> list[ConversationSummary]:
+    return [ConversationSummary(*row) for row in db.execute(conversations_query(user_id))]
+
+def unread_count_query(user_id: int):
+    return (
+        select(sqlfunc.coalesce(sqlfunc.sum(Conversation.unread_count), 0))
+        .where(Conversation.user_id == user_id)
+    )
+
+def get_unread_message_count(db: Session, user_id: int) -> int:
+    return db.scalar(unread_count_query(user_id))
+
+def rebuild_conversations(db: Session, user_ids=None, commit: bool = True) -> int:
+    """
+    Recompute conversations rows from the messages table; returns rows written.
+
+    With user_ids, only those users' rows are rebuilt (include both sides of
+    a conversation to fix it for both). commit=False leaves the transaction
+    to the caller.
+    """
+    sent = select(
+        Message.id.label("message_id"), Message.sender_id.label("user_id"),
+        Message.receiver_id.label("other_user_id"), Message.listing_id, literal(0).label("unread"),
+    )
+    received = select(
+        Message.id, Message.receiver_id, Message.sender_id, Message.listing_id,
+        case((Message.is_read.is_(True), 0), else_=1),
+    ).where(Message.receiver_id != Message.sender_id)
+    clear = delete(Conversation)
+    if user_ids is not None:
+        user_ids = list(set(user_ids))
+        if not user_ids:
+            return 0
+        sent = sent.where(Message.sender_id.in_(user_ids))
+        received = received.where(Message.receiver_id.in_(user_ids))
+        clear = clear.where(Conversation.user_id.in_(user_ids))
+    sides = union_all(sent, received).subquery()
+    latest = (
+        select(
+            sides.c.user_id, sides.c.other_user_id,
+            # one listing per group (or all NULL), so max() just picks it
+            sqlfunc.max(sides.c.listing_id).label("listing_id"),
+            sqlfunc.max(sides.c.message_id).label("last_message_id"),
+            sqlfunc.sum(sides.c.unread).label("unread_count"),
+        )
+        .group_by(sides.c.user_id, sides.c.other_user_id, sqlfunc.coalesce(sides.c.listing_id, 0))
+        .subquery()
+    )
+    rows = select(
+        latest.c.user_id, latest.c.other_user_id, latest.c.listing_id, latest.c.last_message_id,
+        Message.created_at, sqlfunc.substr(Message.content, 1, PREVIEW_LENGTH), Message.sender_id,
+        latest.c.unread_count,
+    ).join(Message, Message.id == latest.c.last_message_id)
+    columns = ["user_id", "other_user_id", "listing_id", "last_message_id", "last_message_at",
+               "last_message_preview", "last_sender_id", "unread_count"]
+    try:
+        db.execute(clear)
+        written = db.execute(insert(Conversation).from_select(columns, rows)).rowcount
+        if commit:
+            db.commit()
+    except Exception:
+        if commit:
+            db.rollback()
+        raise
+    return written
+
+#====== Conversation History Pages ======#
+# A chat opens on its latest page and walks back with before_id (the oldest
+# message id already shown). Each direction of the conversation is a seek on
+# ix_messages_sender_id_receiver_id_listing_id_id that stops after limit + 1
+# rows, so a page costs the same however long the history is.
+#========================================#
+
+MESSAGE_PAGE_SIZE = 30
+MAX_MESSAGE_PAGE_SIZE = 200
+
+class MessagePage(NamedTuple):
+    # Oldest first, ready to render top to bottom
+    items: list
+    # Pass back as before_id for the previous page; None at the start of the chat
+    next_before_id: int | None
+
+def _check_message_limit(limit):
+    if not isinstance(limit, int) or limit < 1 or limit > MAX_MESSAGE_PAGE_SIZE:
+        raise ValueError(f"limit must be an integer between 1 and {MAX_MESSAGE_PAGE_SIZE}")
+
+def conversation_page_query(user_id: int, other_user_id: int, listing_id: int | None,
+                            before_id: int | None, limit: int):
+    """Newest-first ids of up to limit + 1 messages of one conversation, older than before_id."""
+    _check_message_limit(limit)
+    directions = [(user_id, other_user_id)]
+    if other_user_id != user_id:
+        directions.append((other_user_id, user_id))
+    branches = []
+    for sender_id, receiver_id in directions:
+        branch = select(Message.id).where(
+            Message.sender_id == sender_id,
+            Message.receiver_id == receiver_id,
+            Message.listing_id == listing_id if listing_id is not None else Message.listing_id.is_(None),
+        )
+        if before_id is not None:
+            branch = branch.where(Message.id < before_id)
+        # Each direction is limited on its own, then the two are merged
+        branches.append(select(branch.order_by(Message.id.desc()).limit(limit + 1).subquery()))
+    ids = union_all(*branches).subquery() if len(branches) > 1 else branches[0].subquery()
+    return select(Message).join(ids, Message.id == ids.c.id).order_by(Message.id.desc()).limit(limit + 1)
+
+def _message_page(rows: list, limit: int) -> MessagePage:
+    items = rows[:limit]
+    next_before_id = items[-1].id if len(rows) > limit else None
+    return MessagePage(items[::-1], next_before_id)
+
+def get_conversation_page(db: Session, user_id: int, other_user_id: int, listing_id: int = None,
+                          before_id: int = None, limit: int = MESSAGE_PAGE_SIZE) -> MessagePage:
+    """The latest limit messages between two users about one listing (or none) before before_id."""
+    rows = db.scalars(conversation_page_query(user_id, other_user_id, listing_id, before_id, limit)).all()
+    return _message_page(rows, limit)
+
+#====== New Message Polling ======#
+# A live chat polls with the highest message id it has seen. Both sides of
+# the user's mail are range seeks on (receiver_id, id) and (sender_id, id),
+# so a tick with nothing new reads no message rows at all.
+#=================================#
+
+def messages_since_query(user_id: int, last_seen_id: int, limit: int):
+    _check_message_limit(limit)
+    return (
+        select(Message)
+        .where(or_(Message.sender_id == user_id, Message.receiver_id == user_id), Message.id > last_seen_id)
+        .order_by(Message.id)
+        .limit(limit)
+    )
+
+def get_messages_since(db: Session, user_id: int, last_seen_id: int,
+                       limit: int = MAX_MESSAGE_PAGE_SIZE) -> list[Message]:
+    """
+    Messages to or from user_id newer than last_seen_id, oldest first.
+
+    At most limit are returned; a full result means there may be more, and
+    the caller should reload rather than keep polling from the last one.
+    """
+    return db.scalars(messages_since_query(user_id, last_seen_id, limit)).all()
+
+def latest_message_id_query(user_id: int):
+    # last entry of the user's inbox index range
+    return (
+        select(Conversation.last_message_id)
+        .where(Conversation.user_id == user_id)
+        .order_by(Conversation.last_message_id.desc())
+        .limit(1)
+    )
+
+def get_latest_message_id(db: Session, user_id: int) -> int:
+    """Highest message id to or from user_id (0 if none): the starting point for polling."""
+    return db.scalar(latest_message_id_query(user_id)) or 0
+
+#====== Messages ======#
+
 def send_message(db: Session, sender_id: int, receiver_id: int, content: str, listing_id: int = None):
 
     # Validate sender
@@ -12,11 +309,12 @@ def send_message(db: Session, sender_id: int, receiver_id: int, content: str, li
     if not db.query(User).filter(User.id == receiver_id).first():
         raise ValueError("Receiver does not exist")
     # Validate content
-    if not content.strip():
-        raise ValueError("Message content cannot be empty")
+    validate_message_content(content)
 
     msg = Message(sender_id=sender_id, receiver_id=receiver_id, content=content, listing_id=listing_id)
     db.add(msg)
+    db.flush()
+    _record_message(db, msg)
     db.commit()
     db.refresh(msg)
     return msg
@@ -29,10 +327,31 @@ def get_user_messages(db: Session, user_id: int):
 def mark_as_read(db: Session, message_id: int):
     msg = db.query(Message).filter(Message.id == message_id).first()
     if msg:
+        if not msg.is_read and msg.sender_id != msg.receiver_id:
+            db.execute(conversation_read_update(msg))
         msg.is_read = True
         db.commit()
     return msg
 
+def mark_conversation_read(db: Session, user_id: int, other_user_id: int, listing_id: int | None,
+                           up_to_id: int) -> int:
+    """
+    Mark the messages other_user_id sent user_id in one conversation read, up to up_to_id.
+
+    One UPDATE over the conversation's history index plus the summary's
+    unread count, in one commit; returns how many messages changed. Pass the
+    newest message id on screen so a message arriving meanwhile stays unread.
+    """
+    try:
+        marked = db.execute(conversation_read_all_update(user_id, other_user_id, listing_id, up_to_id)).rowcount
+        if marked and other_user_id != user_id:
+            db.execute(conversation_unread_decrement(user_id, other_user_id, listing_id, marked))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return marked
+
 def get_received_messages(db: Session, user_id: int):
     """
     Get all messages received by a user, including sender info.
@@ -1,18 +1,55 @@
 from sqlalchemy.orm import Session
+from app.db import upsert_insert
 from app.models.review import Review
 from app.models.listing import Listing
-from sqlalchemy import func as sqlfunc
+from app.models.user_rating_stats import UserRatingStats
+from sqlalchemy import literal, select, func as sqlfunc
 
-# Create a review
-def create_review(db: Session, reviewer_id: int, reviewed_user_id: int, rating: float, 
-                  comment: str = None, listing_id: int = None):
-    """Create a review for a user."""
+
+# Shared with app/crud/async_reviews.py
+def validate_rating(rating):
     if not isinstance(rating, (int, float)):
         raise ValueError("Rating must be a number")
     if rating < 1.0 or rating > 5.0:
         raise ValueError("Rating must be between 1.0 and 5.0")
+
+def validate_review(reviewer_id: int, reviewed_user_id: int, rating):
+    validate_rating(rating)
     if reviewer_id == reviewed_user_id:
         raise ValueError("You cannot review yourself")
+
+# INSERT ... ON CONFLICT applying a review write to user_rating_stats. Run it
+# after the review write is flushed: a user without a stats row gets one
+# summed from their reviews, an existing row moves by the deltas. One
+# statement, so concurrent first reviews cannot both insert.
+def rating_stats_upsert(dialect_name: str, user_id: int, rating_delta: float, count_delta: int):
+    stats = UserRatingStats.__table__
+    totals = select(
+        literal(user_id), sqlfunc.coalesce(sqlfunc.sum(Review.rating), 0.0), sqlfunc.count(Review.id),
+    ).where(Review.reviewed_user_id == user_id)
+    return (
+        upsert_insert(dialect_name)(stats)
+        .from_select(["user_id", "rating_sum", "rating_count"], totals)
+        .on_conflict_do_update(
+            index_elements=[stats.c.user_id],
+            set_={
+                "rating_sum": stats.c.rating_sum + rating_delta,
+                "rating_count": stats.c.rating_count + count_delta,
+            },
+        )
+    )
+
+# Keep user_rating_stats in step with a review write. Runs inside the caller's
+# transaction so the review and the totals commit (or roll back) together.
+def _adjust_rating_stats(db: Session, user_id: int, rating_delta: float, count_delta: int):
+    db.flush()
+    db.execute(rating_stats_upsert(db.get_bind().dialect.name, user_id, rating_delta, count_delta))
+
+# Create a review
+def create_review(db: Session, reviewer_id: int, reviewed_user_id: int, rating: float, 
+                  comment: str = None, listing_id: int = None):
+    """Create a review for a user."""
+    validate_review(reviewer_id, reviewed_user_id, rating)
     
     review = Review(
         reviewer_id=reviewer_id,
@@ -22,6 +59,7 @@ def create_review(db: Session, reviewer_id: int, reviewed_user_id: int, rating:
         listing_id=listing_id
     )
     db.add(review)
+    _adjust_rating_stats(db, reviewed_user_id, float(rating), 1)
     db.commit()
     db.refresh(review)
     return review
@@ -39,8 +77,21 @@ def get_reviews_for_user(db: Session, user_id: int):
 # Get average rating for a user
 def get_user_average_rating(db: Session, user_id: int):
     """Get average rating for a user; returns None if no reviews."""
-    result = db.query(sqlfunc.avg(Review.rating)).filter(Review.reviewed_user_id == user_id).scalar()
-    return result
+    stats = db.get(UserRatingStats, user_id)
+    return stats.average if stats else None
+
+# Get average ratings for several users at once
+def get_average_ratings(db: Session, user_ids) -> dict:
+    """Map user id -> average rating in one primary-key lookup; users without reviews are left out."""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return {}
+    rows = (
+        db.query(UserRatingStats)
+        .filter(UserRatingStats.user_id.in_(user_ids), UserRatingStats.rating_count > 0)
+        .all()
+    )
+    return {stats.user_id: stats.average for stats in rows}
 
 # Delete a review
 def delete_review(db: Session, review_id: int):
@@ -48,6 +99,7 @@ def delete_review(db: Session, review_id: int):
     review = db.query(Review).filter(Review.id == review_id).first()
     if review:
         db.delete(review)
+        _adjust_rating_stats(db, review.reviewed_user_id, -review.rating, -1)
         db.commit()
         return True
     return False
@@ -74,11 +126,10 @@ def update_review(db: Session, review_id: int, rating: float = None, comment: st
         return None
     
     if rating is not None:
-        if not isinstance(rating, (int, float)):
-            raise ValueError("Rating must be a number")
-        if rating < 1.0 or rating > 5.0:
-            raise ValueError("Rating must be between 1.0 and 5.0")
+        validate_rating(rating)
+        rating_delta = float(rating) - review.rating
         review.rating = rating
+        _adjust_rating_stats(db, review.reviewed_user_id, rating_delta, 0)
     
     if comment is not None:
         review.comment = comment
@@ -86,3 +137,24 @@ def update_review(db: Session, review_id: int, rating: float = None, comment: st
     db.commit()
     db.refresh(review)
     return review
+
+# Rebuild user_rating_stats from the reviews table
+def rebuild_rating_stats(db: Session) -> int:
+    """Recompute every user's rating totals from scratch; returns how many rows were wrong."""
+    actual = {
+        user_id: (float(total), count)
+        for user_id, total, count in db.query(
+            Review.reviewed_user_id, sqlfunc.sum(Review.rating), sqlfunc.count(Review.id)
+        ).group_by(Review.reviewed_user_id)
+    }
+    fixed = 0
+    for stats in db.query(UserRatingStats).all():
+        total, count = actual.pop(stats.user_id, (0.0, 0))
+        if (stats.rating_count, round(stats.rating_sum, 6)) != (count, round(total, 6)):
+            stats.rating_sum, stats.rating_count = total, count
+            fixed += 1
+    for user_id, (total, count) in actual.items():
+        db.add(UserRatingStats(user_id=user_id, rating_sum=total, rating_count=count))
+        fixed += 1
+    db.commit()
+    return fixed
@@ -0,0 +1,97 @@
+from sqlalchemy.orm import Session
+
+from app.models.listing import Listing
+from app.models.saved_search import SavedSearch, SavedSearchMatch
+from app.crud.listings import ALLOWED_CATEGORIES, ALLOWED_CONDITIONS
+
+#====== CRUD Operations for Saved Searches ======#
+# Users save the filters they keep re-running on home.py. New listings are
+# matched against every saved search as they are created (see
+# app/saved_search_index.py) and each hit becomes a SavedSearchMatch alert.
+#================================================#
+
+MAX_SAVED_SEARCHES_PER_USER = 20
+
+
+def _clean_choices(values, allowed, label):
+    if not values:
+        return None
+    cleaned = sorted({v.strip() for v in values})
+    for value in cleaned:
+        if value not in allowed:
+            raise ValueError(f"Invalid {label} '{value}'. Allowed: {allowed}")
+    return cleaned
+
+
+def create_saved_search(db: Session, user_id: int, keyword: str = None,
+                        min_price: float = None, max_price: float = None,
+                        conditions: list = None, categories: list = None) -> SavedSearch:
+    """Save a search for user_id; raises ValueError on invalid or empty criteria."""
+    keyword = " ".join(keyword.split()) if keyword else None
+    if min_price is not None and min_price < 0:
+        raise ValueError("Price cannot be negative")
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise ValueError("Min price cannot be greater than max price")
+    conditions = _clean_choices(conditions, ALLOWED_CONDITIONS, "condition")
+    categories = _clean_choices(categories, ALLOWED_CATEGORIES, "category")
+    if not (keyword or min_price is not None or max_price is not None or conditions or categories):
+        raise ValueError("A saved search needs at least one keyword or filter")
+
+    existing = db.query(SavedSearch).filter(SavedSearch.user_id == user_id).count()
+    if existing >= MAX_SAVED_SEARCHES_PER_USER:
+        raise ValueError(f"You can save at most {MAX_SAVED_SEARCHES_PER_USER} searches")
+
+    saved = SavedSearch(
+        user_id=user_id,
+        keyword=keyword,
+        min_price=min_price,
+        max_price=max_price,
+        conditions=conditions,
+        categories=categories,
+    )
+    db.add(saved)
+    db.commit()
+    db.refresh(saved)
+    return saved
+
+
+def get_saved_searches(db: Session, user_id: int):
+    return (
+        db.query(SavedSearch)
+        .filter(SavedSearch.user_id == user_id)
+        .order_by(SavedSearch.id.desc())
+        .all()
+    )
+
+
+def delete_saved_search(db: Session, saved_search_id: int, user_id: int) -> bool:
+    """Delete one of user_id's saved searches (and its alerts); False if not theirs."""
+    saved = db.get(SavedSearch, saved_search_id)
+    if saved is None or saved.user_id != user_id:
+        return False
+    db.delete(saved)
+    db.commit()
+    return True
+
+
+def get_saved_search_matches(db: Session, user_id: int, unread_only: bool = True, limit: int = 50):
+    """A user's saved-search alerts, newest first, skipping deleted listings."""
+    q = (
+        db.query(SavedSearchMatch)
+        .join(Listing, Listing.id == SavedSearchMatch.listing_id)
+        .filter(SavedSearchMatch.user_id == user_id)
+    )
+    if unread_only:
+        q = q.filter(SavedSearchMatch.is_read.is_(False))
+    return q.order_by(SavedSearchMatch.id.desc()).limit(limit).all()
+
+
+def mark_saved_search_matches_read(db: Session, user_id: int) -> int:
+    """Mark all of a user's alerts as read; returns how many changed."""
+    updated = (
+        db.query(SavedSearchMatch)
+        .filter(SavedSearchMatch.user_id == user_id, SavedSearchMatch.is_read.is_(False))
+        .update({SavedSearchMatch.is_read: True}, synchronize_session=False)
+    )
+    db.commit()
+    return updated
@@ -1,15 +1,222 @@
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from pathlib import Path
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+
+from app.pool_metrics import TimedQueuePool
+from app.query_metrics import instrument_engine
 
 # Allow override, but default to a shared, pre-seeded database file
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./campus_market_global.db")
+# Optional replica for page reads; see the read/write routing section below
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL", "")
+
+#====== SQLite Connection Profile ======#
+# Applied to every new SQLite connection. synchronous=NORMAL drops the fsync
+# per commit, and busy_timeout makes a writer wait for the lock instead of
+# failing with "database is locked". Each PRAGMA can be overridden with its
+# env var; set one to an empty string to leave SQLite's default alone.
+# The journal mode is opt-in: WAL is persistent, so setting it would convert
+# the checked-in database file for good and leave committed rows in -wal/-shm
+# side files. SQLITE_JOURNAL_MODE=WAL lets readers keep going while one
+# session writes; use it on a server's own database file.
+#=======================================#
+
+# pragma -> (env var, default)
+SQLITE_PRAGMA_DEFAULTS = {
+    "journal_mode": ("SQLITE_JOURNAL_MODE", ""),         # keep the file's own mode
+    "synchronous": ("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": ("SQLITE_BUSY_TIMEOUT_MS", "5000"),
+    "cache_size": ("SQLITE_CACHE_SIZE", "-20000"),      # negative = KiB, so ~20 MB
+    "mmap_size": ("SQLITE_MMAP_SIZE", "268435456"),      # 256 MB
+    "temp_store": ("SQLITE_TEMP_STORE", "MEMORY"),
+}
+
+_PRAGMA_CHOICES = {
+    "journal_mode": {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"},
+    "synchronous": {"OFF", "NORMAL", "FULL", "EXTRA"},
+    "temp_store": {"DEFAULT", "FILE", "MEMORY"},
+}
+
+
+def sqlite_pragmas_from_env(environ=None) -> dict:
+    """Read the PRAGMA profile from the environment; raises ValueError on bad values."""
+    environ = os.environ if environ is None else environ
+    pragmas = {}
+    for name, (var, default) in SQLITE_PRAGMA_DEFAULTS.items():
+        value = environ.get(var, default).strip()
+        if not value:
+            continue
+        if name in _PRAGMA_CHOICES:
+            value = value.upper()
+            if value not in _PRAGMA_CHOICES[name]:
+                raise ValueError(f"Invalid {var} '{value}'. Allowed: {sorted(_PRAGMA_CHOICES[name])}")
+        else:
+            try:
+                value = int(value)
+            except ValueError:
+                raise ValueError(f"{var} must be an integer")
+        pragmas[name] = value
+    return pragmas
+
+
+def apply_sqlite_pragmas(engine, pragmas: dict):
+    """Run the given PRAGMAs on every new DBAPI connection of a SQLite engine."""
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+
+#====== Connection Pool ======#
+# Pool sizing for the shared engine, mostly for a real server behind
+# DATABASE_URL (Postgres). Checkouts are timed by app.pool_metrics; read the
+# numbers with app.pool_metrics.get_pool_stats(engine). In-memory SQLite keeps
+# SQLAlchemy's single-connection pool.
+#=============================#
+
+# create_engine option -> (env var, default)
+POOL_OPTION_DEFAULTS = {
+    "pool_size": ("DB_POOL_SIZE", "5"),
+    "max_overflow": ("DB_MAX_OVERFLOW", "10"),
+    "pool_timeout": ("DB_POOL_TIMEOUT", "30"),
+    "pool_recycle": ("DB_POOL_RECYCLE", "1800"),
+    "pool_pre_ping": ("DB_POOL_PRE_PING", "true"),
+}
+
+
+def pool_options_from_env(environ=None) -> dict:
+    """Read pool settings from the environment; raises ValueError on bad values."""
+    environ = os.environ if environ is None else environ
+    options = {}
+    for name, (var, default) in POOL_OPTION_DEFAULTS.items():
+        value = environ.get(var, default).strip().lower()
+        if name == "pool_pre_ping":
+            if value not in ("true", "false", "1", "0", "yes", "no"):
+                raise ValueError(f"{var} must be true or false")
+            options[name] = value in ("true", "1", "yes")
+            continue
+        try:
+            options[name] = float(value) if name == "pool_timeout" else int(value)
+        except ValueError:
+            raise ValueError(f"{var} must be a number")
+        if options[name] < 0 and name != "pool_recycle":
+            raise ValueError(f"{var} cannot be negative")
+    return options
+
+
+def _is_memory_sqlite(url) -> bool:
+    url = make_url(url)
+    return url.get_backend_name() == "sqlite" and (
+        url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+    )
+
+
+def build_engine(url: str, sqlite_pragmas: dict | None = None, pool_options: dict | None = None):
+    """
+    Create an engine for url.
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    SQLite connections get the given PRAGMA profile; pool_options (see
+    POOL_OPTION_DEFAULTS) switch to a TimedQueuePool of that size. Statements
+    are counted into the active app.query_metrics request profile.
+    """
+    kwargs = {}
+    if make_url(url).get_backend_name() == "sqlite":
+        kwargs["connect_args"] = {"check_same_thread": False}
+    if pool_options and not _is_memory_sqlite(url):
+        kwargs.update(pool_options, poolclass=TimedQueuePool)
+    engine = create_engine(url, **kwargs)
+    apply_sqlite_pragmas(engine, sqlite_pragmas)
+    instrument_engine(engine)
+    return engine
+
+
+#====== Read/Write Routing ======#
+# SessionLocal is for anything that writes. ReadSessionLocal is for page
+# rendering: it points at READ_DATABASE_URL when set (a replica), otherwise
+# at the same SQLite file opened read-only (mode=ro plus query_only), so
+# readers never take a write lock. Read sessions never autoflush or expire on
+# commit and refuse to flush changes.
+#
+# Per-database caches (result cache, search indexes) are keyed on the write
+# engine: use session_engine(db) so reads and writes share them. Other
+# engines on the same database (the read engine, the backend's async engine)
+# are mapped to it with share_caches.
+#================================#
+
+# read or async engine -> the write engine it mirrors
+_primaries = WeakKeyDictionary()
+
+
+def share_caches(engine, primary):
+    """Key engine's per-database caches and indexes on primary, an engine on the same database."""
+    _primaries[engine] = primary
+
+
+class ReadOnlySession(Session):
+    """Session for ReadSessionLocal; raises instead of writing."""
+
+    def flush(self, objects=None):
+        if self.new or self.deleted or self.dirty:
+            raise RuntimeError("Read-only session: use SessionLocal for writes")
+
+
+def _read_only_sqlite_url(url) -> str:
+    path = Path(make_url(url).database).resolve()
+    return f"sqlite:///{path.as_uri()}?mode=ro&uri=true"
+
+
+def build_read_engine(write_engine, url: str | None = None, sqlite_pragmas: dict | None = None,
+                      pool_options: dict | None = None):
+    """
+    Engine for read sessions: url if given, else write_engine's SQLite file
+    opened read-only, else write_engine itself (in-memory SQLite, or a
+    server without a replica).
+    """
+    write_url = write_engine.url.render_as_string(hide_password=False)
+    if not url:
+        if write_engine.dialect.name != "sqlite" or _is_memory_sqlite(write_url):
+            return write_engine
+        url = _read_only_sqlite_url(write_url)
+    if make_url(url).get_backend_name() == "sqlite":
+        # journal_mode is a write; a read-only connection inherits the file's mode
+        sqlite_pragmas = {k: v for k, v in (sqlite_pragmas or {}).items() if k != "journal_mode"}
+        sqlite_pragmas["query_only"] = 1
+    read_engine = build_engine(url, sqlite_pragmas, pool_options)
+    share_caches(read_engine, write_engine)
+    return read_engine
+
+
+def session_engine(db) -> object:
+    """The write engine behind a session, also for sessions on a read engine."""
+    bind = db.get_bind()
+    engine = getattr(bind, "engine", bind)
+    return _primaries.get(engine, engine)
+
+
+def upsert_insert(dialect_name: str):
+    """The dialect's insert(), the one with on_conflict_do_update (PostgreSQL or SQLite)."""
+    return postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+
+
+engine = build_engine(DATABASE_URL, sqlite_pragmas_from_env(), pool_options_from_env())
+read_engine = build_read_engine(engine, READ_DATABASE_URL, sqlite_pragmas_from_env(), pool_options_from_env())
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(bind=read_engine, class_=ReadOnlySession,
+                                autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
-Base.metadata.create_all(bind=engine)
-
-# IMPORTANT: Import models so tables get created
+# Tables are created by app.schema.ensure_schema (once per process), not here.
+# Favorite is still registered on import: other models refer to it by name.
 from app.models.favorite import Favorite
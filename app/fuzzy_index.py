@@ -0,0 +1,239 @@
+"""
+In-memory fuzzy matcher for listing titles and descriptions.
+
+Rather than scoring every listing with rapidfuzz one row at a time, the index
+keeps the vocabulary of distinct words across all listings plus an inverted
+index (word -> listing ids). A query is scored against the whole vocabulary in
+a single ``rapidfuzz.process.cdist`` call and the matching words are mapped
+back to listings through their postings. The vocabulary grows much more slowly
+than the catalogue, so a lookup stays in the low milliseconds at 100k listings.
+
+One index is built per engine on first use (app/index_registry.py). Session
+hooks then apply committed Listing inserts, updates and deletes to it; it is
+only reloaded once it expires, to pick up other processes' writes.
+"""
+import re
+import threading
+
+import numpy as np
+from rapidfuzz import fuzz, process
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.index_registry import IndexRegistry
+from app.models.listing import Listing
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+# Single characters match too much to be useful as fuzzy terms
+MIN_TOKEN_LENGTH = 2
+
+_PENDING_KEY = "fuzzy_index_pending"
+
+
+def tokenize(text: str | None) -> set[str]:
+    """Lowercase word set used both for indexing and for queries."""
+    if not text:
+        return set()
+    return {t for t in _TOKEN_RE.findall(text.lower()) if len(t) >= MIN_TOKEN_LENGTH}
+
+
+class FuzzyListingIndex:
+    """Vocabulary + postings over listing text, scored with one batched cdist.
+
+    Listings live in dense integer slots so that per-word postings can be
+    kept as numpy arrays and combined without Python-level loops over ids.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._slot_of: dict[int, int] = {}       # listing id -> slot
+        self._ids = np.empty(1024, dtype=np.int64)  # slot -> listing id (-1 if free)
+        self._n_slots = 0
+        self._free: list[int] = []
+        self._slot_tokens: dict[int, set[str]] = {}
+        self._postings: dict[str, set[int]] = {}  # word -> slots
+        self._arrays: dict[str, np.ndarray] = {}  # word -> cached slot array
+        self._vocab: list[str] = []
+        self._vocab_dirty = False
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    def load(self, rows):
+        """Index an iterable of (listing_id, title, description) rows."""
+        with self._lock:
+            for listing_id, title, description in rows:
+                self._remove(listing_id)
+                self._add(listing_id, tokenize(title) | tokenize(description))
+
+    def upsert(self, listing_id: int, title: str | None, description: str | None):
+        """Add a listing or replace its indexed text."""
+        tokens = tokenize(title) | tokenize(description)
+        with self._lock:
+            self._remove(listing_id)
+            self._add(listing_id, tokens)
+
+    def remove(self, listing_id: int):
+        with self._lock:
+            self._remove(listing_id)
+
+    def _add(self, listing_id, tokens):
+        if self._free:
+            slot = self._free.pop()
+            self._ids[slot] = listing_id
+        else:
+            slot = self._n_slots
+            if slot == len(self._ids):
+                self._ids = np.resize(self._ids, 2 * len(self._ids))
+            self._ids[slot] = listing_id
+            self._n_slots += 1
+        self._slot_of[listing_id] = slot
+        self._slot_tokens[slot] = tokens
+        for tok in tokens:
+            slots = self._postings.get(tok)
+            if slots is None:
+                self._postings[tok] = {slot}
+                self._vocab_dirty = True
+            else:
+                slots.add(slot)
+                self._arrays.pop(tok, None)
+
+    def _remove(self, listing_id):
+        slot = self._slot_of.pop(listing_id, None)
+        if slot is None:
+            return
+        for tok in self._slot_tokens.pop(slot):
+            slots = self._postings[tok]
+            slots.discard(slot)
+            self._arrays.pop(tok, None)
+            if not slots:
+                del self._postings[tok]
+                self._vocab_dirty = True
+        self._ids[slot] = -1
+        self._free.append(slot)
+
+    def _slots_for(self, tok) -> np.ndarray:
+        arr = self._arrays.get(tok)
+        if arr is None:
+            arr = np.fromiter(self._postings[tok], dtype=np.int64)
+            self._arrays[tok] = arr
+        return arr
+
+    def search(self, query: str, threshold: int = 60, limit: int | None = None) -> list[tuple[int, float]]:
+        """Return (listing_id, score) pairs with score >= threshold, best first.
+
+        Each query word takes the best ``fuzz.ratio`` of any word in the
+        listing; the listing's score is the mean over the query words, so a
+        listing must fuzzily contain most of the query to pass the threshold.
+        """
+        q_tokens = sorted(tokenize(query))
+        if not q_tokens:
+            return []
+
+        with self._lock:
+            if self._vocab_dirty:
+                self._vocab = list(self._postings)
+                self._vocab_dirty = False
+            vocab = self._vocab
+            if not vocab:
+                return []
+            # One batched call: rows are query words, columns vocabulary words
+            matrix = process.cdist(
+                q_tokens, vocab, scorer=fuzz.ratio, processor=None,
+                score_cutoff=threshold, workers=-1,
+            )
+
+            n_slots = self._n_slots
+            totals = np.zeros(n_slots, dtype=np.float32)
+            for row in matrix:
+                cols = row.nonzero()[0]
+                if len(cols) == 0:
+                    continue
+                if len(cols) == 1:
+                    # Common case: a word matches one vocabulary entry
+                    totals[self._slots_for(vocab[cols[0]])] += row[cols[0]]
+                    continue
+                best = np.zeros(n_slots, dtype=np.float32)
+                for col in cols:
+                    slots = self._slots_for(vocab[col])
+                    best[slots] = np.maximum(best[slots], row[col])
+                totals += best
+
+            scores = totals / len(q_tokens)
+            # totals > 0 also skips free slots when threshold is 0
+            hit_slots = np.flatnonzero((scores >= threshold) & (totals > 0))
+            hit_ids = self._ids[hit_slots]
+
+        hit_scores = scores[hit_slots]
+        # Best score first, listing id as a stable tie-breaker
+        order = np.lexsort((hit_ids, -hit_scores))
+        if limit:
+            order = order[:limit]
+        return list(zip(hit_ids[order].tolist(), hit_scores[order].tolist()))
+
+
+def _load_index(db: Session) -> FuzzyListingIndex:
+    index = FuzzyListingIndex()
+    index.load(db.execute(select(Listing.id, Listing.title, Listing.description)))
+    return index
+
+
+def _apply_changes(index: FuzzyListingIndex, changes):
+    for op, listing_id, title, description in changes:
+        if op == "remove":
+            index.remove(listing_id)
+        else:
+            index.upsert(listing_id, title, description)
+
+
+_registry = IndexRegistry(_load_index, _apply_changes)
+
+
+def get_fuzzy_index(db: Session) -> FuzzyListingIndex:
+    """Return the index for the session's database, loading it on first use."""
+    return _registry.get(db)
+
+
+def reset_fuzzy_index(engine):
+    """Drop the cached index so the next search reloads it from the database.
+
+    Only needed after writes that bypass the ORM (bulk ``query().delete()``,
+    raw SQL).
+    """
+    _registry.reset(engine)
+
+
+def queue_listing_changes(session: Session, upserts=(), removals=()):
+    """
+    Queue index updates for listing writes that bypass the ORM flush (bulk
+    INSERT/DELETE statements). They are applied on commit, or dropped on
+    rollback, like the ORM changes below. upserts are (id, title, description) rows.
+    """
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    pending.extend(("upsert", listing_id, title, description) for listing_id, title, description in upserts)
+    pending.extend(("remove", listing_id, None, None) for listing_id in removals)
+
+
+# ---- keep loaded indexes in sync with committed ORM writes ----
+
+@event.listens_for(Session, "after_flush")
+def _collect_listing_changes(session, flush_context):
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    for obj in session.new | session.dirty:
+        if isinstance(obj, Listing):
+            pending.append(("upsert", obj.id, obj.title, obj.description))
+    for obj in session.deleted:
+        if isinstance(obj, Listing):
+            pending.append(("remove", obj.id, None, None))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_listing_changes(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        _registry.apply(session, pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_listing_changes(session):
+    session.info.pop(_PENDING_KEY, None)
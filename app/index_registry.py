@@ -0,0 +1,93 @@
+"""
+Per-database registry for the in-memory indexes (fuzzy search, autocomplete,
+saved-search percolation).
+
+Each index is loaded from the database on first use and then kept current by
+session hooks that hand it committed changes. Loads run outside the registry
+lock (under AsyncSession.run_sync the read yields to the event loop, and a
+request waiting on the lock would block it), so changes committed while a
+load is in flight are buffered and replayed onto the new index before it is
+published.
+
+Writes made by other processes never reach this process's hooks. An index
+older than ``ttl`` seconds is reloaded on next use to pick them up; callers
+keep getting the old one while the reload runs.
+"""
+import threading
+import time
+from weakref import WeakKeyDictionary
+
+from app.db import session_engine
+
+DEFAULT_INDEX_TTL_SECONDS = 300.0
+
+
+class IndexRegistry:
+    """
+    Loaded indexes keyed by engine.
+
+    build(db) returns a freshly loaded index; apply(index, changes) applies a
+    list of committed changes to one. Both are supplied by the index module.
+    """
+
+    def __init__(self, build, apply, ttl: float = DEFAULT_INDEX_TTL_SECONDS, clock=time.monotonic):
+        self._build = build
+        self._apply = apply
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        # engine -> (index, loaded_at)
+        self._entries = WeakKeyDictionary()
+        # engine -> change buffers of the loads in flight
+        self._loading = WeakKeyDictionary()
+
+    def get(self, db):
+        """Return the index for the session's database, loading it if missing or expired."""
+        engine = session_engine(db)
+        with self._lock:
+            entry = self._entries.get(engine)
+            if entry is not None and (engine in self._loading or self._clock() - entry[1] < self.ttl):
+                return entry[0]
+            buffer = []
+            self._loading.setdefault(engine, []).append(buffer)
+
+        started = self._clock()
+        try:
+            index = self._build(db)
+        except BaseException:
+            with self._lock:
+                self._finish_load(engine, buffer)
+            raise
+        with self._lock:
+            self._finish_load(engine, buffer)
+            # Replay under the lock so later commits find the published index
+            self._apply(index, buffer)
+            current = self._entries.get(engine)
+            # Concurrent loads race; the one that started last wins
+            if current is None or current[1] <= started:
+                self._entries[engine] = (index, started)
+            else:
+                index = current[0]
+        return index
+
+    def _finish_load(self, engine, buffer):
+        buffers = [b for b in self._loading[engine] if b is not buffer]
+        if buffers:
+            self._loading[engine] = buffers
+        else:
+            del self._loading[engine]
+
+    def apply(self, session, changes):
+        """Apply a committed session's changes to the loaded index, if any."""
+        engine = session_engine(session)
+        with self._lock:
+            entry = self._entries.get(engine)
+            for buffer in self._loading.get(engine, ()):
+                buffer.extend(changes)
+        if entry is not None:
+            self._apply(entry[0], changes)
+
+    def reset(self, engine):
+        """Drop the loaded index so the next use reloads it from the database."""
+        with self._lock:
+            self._entries.pop(engine, None)
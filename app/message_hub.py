@@ -0,0 +1,100 @@
+"""
+In-process pub/sub hub that pushes message events to connected clients.
+
+The FastAPI backend's event stream (``GET /users/{id}/events``, Server-Sent
+Events) subscribes a connection to its user id; the async messages CRUD
+publishes each new message to both participants and the receiver's new
+unread total once the message has committed.
+
+Every subscription owns a bounded queue (``SUBSCRIBER_QUEUE_SIZE``).
+Publishing never waits on a client: when a slow reader's queue is full its
+backlog is dropped and replaced by a single ``resync`` event, telling the
+client to catch up through ``/users/{id}/messages/since``. Memory per
+connection stays bounded and one stalled client cannot hold up the rest.
+
+The hub lives in one process and one event loop: clients only hear about
+messages sent through the same uvicorn worker. The Streamlit pages poll
+instead (pages/5_Messages.py).
+"""
+import asyncio
+import os
+from collections import defaultdict
+
+# Events buffered per connection before its backlog is replaced by a resync
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))
+
+RESYNC_EVENT = {"type": "resync"}
+
+
+class Subscription:
+    """One connection's view of a user's events."""
+
+    def __init__(self, user_id: int, maxsize: int):
+        self.user_id = user_id
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        # times this connection fell behind and was told to resync
+        self.overflows = 0
+
+    def offer(self, event: dict) -> bool:
+        """Queue event without waiting; on overflow swap the backlog for a resync. False if dropped."""
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC_EVENT)
+            self.overflows += 1
+            return False
+
+    async def get(self) -> dict:
+        return await self.queue.get()
+
+
+class MessageHub:
+    """Fan events out to every subscription of a user id."""
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        # user id -> that user's live subscriptions
+        self._subscribers = defaultdict(set)
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, user_id: int) -> Subscription:
+        sub = Subscription(user_id, self.queue_size)
+        self._subscribers[user_id].add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        subs = self._subscribers.get(sub.user_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._subscribers[sub.user_id]
+
+    def has_subscribers(self, user_id: int) -> bool:
+        return user_id in self._subscribers
+
+    def publish(self, user_id: int, event: dict) -> int:
+        """Queue event for each of user_id's connections; returns how many took it."""
+        delivered = 0
+        for sub in list(self._subscribers.get(user_id, ())):
+            if sub.offer(event):
+                delivered += 1
+            else:
+                self.dropped += 1
+        self.published += 1
+        return delivered
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._subscribers),
+            "connections": sum(len(subs) for subs in self._subscribers.values()),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+# The backend's hub; tests build their own MessageHub
+hub = MessageHub()
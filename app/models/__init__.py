@@ -2,6 +2,10 @@ from .user import ORMBase, User
 from .user import User
 from .listing import Listing
 from .image import Image
+from .saved_search import SavedSearch, SavedSearchMatch
+from .user_rating_stats import UserRatingStats
+from .message import Message
+from .conversation import Conversation
 
 
 __all__ = ["ORMBase", "User"]
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, text
+from app.db import Base
+
+class Conversation(Base):
+    """One participant's view of a conversation: the Messages sidebar row.
+
+    A conversation is a user pair plus the listing it is about (or none).
+    Each has two rows, one per participant, so a user's inbox is a single
+    index range and each side keeps its own unread count. Maintained by
+    app/crud/messages.py in the same transaction as each message write;
+    rebuild with `python -m scripts.backfill_conversations`.
+    """
+    __tablename__ = "conversations"
+    __table_args__ = (
+        # Inbox: a user's conversations, most recent message first
+        Index("ix_conversations_user_id_last_message_id", "user_id", "last_message_id"),
+        # One row per (participant, other user, listing); chats without a
+        # listing share the key 0 since NULLs never collide in a unique index
+        Index("ux_conversations_user_other_listing", "user_id", "other_user_id",
+              text("coalesce(listing_id, 0)"), unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    # The participant this row belongs to
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    other_user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    listing_id = Column(Integer, ForeignKey("listings.id"), nullable=True)
+
+    # Message ids only grow, so the last id also orders the inbox
+    last_message_id = Column(Integer, ForeignKey("messages.id"), nullable=False)
+    last_message_at = Column(DateTime(timezone=True), nullable=True)
+    last_message_preview = Column(String(120), nullable=False, default="", server_default="")
+    last_sender_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Messages to user_id in this conversation not yet marked read
+    unread_count = Column(Integer, nullable=False, default=0, server_default="0")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -7,6 +7,11 @@ from app.db import Base
 
 class Favorite(Base):
     __tablename__ = "favorites"
+    __table_args__ = (
+        # is_favorited / get_user_favorites
+        Index("ix_favorites_user_id_listing_id", "user_id", "listing_id"),
+        Index("ix_favorites_listing_id", "listing_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
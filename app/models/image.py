@@ -7,7 +7,10 @@ class Image(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     url = Column(String(255), nullable=False)
-    listing_id = Column(Integer, ForeignKey("listings.id", ondelete="CASCADE"))
+    # Downscaled WebP copies written by app.storage; None for older uploads
+    thumbnail_url = Column(String(255), nullable=True)
+    display_url = Column(String(255), nullable=True)
+    listing_id = Column(Integer, ForeignKey("listings.id", ondelete="CASCADE"), index=True)
 
     # Back-reference to listing
     listing = relationship("Listing", back_populates="images")
@@ -1,9 +1,19 @@
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime,ForeignKey, func, Boolean
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime,ForeignKey, func, Boolean, Index
 from sqlalchemy.orm import relationship
 from app.db import Base
 
 class Listing(Base):
     __tablename__ = "listings"
+    # Composite indexes matched to the filters in app/crud/listings.py and the
+    # profile pages; the trailing id keeps "newest first" pages in index order.
+    __table_args__ = (
+        Index("ix_listings_user_id_id", "user_id", "id"),
+        Index("ix_listings_category_id", "category", "id"),
+        Index("ix_listings_condition_id", "condition", "id"),
+        Index("ix_listings_price_id", "price", "id"),
+        # Price sorts inside one category (e.g. cheapest Books first)
+        Index("ix_listings_category_price_id", "category", "price", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(100), nullable=False)
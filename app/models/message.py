@@ -1,9 +1,20 @@
-from sqlalchemy import Column, Integer, Text, ForeignKey, DateTime, Boolean, func
+from sqlalchemy import Column, Integer, Text, ForeignKey, DateTime, Boolean, func, Index
 from sqlalchemy.orm import relationship
 from app.db import Base
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        # get_user_messages ORs these two; each side is read in created_at order
+        Index("ix_messages_sender_id_created_at", "sender_id", "created_at"),
+        Index("ix_messages_receiver_id_created_at", "receiver_id", "created_at"),
+        Index("ix_messages_listing_id", "listing_id"),
+        # get_messages_since: each side of a user's mail from the last id seen
+        Index("ix_messages_sender_id_id", "sender_id", "id"),
+        Index("ix_messages_receiver_id_id", "receiver_id", "id"),
+        # One direction of one conversation, newest id first: get_conversation_page
+        Index("ix_messages_sender_id_receiver_id_listing_id_id", "sender_id", "receiver_id", "listing_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     sender_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -1,9 +1,15 @@
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, func, Index
 from sqlalchemy.orm import relationship
 from app.db import Base
 
 class Review(Base):
     __tablename__ = "reviews"
+    __table_args__ = (
+        # get_reviews_for_user / get_user_average_rating
+        Index("ix_reviews_reviewed_user_id_created_at", "reviewed_user_id", "created_at"),
+        # has_user_reviewed
+        Index("ix_reviews_reviewer_id_reviewed_user_id", "reviewer_id", "reviewed_user_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     # Reviewer (the user leaving the review)
@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, JSON, func, Index
+from sqlalchemy.orm import relationship
+from app.db import Base
+
+class SavedSearch(Base):
+    __tablename__ = "saved_searches"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    # Same criteria as search_listings; None / empty means "any"
+    keyword = Column(String(200), nullable=True)
+    min_price = Column(Float, nullable=True)
+    max_price = Column(Float, nullable=True)
+    conditions = Column(JSON, nullable=True)
+    categories = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    user = relationship("User", backref="saved_searches")
+    matches = relationship("SavedSearchMatch", back_populates="saved_search", cascade="all, delete-orphan")
+
+
+class SavedSearchMatch(Base):
+    """A new listing that matched a saved search: the owner's notification."""
+    __tablename__ = "saved_search_matches"
+    __table_args__ = (
+        # get_saved_search_matches: a user's unread alerts, newest first
+        Index("ix_saved_search_matches_user_id_is_read_id", "user_id", "is_read", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    saved_search_id = Column(Integer, ForeignKey("saved_searches.id", ondelete="CASCADE"), nullable=False, index=True)
+    listing_id = Column(Integer, ForeignKey("listings.id", ondelete="CASCADE"), nullable=False)
+    # Copied from the saved search so a user's alerts are one index lookup
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    is_read = Column(Boolean, nullable=False, default=False, server_default="0")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    saved_search = relationship("SavedSearch", back_populates="matches")
+    listing = relationship("Listing")
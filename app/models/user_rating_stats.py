@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey
+from app.db import Base
+
+class UserRatingStats(Base):
+    """Running totals of the reviews a user has received.
+
+    Maintained by app/crud/reviews.py in the same transaction as each review
+    write; rebuild with `python -m scripts.backfill_rating_stats`.
+    """
+    __tablename__ = "user_rating_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    rating_sum = Column(Float, nullable=False, default=0.0, server_default="0")
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    @property
+    def average(self):
+        return self.rating_sum / self.rating_count if self.rating_count else None
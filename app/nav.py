@@ -2,6 +2,8 @@ import json
 import os
 import streamlit as st
 
+from app.query_metrics import end_request
+
 ADMIN_CONFIG_PATH = os.path.join("config", "admins.json")
 
 NAV_ITEMS = [
@@ -63,3 +65,25 @@ def render_nav_sidebar():
             st.page_link(ADMIN_ITEM["path"], label=ADMIN_ITEM["label"], icon=None)
 
         st.divider()
+
+
+def _query_panel_enabled() -> bool:
+    return _is_admin_user() or os.getenv("SQL_DEBUG_PANEL", "").strip().lower() in ("1", "true", "on", "yes")
+
+
+def render_query_panel():
+    """
+    Finish this rerun's SQL profile (see app.query_metrics.begin_request) and,
+    for admins or with SQL_DEBUG_PANEL=on, offer a sidebar toggle to show it.
+    Call at the very end of the page.
+    """
+    profile = end_request()
+    if profile is None or not _query_panel_enabled():
+        return
+    if not st.sidebar.toggle("Show SQL stats", key="show_sql_stats"):
+        return
+    summary = profile.summary()
+    with st.sidebar.expander(f"SQL: {summary['queries']} queries, {summary['sql_ms']:.1f} ms", expanded=True):
+        for entry in summary["n_plus_one"]:
+            st.warning(f"Possible N+1: {entry['count']}x {entry['fingerprint'][:200]}")
+        st.dataframe(profile.top(15), use_container_width=True, hide_index=True)
@@ -0,0 +1,96 @@
+"""
+Connection-pool metrics for the shared engine.
+
+The app engine uses ``TimedQueuePool``, a QueuePool that records how long
+each checkout waited for a connection (including opening a new one) in a
+small histogram, and counts checkouts that gave up with a pool timeout.
+``get_pool_stats`` combines that with the pool's live counters (checked out,
+overflow, idle) into a plain dict an admin page or metrics endpoint can show.
+"""
+import bisect
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+# Upper bounds of the wait-time histogram buckets, in milliseconds; the last
+# bucket counts everything slower
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class PoolMetrics:
+    """Thread-safe checkout counters and wait-time histogram."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_counts = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        bucket = bisect.bisect_left(WAIT_BUCKETS_MS, seconds * 1000.0)
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self.wait_counts[bucket] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            waits = self.checkouts + self.timeouts
+            labels = [f"<={ms}ms" for ms in WAIT_BUCKETS_MS] + [f">{WAIT_BUCKETS_MS[-1]}ms"]
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total / waits * 1000.0, 3) if waits else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000.0, 3),
+                "wait_histogram": dict(zip(labels, self.wait_counts)),
+            }
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that feeds checkout wait times into a PoolMetrics."""
+
+    def __init__(self, *args, metrics: PoolMetrics | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = metrics or PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - start)
+        return conn
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep counting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def get_pool_stats(engine) -> dict:
+    """Live pool counters plus checkout metrics (when the pool records them)."""
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            max_overflow=pool._max_overflow,
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+        )
+    metrics = getattr(pool, "metrics", None)
+    if isinstance(metrics, PoolMetrics):
+        stats.update(metrics.snapshot())
+    return stats
@@ -0,0 +1,162 @@
+"""
+Per-request SQL metrics and an N+1 detector.
+
+``instrument_engine`` hooks an engine's before/after_cursor_execute events.
+While a request profile is active (``begin_request`` / ``end_request``, or the
+``profile_request`` context manager), every statement is timed and counted
+under its fingerprint: the SQL with literals and IN-list lengths normalized
+away, so the same query with different parameters lands in one bucket. A
+fingerprint run ``N_PLUS_ONE_THRESHOLD`` times or more in one request is
+flagged as a likely N+1 (one query per row instead of one per page).
+
+The active profile is held in a ContextVar: a Streamlit rerun (its own script
+thread) and a FastAPI request (its own task) each see only their own queries.
+Outside a profile the hooks do nothing beyond one ContextVar lookup.
+
+Finished profiles are logged as one JSON line on the ``campus_market.sql``
+logger, at WARNING when an N+1 pattern was seen.
+"""
+import json
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from weakref import WeakSet
+
+from sqlalchemy import event
+
+logger = logging.getLogger("campus_market.sql")
+
+# Same fingerprint this many times in one request counts as an N+1 pattern
+N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+
+_current = ContextVar("query_profile", default=None)
+_instrumented = WeakSet()
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Normalize a SQL statement so repeats with other parameters compare equal."""
+    sql = _STRING_RE.sub("?", statement)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("(?+)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+class QueryProfile:
+    """Statement counts and timings for one logical request."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.elapsed = None
+        self.count = 0
+        self.total = 0.0
+        # fingerprint -> [count, total seconds]
+        self.fingerprints = {}
+
+    def record(self, statement: str, seconds: float):
+        stats = self.fingerprints.setdefault(fingerprint(statement), [0, 0.0])
+        stats[0] += 1
+        stats[1] += seconds
+        self.count += 1
+        self.total += seconds
+
+    def n_plus_one(self, threshold: int = None) -> list[dict]:
+        """Fingerprints repeated at least threshold times, most repeated first."""
+        threshold = N_PLUS_ONE_THRESHOLD if threshold is None else threshold
+        return [entry for entry in self.top() if entry["count"] >= threshold]
+
+    def top(self, limit: int = None) -> list[dict]:
+        """Fingerprints by count, then by time spent."""
+        ranked = sorted(self.fingerprints.items(), key=lambda kv: (-kv[1][0], -kv[1][1]))
+        return [
+            {"fingerprint": fp, "count": count, "total_ms": round(seconds * 1000.0, 3)}
+            for fp, (count, seconds) in ranked[:limit]
+        ]
+
+    def summary(self) -> dict:
+        elapsed = self.elapsed if self.elapsed is not None else time.perf_counter() - self.started
+        return {
+            "event": "sql_profile",
+            "request": self.name,
+            "queries": self.count,
+            "distinct": len(self.fingerprints),
+            "sql_ms": round(self.total * 1000.0, 3),
+            "request_ms": round(elapsed * 1000.0, 3),
+            "n_plus_one": self.n_plus_one(),
+        }
+
+
+def instrument_engine(engine):
+    """Record this engine's statements into the active profile; safe to call twice."""
+    if engine in _instrumented:
+        return
+    _instrumented.add(engine)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        profile = _current.get()
+        if profile is not None and context is not None:
+            context._query_profile = (profile, time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_query_profile", None)
+        if started is not None:
+            profile, start = started
+            profile.record(statement, time.perf_counter() - start)
+
+
+def current_profile() -> QueryProfile | None:
+    return _current.get()
+
+
+def begin_request(name: str) -> QueryProfile:
+    """
+    Start profiling a request in the current context.
+
+    A profile still open here (a Streamlit rerun cut short by st.stop or
+    st.rerun) is finished and logged first.
+    """
+    end_request()
+    profile = QueryProfile(name)
+    _current.set(profile)
+    return profile
+
+
+def end_request() -> QueryProfile | None:
+    """Finish and log the current context's profile; None if there was none."""
+    profile = _current.get()
+    if profile is None:
+        return None
+    _current.set(None)
+    profile.elapsed = time.perf_counter() - profile.started
+    _log(profile)
+    return profile
+
+
+@contextmanager
+def profile_request(name: str):
+    """Profile the statements run inside the block."""
+    profile = QueryProfile(name)
+    token = _current.set(profile)
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+        profile.elapsed = time.perf_counter() - profile.started
+        _log(profile)
+
+
+def _log(profile: QueryProfile):
+    summary = profile.summary()
+    level = logging.WARNING if summary["n_plus_one"] else logging.INFO
+    if logger.isEnabledFor(level):
+        logger.log(level, json.dumps(summary))
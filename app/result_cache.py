@@ -0,0 +1,201 @@
+"""
+Shared result cache for listing reads.
+
+Streamlit reruns the whole page on every click (next image, favorite heart),
+which used to repeat the same listing search each time. Results are cached
+here keyed on the normalized query parameters, in a bounded LRU with a TTL.
+
+Every listing write bumps a per-engine catalogue version
+(``bump_catalogue_version``); entries remember the version they were computed
+at and are discarded once it moves on, so a user never sees their own edit
+missing. Committed ORM changes to listings and images bump it from session
+hooks, whichever code path made them; bulk statements that bypass the flush
+call it themselves. The TTL bounds staleness for writes made by other processes.
+
+Cached values hold ``ListingSnapshot`` rows instead of ORM objects: snapshots
+are immutable and not bound to a Session, so one cached result can be handed
+to every Streamlit session at once.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.db import session_engine
+from app.models.image import Image
+from app.models.listing import Listing
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_TTL_SECONDS = 30.0
+
+_CHANGED_KEY = "result_cache_catalogue_changed"
+
+# engine -> ResultCache
+_caches = WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class ImageSnapshot:
+    id: int
+    url: str
+    thumbnail_url: str | None = None
+    display_url: str | None = None
+
+
+@dataclass(frozen=True)
+class ListingSnapshot:
+    """Read-only copy of a Listing row (and its images) safe to share across sessions."""
+    id: int
+    title: str
+    description: str
+    price: float
+    condition: str
+    category: str
+    is_sold: bool
+    user_id: int
+    created_at: datetime | None
+    contact_email: str | None
+    contact_phone: str | None
+    images: tuple[ImageSnapshot, ...] = ()
+
+
+def snapshot_listings(db: Session, listings) -> list[ListingSnapshot]:
+    """Snapshot listings, loading all their images in one query."""
+    listings = list(listings)
+    images = {l.id: [] for l in listings}
+    if images:
+        rows = db.execute(
+            select(Image.listing_id, Image.id, Image.url, Image.thumbnail_url, Image.display_url)
+            .where(Image.listing_id.in_(images))
+            .order_by(Image.id)
+        )
+        for listing_id, *image in rows:
+            images[listing_id].append(ImageSnapshot(*image))
+    return [
+        ListingSnapshot(
+            id=l.id, title=l.title, description=l.description, price=l.price,
+            condition=l.condition, category=l.category, is_sold=bool(l.is_sold),
+            user_id=l.user_id, created_at=l.created_at, contact_email=l.contact_email,
+            contact_phone=l.contact_phone, images=tuple(images[l.id]),
+        )
+        for l in listings
+    ]
+
+
+def make_cache_key(name: str, params: dict) -> tuple:
+    """
+    Normalize query parameters into a hashable key.
+
+    Keywords are case- and whitespace-insensitive, filter lists are
+    order-insensitive and empty filters count as no filter, so equivalent
+    searches share one entry.
+    """
+    items = []
+    for param, value in sorted(params.items()):
+        if param == "keyword" and isinstance(value, str):
+            value = " ".join(value.lower().split()) or None
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            value = tuple(sorted(set(value))) or None
+        items.append((param, value))
+    return (name, tuple(items))
+
+
+class ResultCache:
+    """Thread-safe LRU of query results with a TTL and a catalogue version."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl: float = DEFAULT_TTL_SECONDS, clock=time.monotonic):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (version, expires_at, value), least recently used first
+        self._entries = OrderedDict()
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def bump_version(self):
+        """Invalidate every entry; called after each listing write."""
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, or store and return compute()."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                version, expires_at, value = entry
+                if version == self.version and self._clock() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            version = self.version
+
+        # Run the query outside the lock so other sessions are not blocked
+        value = compute()
+
+        with self._lock:
+            # A write landed while computing: the result may already be stale
+            if version == self.version:
+                self._entries[key] = (version, self._clock() + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+
+def get_result_cache(db: Session) -> ResultCache:
+    """Return the cache for the session's database, creating it on first use."""
+    engine = session_engine(db)
+    with _caches_lock:
+        cache = _caches.get(engine)
+        if cache is None:
+            cache = _caches[engine] = ResultCache()
+    return cache
+
+
+def bump_catalogue_version(db: Session):
+    """Mark cached listing results for this database as out of date."""
+    engine = session_engine(db)
+    with _caches_lock:
+        cache = _caches.get(engine)
+    if cache is not None:
+        cache.bump_version()
+
+
+# ---- bump the version for every committed ORM write to the catalogue ----
+
+@event.listens_for(Session, "after_flush")
+def _note_catalogue_changes(session, flush_context):
+    if any(isinstance(obj, (Listing, Image)) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info[_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session):
+    if session.info.pop(_CHANGED_KEY, False):
+        bump_catalogue_version(session)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_catalogue_changes(session):
+    session.info.pop(_CHANGED_KEY, None)
@@ -0,0 +1,219 @@
+"""
+Percolator for saved searches: match one new listing against every saved query.
+
+Running each saved search again whenever a listing is created would cost one
+query per saved search. Instead the queries themselves are indexed. Each is
+filed under a single anchor: its longest keyword word, or failing that its
+categories, its conditions, or a small "matches anything" bucket for
+price-only searches. A new listing looks up the anchors it could satisfy
+(every prefix of every word in its title and description, its category and
+condition) and only those candidate queries are checked in full.
+
+Matching follows search_listings with the full-text index: every keyword word
+must prefix some word of the title or description, and the price bounds are
+inclusive.
+
+Like app/fuzzy_index.py, one index is loaded per engine on first use
+(app/index_registry.py), and session hooks keep it in sync with committed
+SavedSearch writes.
+"""
+import re
+import threading
+import unicodedata
+from typing import NamedTuple
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.orm import Session
+
+from app.index_registry import IndexRegistry
+from app.models.listing import Listing
+from app.models.saved_search import SavedSearch, SavedSearchMatch
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_PENDING_KEY = "saved_search_index_pending"
+
+
+def _words(text: str | None) -> list[str]:
+    """Lowercase, accent-folded words (mirrors the FTS unicode61 tokenizer)."""
+    if not text:
+        return []
+    folded = unicodedata.normalize("NFKD", text.lower())
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    return _TOKEN_RE.findall(folded)
+
+
+class CompiledQuery(NamedTuple):
+    id: int
+    user_id: int
+    terms: tuple
+    min_price: float | None
+    max_price: float | None
+    conditions: frozenset | None
+    categories: frozenset | None
+
+    @classmethod
+    def from_saved_search(cls, s):
+        return cls(
+            s.id, s.user_id, tuple(sorted(set(_words(s.keyword)))),
+            s.min_price, s.max_price,
+            frozenset(s.conditions) if s.conditions else None,
+            frozenset(s.categories) if s.categories else None,
+        )
+
+    def matches(self, words: set, price, condition, category) -> bool:
+        if self.min_price is not None and price < self.min_price:
+            return False
+        if self.max_price is not None and price > self.max_price:
+            return False
+        if self.conditions is not None and condition not in self.conditions:
+            return False
+        if self.categories is not None and category not in self.categories:
+            return False
+        return all(any(w.startswith(t) for w in words) for t in self.terms)
+
+
+class SavedSearchIndex:
+    """Saved queries filed under one anchor each."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queries = {}        # saved search id -> CompiledQuery
+        self._by_term = {}        # keyword word -> query ids
+        self._by_category = {}    # category -> query ids
+        self._by_condition = {}   # condition -> query ids
+        self._unanchored = set()  # price-only queries
+
+    def __len__(self):
+        return len(self._queries)
+
+    def _buckets(self, query):
+        if query.terms:
+            # Longest word: the rarest prefix, so the fewest false candidates
+            return [self._by_term.setdefault(max(query.terms, key=len), set())]
+        if query.categories:
+            return [self._by_category.setdefault(c, set()) for c in query.categories]
+        if query.conditions:
+            return [self._by_condition.setdefault(c, set()) for c in query.conditions]
+        return [self._unanchored]
+
+    def add(self, query: CompiledQuery):
+        with self._lock:
+            self._discard(query.id)
+            self._queries[query.id] = query
+            for bucket in self._buckets(query):
+                bucket.add(query.id)
+
+    def remove(self, query_id: int):
+        with self._lock:
+            self._discard(query_id)
+
+    def _discard(self, query_id):
+        query = self._queries.pop(query_id, None)
+        if query is not None:
+            for bucket in self._buckets(query):
+                bucket.discard(query_id)
+
+    def match(self, title, description, price, condition, category) -> list[CompiledQuery]:
+        """Return the saved queries a listing with these fields satisfies."""
+        words = set(_words(title)) | set(_words(description))
+        with self._lock:
+            candidates = set(self._unanchored)
+            candidates |= self._by_category.get(category, set())
+            candidates |= self._by_condition.get(condition, set())
+            by_term = self._by_term
+            for word in words:
+                for end in range(1, len(word) + 1):
+                    ids = by_term.get(word[:end])
+                    if ids:
+                        candidates |= ids
+            queries = [self._queries[qid] for qid in candidates]
+        return [q for q in queries if q.matches(words, price, condition, category)]
+
+
+def _load_index(db: Session) -> SavedSearchIndex:
+    index = SavedSearchIndex()
+    for saved in db.execute(select(SavedSearch)).scalars():
+        index.add(CompiledQuery.from_saved_search(saved))
+    return index
+
+
+def _apply_changes(index: SavedSearchIndex, changes):
+    for op, value in changes:
+        if op == "remove":
+            index.remove(value)
+        else:
+            index.add(value)
+
+
+_registry = IndexRegistry(_load_index, _apply_changes)
+
+
+def get_saved_search_index(db: Session) -> SavedSearchIndex:
+    """Return the index for the session's database, loading it on first use."""
+    return _registry.get(db)
+
+
+def percolate_listing(db: Session, listing: Listing) -> list[SavedSearchMatch]:
+    """
+    Record a SavedSearchMatch for every saved search the listing satisfies.
+
+    The seller's own saved searches are skipped. The matches are added to the
+    caller's transaction (no commit) and returned; the listing must be flushed.
+    """
+    hits = get_saved_search_index(db).match(
+        listing.title, listing.description, listing.price, listing.condition, listing.category,
+    )
+    matches = [
+        SavedSearchMatch(saved_search_id=q.id, listing_id=listing.id, user_id=q.user_id)
+        for q in hits if q.user_id != listing.user_id
+    ]
+    db.add_all(matches)
+    return matches
+
+
+def percolate_listings(db: Session, rows) -> int:
+    """
+    Bulk percolate_listing for listings inserted without the ORM.
+
+    rows are mappings with id, user_id, title, description, price, condition
+    and category. Matches are inserted in one executemany inside the caller's
+    transaction (no commit); returns how many were recorded.
+    """
+    index = get_saved_search_index(db)
+    if not len(index):
+        return 0
+    matches = [
+        {"saved_search_id": q.id, "listing_id": row["id"], "user_id": q.user_id}
+        for row in rows
+        for q in index.match(row["title"], row["description"], row["price"], row["condition"], row["category"])
+        if q.user_id != row["user_id"]
+    ]
+    if matches:
+        db.execute(insert(SavedSearchMatch), matches)
+    return len(matches)
+
+
+# ---- keep loaded indexes in sync with committed ORM writes ----
+
+@event.listens_for(Session, "after_flush")
+def _collect_saved_search_changes(session, flush_context):
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    for obj in session.new | session.dirty:
+        if isinstance(obj, SavedSearch):
+            pending.append(("add", CompiledQuery.from_saved_search(obj)))
+    for obj in session.deleted:
+        if isinstance(obj, SavedSearch):
+            pending.append(("remove", obj.id))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_saved_search_changes(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        _registry.apply(session, pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_saved_search_changes(session):
+    session.info.pop(_PENDING_KEY, None)
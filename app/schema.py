@@ -0,0 +1,101 @@
+"""
+One-time schema bootstrap for the app's database.
+
+The pages used to run ``Base.metadata.create_all``, a ``PRAGMA table_info``
+column check and the FTS check on every Streamlit rerun: DDL and a write
+transaction per click. ``ensure_schema`` does that work once per process and
+database URL; later calls are a set lookup and touch no database.
+
+Deployments that manage the schema with Alembic (``alembic upgrade head``)
+can set SCHEMA_BOOTSTRAP=off to skip it entirely.
+"""
+import os
+import threading
+
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
+
+from app.db import Base
+# Every model must be imported so create_all knows its table
+from app.models import Conversation, Image, Listing, SavedSearch, SavedSearchMatch, User, UserRatingStats  # noqa: F401
+from app.models.favorite import Favorite  # noqa: F401
+from app.models.message import Message  # noqa: F401
+from app.models.review import Review  # noqa: F401
+from app.crud.messages import rebuild_conversations
+from app.crud.reviews import rebuild_rating_stats
+from app.search_index import ensure_listing_fts
+
+# Columns added after a table first shipped: create_all does not alter
+# existing tables, so older SQLite files get them with ALTER TABLE.
+# table -> column -> column DDL
+LEGACY_COLUMNS = {
+    "listings": {"category": "VARCHAR(50) NOT NULL DEFAULT 'Other'"},
+    "images": {"thumbnail_url": "VARCHAR(255)", "display_url": "VARCHAR(255)"},
+}
+
+# rendered DB URLs already bootstrapped in this process
+_done = set()
+_lock = threading.Lock()
+
+
+def _bootstrap_enabled() -> bool:
+    return os.getenv("SCHEMA_BOOTSTRAP", "on").strip().lower() not in ("off", "0", "false", "no")
+
+
+def _add_legacy_columns(engine) -> list[str]:
+    added = []
+    existing_tables = set(inspect(engine).get_table_names())
+    with engine.begin() as conn:
+        for table, columns in LEGACY_COLUMNS.items():
+            if table not in existing_tables:
+                continue
+            present = {col["name"] for col in inspect(conn).get_columns(table)}
+            for name, ddl in columns.items():
+                if name not in present:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+                    added.append(f"{table}.{name}")
+    return added
+
+
+def _create_missing_indexes(engine):
+    # create_all only indexes the tables it creates; indexes added to a model
+    # later reach existing databases here. IF NOT EXISTS rather than
+    # checkfirst: the inspector does not see SQLite expression indexes.
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                conn.execute(CreateIndex(index, if_not_exists=True))
+
+
+def bootstrap_schema(engine) -> list[str]:
+    """Create missing tables, legacy columns, model indexes and the FTS index; returns columns added."""
+    existing_tables = set(inspect(engine).get_table_names())
+    Base.metadata.create_all(bind=engine)
+    # Summary tables created next to existing data start out empty; fill them
+    # so the Messages sidebar and profile ratings show what is already there
+    if "messages" in existing_tables and "conversations" not in existing_tables:
+        with Session(bind=engine) as db:
+            rebuild_conversations(db)
+    if "reviews" in existing_tables and "user_rating_stats" not in existing_tables:
+        with Session(bind=engine) as db:
+            rebuild_rating_stats(db)
+    added = _add_legacy_columns(engine) if engine.dialect.name == "sqlite" else []
+    # after the legacy columns, which some indexes cover
+    _create_missing_indexes(engine)
+    ensure_listing_fts(engine)
+    return added
+
+
+def ensure_schema(engine) -> bool:
+    """Bootstrap engine's database once per process; True if this call did the work."""
+    key = engine.url.render_as_string(hide_password=False)
+    if key in _done:
+        return False
+    with _lock:
+        if key in _done:
+            return False
+        if _bootstrap_enabled():
+            bootstrap_schema(engine)
+        _done.add(key)
+    return True
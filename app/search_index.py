@@ -0,0 +1,149 @@
+"""
+SQLite FTS5 full-text index over listing titles and descriptions.
+
+The index is an external-content FTS5 table (``listings_fts``) whose rowid is
+the listing id. Triggers on ``listings`` keep it in sync, so every insert,
+update and delete issued by the listings CRUD (or anything else) is reflected
+without extra application code.
+
+On other database engines the helpers report the index as unavailable and
+callers fall back to plain ``ILIKE`` matching.
+"""
+import re
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import column, event, func, literal_column, table, text
+from sqlalchemy.exc import OperationalError
+
+from app.db import session_engine
+from app.models.listing import Listing
+
+FTS_TABLE = "listings_fts"
+
+# Relative BM25 weights for (title, description). A hit in the title is a much
+# stronger signal than a passing mention in the description.
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+_CREATE_STATEMENTS = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description,
+        content='listings', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS listings_fts_ai AFTER INSERT ON listings BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS listings_fts_ad AFTER DELETE ON listings BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS listings_fts_au AFTER UPDATE OF title, description ON listings BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+]
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_fts_table = table(FTS_TABLE, column("rowid"))
+
+# engine -> bool; whether the FTS table exists on that database
+_available = WeakKeyDictionary()
+
+
+def _create_index(connection) -> bool:
+    """Create the FTS table and triggers and (re)build it from ``listings``."""
+    try:
+        for stmt in _CREATE_STATEMENTS:
+            connection.exec_driver_sql(stmt)
+        connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    except OperationalError:
+        # SQLite build without the fts5 module
+        return False
+    return True
+
+
+@event.listens_for(Listing.__table__, "after_create")
+def _on_listings_created(target, connection, **kw):
+    if connection.dialect.name != "sqlite":
+        return
+    _available[connection.engine] = _create_index(connection)
+
+
+@event.listens_for(Listing.__table__, "after_drop")
+def _on_listings_dropped(target, connection, **kw):
+    if connection.dialect.name != "sqlite":
+        return
+    connection.exec_driver_sql(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    _available.pop(connection.engine, None)
+
+
+def ensure_listing_fts(engine) -> bool:
+    """Create and populate the FTS index on an existing SQLite database.
+
+    New databases get the index from ``Base.metadata.create_all``; this is for
+    databases whose ``listings`` table predates it. Returns True if the index
+    is usable afterwards.
+    """
+    if engine.dialect.name != "sqlite":
+        return False
+    with engine.begin() as conn:
+        exists = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+        ).first()
+        ok = True if exists else _create_index(conn)
+    _available[engine] = ok
+    return ok
+
+
+def fts_available(db) -> bool:
+    """Return True if the session's database has the listings FTS index."""
+    engine = session_engine(db)
+    if engine.dialect.name != "sqlite":
+        return False
+    cached = _available.get(engine)
+    if cached is None:
+        cached = db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE},
+        ).first() is not None
+        _available[engine] = cached
+    return cached
+
+
+def build_match_query(keyword: str) -> str:
+    """Turn free text into an FTS5 MATCH expression.
+
+    Each word becomes a quoted prefix term and terms are ANDed, so
+    "calc text" matches "Calculus Textbook". Returns "" if the input has no
+    searchable words.
+    """
+    tokens = _TOKEN_RE.findall(keyword.lower())
+    return " ".join(f'"{tok}"*' for tok in tokens)
+
+
+def bm25_rank():
+    """BM25 score of the matched FTS row; lower is a better match."""
+    return func.bm25(literal_column(FTS_TABLE), TITLE_WEIGHT, DESCRIPTION_WEIGHT)
+
+
+def apply_fts_match(q, match_query: str, rank: bool = True):
+    """Restrict a ``Listing`` query to FTS hits, best BM25 score first unless rank=False."""
+    fts = literal_column(FTS_TABLE)
+    q = q.join(_fts_table, _fts_table.c.rowid == Listing.id).filter(fts.op("MATCH")(match_query))
+    if rank:
+        q = q.order_by(bm25_rank())
+    return q
@@ -5,7 +5,11 @@ Configure with env var UPLOADS_BASE_DIR (defaults to "uploads").
 All helpers ensure target directories exist.
 """
 import os
+import uuid
 from pathlib import Path
+from typing import NamedTuple
+
+from PIL import Image as PILImage, ImageOps
 
 
 def get_upload_root() -> str:
@@ -24,3 +28,83 @@ def get_upload_subdir(subdir: str | None = None) -> str:
 def build_upload_path(subdir: str | None, filename: str) -> str:
     target_dir = Path(get_upload_subdir(subdir))
     return str(target_dir / filename)
+
+
+#====== Listing Image Variants ======#
+# Pages never show the full-resolution upload: each saved image gets
+# downscaled WebP copies next to it, recorded on the Image row, and the pages
+# render those instead of decoding a multi-megabyte JPEG on every rerun.
+#====================================#
+
+# variant name -> longest side in pixels
+IMAGE_VARIANTS = {"thumbnail": 320, "display": 960}
+VARIANT_FORMAT = "WEBP"
+VARIANT_EXTENSION = ".webp"
+VARIANT_QUALITY = 80
+
+
+class StoredImage(NamedTuple):
+    """An uploaded image and its variants; a variant is None if it could not be made."""
+    url: str
+    thumbnail_url: str | None = None
+    display_url: str | None = None
+
+
+def variant_path(original_path: str, variant: str) -> str:
+    """Where the given variant of original_path lives (same folder, .webp)."""
+    base, _ = os.path.splitext(original_path)
+    return f"{base}_{variant}{VARIANT_EXTENSION}"
+
+
+def generate_image_variants(original_path: str) -> StoredImage:
+    """
+    Write the IMAGE_VARIANTS of original_path and return their paths.
+
+    The original is decoded once, at reduced scale where the format allows it
+    (JPEG draft mode), and each variant is resized from the next larger one.
+    Files PIL cannot read are returned without variants.
+    """
+    paths = {}
+    try:
+        with PILImage.open(original_path) as img:
+            largest = max(IMAGE_VARIANTS.values())
+            img.draft("RGB", (largest, largest))
+            img = ImageOps.exif_transpose(img).convert("RGB")
+            for variant, size in sorted(IMAGE_VARIANTS.items(), key=lambda item: -item[1]):
+                img.thumbnail((size, size), PILImage.Resampling.LANCZOS)
+                path = variant_path(original_path, variant)
+                img.save(path, VARIANT_FORMAT, quality=VARIANT_QUALITY, method=4)
+                paths[variant] = path
+    except (OSError, PILImage.DecompressionBombError):
+        for path in paths.values():
+            _remove_quietly(path)
+        return StoredImage(original_path)
+    return StoredImage(original_path, paths["thumbnail"], paths["display"])
+
+
+def save_listing_image(data: bytes, filename: str, subdir: str = "listing_images") -> StoredImage:
+    """Store an uploaded listing photo under a fresh name and generate its variants."""
+    ext = os.path.splitext(filename)[1].lower()
+    path = build_upload_path(subdir, f"{uuid.uuid4().hex}{ext}")
+    with open(path, "wb") as f:
+        f.write(data)
+    return generate_image_variants(path)
+
+
+def image_variant_url(image, variant: str = "display") -> str:
+    """Path of an Image's variant, or of the original if it has none (older uploads)."""
+    return getattr(image, f"{variant}_url", None) or image.url
+
+
+def remove_image_files(image) -> list[str]:
+    """Delete an Image's original and variant files; returns the paths removed."""
+    paths = [image.url] + [getattr(image, f"{variant}_url", None) for variant in IMAGE_VARIANTS]
+    return [path for path in paths if path and _remove_quietly(path)]
+
+
+def _remove_quietly(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
@@ -1,20 +1,26 @@
 import streamlit as st
-from PIL import Image
 import os
-import base64
-from app.db import Base, engine, SessionLocal
-from app.nav import render_nav_sidebar
+from app.db import engine, SessionLocal, ReadSessionLocal
+from app.nav import render_nav_sidebar, render_query_panel
+from app.query_metrics import begin_request
 from app.models.listing import Listing
 from app.models.image import Image as ImageModel
 from app.crud.listings import (
-    create_listing, get_listings, delete_listing, search_listings,
-    mark_listing_sold, ForbiddenAction, update_listing, ALLOWED_CONDITIONS
+    create_listing, get_listings_page, delete_listing, search_listings_page,
+    get_search_facets, get_search_suggestions, cached_listing_read, mark_listing_sold, ForbiddenAction, update_listing, ALLOWED_CONDITIONS
 )
-from app.crud.listings import ALLOWED_CATEGORIES
+from app.crud.listings import ALLOWED_CATEGORIES, ALLOWED_SORTS
 from app.models.message import Message
 from app.models.user import User
-from app.crud.reviews import get_reviews_for_user, get_user_average_rating
-from app.crud.favorites import is_favorited, add_favorite, remove_favorite
+from app.crud.favorites import add_favorite, remove_favorite
+from app.crud.feed import build_listing_cards
+from app.schema import ensure_schema
+from app.storage import image_variant_url
+from app.avatars import avatar_data_uri
+from app.crud.saved_searches import (
+    create_saved_search, get_saved_searches, delete_saved_search,
+    get_saved_search_matches, mark_saved_search_matches_read,
+)
 
 
 st.set_page_config(page_title="Campus Market", layout="wide")
@@ -23,19 +29,11 @@ st.set_page_config(page_title="Campus Market", layout="wide")
 render_nav_sidebar()
 
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Count this rerun's SQL; render_query_panel() at the end reports it
+begin_request("home")
 
-# Ensure 'category' column exists in SQLite DB
-from sqlalchemy import text
-with engine.begin() as conn:
-    try:
-        cols = [row[1] for row in conn.execute(text("PRAGMA table_info(listings);"))]
-        if "category" not in cols:
-            # Add column with default 'Other' for existing rows
-            conn.execute(text("ALTER TABLE listings ADD COLUMN category VARCHAR(50) NOT NULL DEFAULT 'Other';"))
-    except Exception:
-        pass
+# Create/upgrade tables once per process (no-op on later reruns)
+ensure_schema(engine)
 
 # ======= Global Styles (center content, tidy buttons, subtle card) ======= #
 st.markdown(
@@ -272,9 +270,31 @@ st.markdown(
     """,
     unsafe_allow_html=True,
 )
-# Start session
+# Start sessions: reads render the page, writes only open a connection when a button needs one
+read_db = ReadSessionLocal()
 db = SessionLocal()
 
+# --- Search suggestions (autocomplete chips under the search boxes) ---
+def apply_suggestion(state_key, suggestion):
+    if suggestion.kind == "category":
+        # Picking a category filters by it instead of searching for its name
+        chosen = st.session_state.get("filter_categories", [])
+        st.session_state["filter_categories"] = chosen + [suggestion.text] if suggestion.text not in chosen else chosen
+        st.session_state[state_key] = ""
+    else:
+        st.session_state[state_key] = suggestion.text
+
+def render_suggestions(container, text, state_key):
+    typed = " ".join((text or "").lower().split())
+    suggestions = [s for s in get_search_suggestions(read_db, text, limit=5) if s.text != typed]
+    if not suggestions:
+        return
+    container.caption("Suggestions")
+    for i, s in enumerate(suggestions):
+        label = f"in {s.text} ({s.count})" if s.kind == "category" else f"{s.text} ({s.count})"
+        container.button(label, key=f"suggest_{state_key}_{i}", on_click=apply_suggestion,
+                         args=(state_key, s), use_container_width=True)
+
 # --- Sidebar search controls ---
 st.sidebar.header("Advanced Search")
 search_query = st.sidebar.text_input(
@@ -282,6 +302,7 @@ search_query = st.sidebar.text_input(
     placeholder="e.g. textbook, laptop",
     key="sidebar_search_input",
 )
+render_suggestions(st.sidebar, search_query, "sidebar_search_input")
 
 # If the sidebar query changes, clear the main search box/state to avoid conflicts
 prev_sidebar_query = st.session_state.get("_prev_sidebar_query")
@@ -309,7 +330,19 @@ min_price = min_price if min_price is not None else float("0")
 max_price = max_price if max_price is not None else float("inf")
 
 conditions = st.sidebar.multiselect("Condition", ALLOWED_CONDITIONS)
-categories = st.sidebar.multiselect("Category", ALLOWED_CATEGORIES)
+condition_counts_slot = st.sidebar.empty()
+categories = st.sidebar.multiselect("Category", ALLOWED_CATEGORIES, key="filter_categories")
+category_counts_slot = st.sidebar.empty()
+price_counts_slot = st.sidebar.empty()
+
+SORT_LABELS = {
+    "relevance": "Best match",
+    "newest": "Newest",
+    "oldest": "Oldest",
+    "price_asc": "Price: low to high",
+    "price_desc": "Price: high to low",
+}
+sort = st.sidebar.selectbox("Sort by", ALLOWED_SORTS, format_func=SORT_LABELS.get, key="listing_sort")
 
 # Use get() method to safely access session state
 search_initiated = st.session_state.get('search_initiated', False)
@@ -356,6 +389,7 @@ else:
     main_search_query = st.session_state.get('main_search_query', '')
     if main_search_query:
         st.write(f"Showing results for: **{main_search_query}**")
+        render_suggestions(st.container(), main_search_query, "main_search_query")
     else:
         st.write("Browse all listings below:")
 
@@ -374,17 +408,96 @@ has_search_criteria = (
     categories
 )
 
+search_kwargs = dict(
+    keyword=active_search_query if active_search_query else None,
+    min_price=min_price if min_price > 0 else None,
+    max_price=max_price if max_price > 0 else None,
+    conditions=conditions if conditions else None,
+    categories=categories if categories else None,
+)
+
+# --- Saved searches: new listings matching them show up as alerts ---
+def describe_saved_search(saved):
+    parts = [f"“{saved.keyword}”"] if saved.keyword else []
+    parts += (saved.categories or []) + (saved.conditions or [])
+    if saved.min_price is not None:
+        parts.append(f"≥ ${saved.min_price:,.0f}")
+    if saved.max_price is not None:
+        parts.append(f"≤ ${saved.max_price:,.0f}")
+    return " · ".join(parts)
+
+current_user_id = st.session_state.get("user_id")
+if current_user_id:
+    if has_search_criteria and st.sidebar.button("Save this search", use_container_width=True):
+        try:
+            create_saved_search(
+                db, current_user_id,
+                keyword=search_kwargs["keyword"],
+                min_price=search_kwargs["min_price"],
+                max_price=search_kwargs["max_price"] if max_price != float("inf") else None,
+                conditions=search_kwargs["conditions"],
+                categories=search_kwargs["categories"],
+            )
+            st.sidebar.success("Saved. New matching listings will show up here.")
+        except ValueError as e:
+            st.sidebar.error(str(e))
+
+    alerts = get_saved_search_matches(read_db, current_user_id)
+    saved_searches = get_saved_searches(read_db, current_user_id)
+    if alerts or saved_searches:
+        with st.sidebar.expander(f"Saved searches ({len(alerts)} new)" if alerts else "Saved searches"):
+            for alert in alerts:
+                st.markdown(f"**{alert.listing.title}** – ${alert.listing.price:.2f}  \n"
+                            f"<small>matches {describe_saved_search(alert.saved_search)}</small>",
+                            unsafe_allow_html=True)
+            if alerts and st.button("Mark all as seen", key="saved_search_seen"):
+                mark_saved_search_matches_read(db, current_user_id)
+                st.rerun()
+            for saved in saved_searches:
+                c1, c2 = st.columns([4, 1])
+                c1.caption(describe_saved_search(saved))
+                if c2.button("✕", key=f"saved_search_del_{saved.id}"):
+                    delete_saved_search(db, saved.id, current_user_id)
+                    st.rerun()
+
+# --- Pagination state: start over at page 1 whenever the query changes ---
+PAGE_SIZE = 10
+page_signature = (repr(sorted(search_kwargs.items())) if has_search_criteria else "") + sort
+if st.session_state.get("_listing_page_signature") != page_signature:
+    st.session_state["_listing_page_signature"] = page_signature
+    st.session_state["listing_page_cursors"] = [None]
+    st.session_state["listing_page_fuzzy"] = False
+page_cursors = st.session_state["listing_page_cursors"]
+
+# Reads go through the shared result cache so reruns that only move an image
+# carousel or toggle a favorite don't repeat the search
 if has_search_criteria:
-    listings = search_listings(
-        db,
-        keyword=active_search_query if active_search_query else None,
-        min_price=min_price if min_price > 0 else None,
-        max_price=max_price if max_price > 0 else None,
-        conditions=conditions if conditions else None,
-        categories=categories if categories else None,
+    page = cached_listing_read(
+        read_db, search_listings_page, cursor=page_cursors[-1], limit=PAGE_SIZE, sort=sort,
+        fuzzy=st.session_state["listing_page_fuzzy"], with_facets=True, **search_kwargs,
     )
+    # No exact word matches: retry tolerating typos (e.g. "calculater")
+    if not page.items and active_search_query and not st.session_state["listing_page_fuzzy"]:
+        st.session_state["listing_page_fuzzy"] = True
+        page = cached_listing_read(read_db, search_listings_page, limit=PAGE_SIZE, sort=sort, fuzzy=True,
+                                   with_facets=True, **search_kwargs)
+    if st.session_state["listing_page_fuzzy"] and page.items:
+        st.caption(f"No exact matches. Showing close matches for **{active_search_query}**.")
 else:
-    listings = get_listings(db)
+    page = cached_listing_read(read_db, get_listings_page, cursor=page_cursors[-1], limit=PAGE_SIZE, sort=sort)
+listings = page.items
+
+# --- Facet counts under the sidebar filters (each ignores its own selection) ---
+facets = page.facets or cached_listing_read(read_db, get_search_facets)
+
+def format_counts(counts):
+    return " · ".join(f"{name} ({n})" for name, n in counts.items() if n)
+
+condition_counts_slot.caption(format_counts(facets["conditions"]))
+category_counts_slot.caption(format_counts(facets["categories"]))
+price_counts = format_counts({b["label"]: b["count"] for b in facets["price_buckets"]})
+if price_counts:
+    price_counts_slot.caption(f"Price: {price_counts}")
 
 # --- Display "No Listings" message if empty ---
 if not listings:
@@ -399,23 +512,20 @@ if not listings:
     )
 else:
     # ---------- Listing Renderer ---------- #
-    def render_listing(l):
-        from app.db import SessionLocal #added for favs
-        db = SessionLocal() #added for favs
+    def render_listing(card):
+        l = card.listing
         is_sold = getattr(l, "is_sold", False)
         label = " 🟡 SOLD" if is_sold else ""
         title_text = f"~~{l.title}~~" if is_sold else l.title
         st.markdown("---")
-        # --- Owner section (clickable to view public profile) ---
-        owner = db.query(User).filter(User.id == l.user_id).first()
 
         # --- Favorite button ---
         if "user_id" in st.session_state:
             current_user_id = st.session_state["user_id"]
 
             # Only show favorite button if the user is NOT the owner
-            if l.user_id != current_user_id:
-                favorited = is_favorited(db, current_user_id, l.id)
+            if card.is_favorited is not None:
+                favorited = card.is_favorited
 
                 # Set heart label: white if not favorited, red if favorited
                 heart_label = "❤️" if favorited else "🤍"
@@ -427,45 +537,22 @@ else:
                         add_favorite(db, current_user_id, l.id)
                     st.rerun()
 
-        # Only show favorite button if user is logged in
-        #if "user_id" in st.session_state and st.session_state["user_id"] is not None:
-
-            #current_user_id = st.session_state["user_id"]
-            #if l.user_id != current_user_id:  # <-- Skip own listings
-                #favorited = is_favorited(db, st.session_state["user_id"], l.id)
-
-                #if favorited:
-                    #if st.button("🤍", key=f"fav_{l.id}"):
-                        #remove_favorite(db, st.session_state["user_id"], l.id)
-                        #st.rerun()
-                #else:
-                    #if st.button("❤️", key=f"fav_{l.id}"):
-                        #add_favorite(db, st.session_state["user_id"], l.id)
-                        #st.rerun()
-
         else:
             st.caption("Log in to save this listing")
 
-        db.close()
-
-
+        # --- Owner section (clickable to view public profile) ---
         # Always render owner container; use fallbacks when user or profile picture missing
-        owner_exists = bool(owner)
-        owner_display_name = (owner.full_name or owner.display_name) if owner_exists else None
-        owner_display_name = owner_display_name or f"User {getattr(l, 'user_id', 'Unknown')}"
-
-        rating_text = "No ratings"
-        if owner_exists:
-            avg_rating = get_user_average_rating(db, owner.id)
-            rating_text = f"⭐ {avg_rating:.1f}" if avg_rating else "No ratings"
+        owner_exists = card.owner_exists
+        owner_display_name = card.owner_name
+        rating_text = f"⭐ {card.owner_rating:.1f}" if card.owner_rating else "No ratings"
 
         # Resolve profile picture if available
         profile_pic_path = None
-        if owner_exists and owner.profile_picture:
+        if card.owner_picture:
             candidates = [
-                owner.profile_picture,
-                os.path.join(os.getcwd(), owner.profile_picture),
-                os.path.join(os.getcwd(), "uploads", "profile_pictures", owner.profile_picture),
+                card.owner_picture,
+                os.path.join(os.getcwd(), card.owner_picture),
+                os.path.join(os.getcwd(), "uploads", "profile_pictures", card.owner_picture),
             ]
             for p in candidates:
                 try:
@@ -479,15 +566,10 @@ else:
         owner_parts = []
         owner_parts.append(f'<div class="owner-section" style="display:flex;align-items:center;gap:10px;">')
 
-        if profile_pic_path:
-            try:
-                with open(profile_pic_path, "rb") as f:
-                    img_data = f.read()
-                b64 = base64.b64encode(img_data).decode()
-                mime = "image/jpeg" if profile_pic_path.lower().endswith((".jpg", ".jpeg")) else "image/png"
-                owner_parts.append(f'<img class="owner-avatar" src="data:{mime};base64,{b64}" alt="{owner_display_name}">')
-            except Exception:
-                owner_parts.append(f'<div class="owner-avatar-placeholder">{owner_display_name[0].upper()}</div>')
+        # Shrunk once and cached across cards, reruns and sessions
+        avatar_uri = avatar_data_uri(profile_pic_path)
+        if avatar_uri:
+            owner_parts.append(f'<img class="owner-avatar" src="{avatar_uri}" alt="{owner_display_name}">')
         else:
             owner_parts.append(f'<div class="owner-avatar-placeholder">{owner_display_name[0].upper()}</div>')
 
@@ -503,13 +585,13 @@ else:
             # Button to open the dedicated public profile page (same-tab)
             if owner_exists:
                 if st.button("Open Profile", key=f"open_page_{getattr(l,'user_id','unknown')}_{l.id}"):
-                    st.session_state['public_profile_user_id'] = owner.id
+                    st.session_state['public_profile_user_id'] = card.owner_id
                     try:
-                        st.query_params["user_id"] = str(owner.id)
+                        st.query_params["user_id"] = str(card.owner_id)
                     except Exception:
                         # fallback to older API name
                         try:
-                            st.experimental_set_query_params(user_id=str(owner.id))
+                            st.experimental_set_query_params(user_id=str(card.owner_id))
                         except Exception:
                             pass
                     st.switch_page("pages/Public_Profile.py")
@@ -631,8 +713,11 @@ else:
             img_idx = st.session_state[key_idx]
             total = len(l.images)
             try:
-                img_path = l.images[img_idx].url
-                img = Image.open(img_path).convert("RGB")
+                # Pre-sized WebP variant; decoding the original every rerun is slow
+                img_path = image_variant_url(l.images[img_idx], "display")
+                if not os.path.exists(img_path):
+                    raise FileNotFoundError(img_path)
+                img = img_path
             except FileNotFoundError:
                 img = None
                 st.warning("[Image not found]")
@@ -703,8 +788,26 @@ else:
 
             #db.close()
 
-    # Render all listings
-    for item in listings:
-            render_listing(item)
+    # Render the current page only; owners, ratings and favorites for every
+    # card are fetched together
+    for card in build_listing_cards(read_db, listings, viewer_id=st.session_state.get("user_id")):
+        render_listing(card)
+
+    # --- Paging controls ---
+    st.markdown("---")
+    prev_col, page_col, next_col = st.columns(3)
+    with prev_col:
+        if len(page_cursors) > 1 and st.button("← Back", key="listing_page_prev", use_container_width=True):
+            page_cursors.pop()
+            st.rerun()
+    with page_col:
+        st.markdown(f"<p class='center'>Page {len(page_cursors)}</p>", unsafe_allow_html=True)
+    with next_col:
+        if page.next_cursor and st.button("Load more", key="listing_page_next", use_container_width=True):
+            page_cursors.append(page.next_cursor)
+            st.rerun()
 
+read_db.close()
 db.close()
+
+render_query_panel()
@@ -0,0 +1,48 @@
+"""add composite indexes for hot listing, image, favorite, message and review queries
+
+Revision ID: 3b7e9c41d2a8
+Revises: 1d55210cf204
+Create Date: 2026-10-17 09:12:44.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e9c41d2a8'
+down_revision: Union[str, Sequence[str], None] = '1d55210cf204'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns). Keep in sync with __table_args__ in app/models.
+INDEXES = [
+    ('ix_listings_user_id_id', 'listings', ['user_id', 'id']),
+    ('ix_listings_category_id', 'listings', ['category', 'id']),
+    ('ix_listings_condition_id', 'listings', ['condition', 'id']),
+    ('ix_listings_price_id', 'listings', ['price', 'id']),
+    ('ix_images_listing_id', 'images', ['listing_id']),
+    ('ix_favorites_user_id_listing_id', 'favorites', ['user_id', 'listing_id']),
+    ('ix_favorites_listing_id', 'favorites', ['listing_id']),
+    ('ix_messages_sender_id_created_at', 'messages', ['sender_id', 'created_at']),
+    ('ix_messages_receiver_id_created_at', 'messages', ['receiver_id', 'created_at']),
+    ('ix_messages_listing_id', 'messages', ['listing_id']),
+    ('ix_reviews_reviewed_user_id_created_at', 'reviews', ['reviewed_user_id', 'created_at']),
+    ('ix_reviews_reviewer_id_reviewed_user_id', 'reviews', ['reviewer_id', 'reviewed_user_id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Databases bootstrapped with Base.metadata.create_all may already have them
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
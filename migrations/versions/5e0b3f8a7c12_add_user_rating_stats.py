@@ -0,0 +1,40 @@
+"""add user_rating_stats with per-user rating totals
+
+Revision ID: 5e0b3f8a7c12
+Revises: c41a7e5b9d36
+Create Date: 2026-10-17 14:22:48.130594
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0b3f8a7c12'
+down_revision: Union[str, Sequence[str], None] = 'c41a7e5b9d36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'user_rating_stats',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('rating_sum', sa.Float(), server_default='0', nullable=False),
+        sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+    # Backfill from existing reviews; afterwards the reviews CRUD keeps it current
+    op.execute(
+        "INSERT INTO user_rating_stats (user_id, rating_sum, rating_count) "
+        "SELECT reviewed_user_id, SUM(rating), COUNT(id) FROM reviews GROUP BY reviewed_user_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_rating_stats')
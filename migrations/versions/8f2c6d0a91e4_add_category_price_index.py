@@ -0,0 +1,36 @@
+"""add category/price index backing price-sorted category pages
+
+Revision ID: 8f2c6d0a91e4
+Revises: 3b7e9c41d2a8
+Create Date: 2026-10-17 11:40:05.902417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f2c6d0a91e4'
+down_revision: Union[str, Sequence[str], None] = '3b7e9c41d2a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns). Keep in sync with __table_args__ in app/models.
+INDEXES = [
+    ('ix_listings_category_price_id', 'listings', ['category', 'price', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
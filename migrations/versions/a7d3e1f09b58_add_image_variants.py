@@ -0,0 +1,33 @@
+"""add thumbnail and display variant paths to images
+
+Revision ID: a7d3e1f09b58
+Revises: 5e0b3f8a7c12
+Create Date: 2026-10-17 15:05:12.402871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e1f09b58'
+down_revision: Union[str, Sequence[str], None] = '5e0b3f8a7c12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows stay NULL until scripts/generate_image_variants.py runs
+    with op.batch_alter_table('images') as batch_op:
+        batch_op.add_column(sa.Column('thumbnail_url', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('display_url', sa.String(length=255), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('images') as batch_op:
+        batch_op.drop_column('display_url')
+        batch_op.drop_column('thumbnail_url')
@@ -0,0 +1,67 @@
+"""add conversations summary rows for the Messages sidebar
+
+Revision ID: b92c4f6e1d07
+Revises: a7d3e1f09b58
+Create Date: 2026-10-17 16:40:27.518306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b92c4f6e1d07'
+down_revision: Union[str, Sequence[str], None] = 'a7d3e1f09b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'conversations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('other_user_id', sa.Integer(), nullable=False),
+        sa.Column('listing_id', sa.Integer(), nullable=True),
+        sa.Column('last_message_id', sa.Integer(), nullable=False),
+        sa.Column('last_message_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_message_preview', sa.String(length=120), server_default='', nullable=False),
+        sa.Column('last_sender_id', sa.Integer(), nullable=False),
+        sa.Column('unread_count', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['other_user_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['listing_id'], ['listings.id']),
+        sa.ForeignKeyConstraint(['last_message_id'], ['messages.id']),
+        sa.ForeignKeyConstraint(['last_sender_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_conversations_id', 'conversations', ['id'], unique=False)
+    op.create_index('ix_conversations_user_id_last_message_id', 'conversations',
+                    ['user_id', 'last_message_id'], unique=False)
+    op.create_index('ux_conversations_user_other_listing', 'conversations',
+                    ['user_id', 'other_user_id', sa.text('coalesce(listing_id, 0)')], unique=True)
+    # Backfill from existing messages: one row per participant, pointing at the
+    # conversation's latest message; afterwards the messages CRUD keeps it current
+    op.execute(
+        "INSERT INTO conversations (user_id, other_user_id, listing_id, last_message_id, last_message_at, "
+        "last_message_preview, last_sender_id, unread_count) "
+        "SELECT latest.user_id, latest.other_user_id, latest.listing_id, m.id, m.created_at, "
+        "substr(m.content, 1, 100), m.sender_id, latest.unread_count "
+        "FROM (SELECT user_id, other_user_id, MAX(listing_id) AS listing_id, "
+        "MAX(message_id) AS last_message_id, SUM(unread) AS unread_count "
+        "FROM (SELECT id AS message_id, sender_id AS user_id, receiver_id AS other_user_id, listing_id, 0 AS unread "
+        "FROM messages "
+        "UNION ALL "
+        "SELECT id, receiver_id, sender_id, listing_id, CASE WHEN is_read THEN 0 ELSE 1 END "
+        "FROM messages WHERE receiver_id != sender_id) AS sides "
+        "GROUP BY user_id, other_user_id, coalesce(listing_id, 0)) AS latest "
+        "JOIN messages AS m ON m.id = latest.last_message_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('conversations')
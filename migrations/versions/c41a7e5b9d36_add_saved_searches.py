@@ -0,0 +1,60 @@
+"""add saved searches and their new-listing match alerts
+
+Revision ID: c41a7e5b9d36
+Revises: 8f2c6d0a91e4
+Create Date: 2026-10-17 13:05:21.477310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41a7e5b9d36'
+down_revision: Union[str, Sequence[str], None] = '8f2c6d0a91e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'saved_searches',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('keyword', sa.String(length=200), nullable=True),
+        sa.Column('min_price', sa.Float(), nullable=True),
+        sa.Column('max_price', sa.Float(), nullable=True),
+        sa.Column('conditions', sa.JSON(), nullable=True),
+        sa.Column('categories', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_saved_searches_id', 'saved_searches', ['id'], unique=False)
+    op.create_index('ix_saved_searches_user_id', 'saved_searches', ['user_id'], unique=False)
+    op.create_table(
+        'saved_search_matches',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('saved_search_id', sa.Integer(), nullable=False),
+        sa.Column('listing_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('is_read', sa.Boolean(), server_default='0', nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['saved_search_id'], ['saved_searches.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['listing_id'], ['listings.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_saved_search_matches_id', 'saved_search_matches', ['id'], unique=False)
+    op.create_index('ix_saved_search_matches_saved_search_id', 'saved_search_matches', ['saved_search_id'], unique=False)
+    op.create_index('ix_saved_search_matches_user_id_is_read_id', 'saved_search_matches',
+                    ['user_id', 'is_read', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('saved_search_matches')
+    op.drop_table('saved_searches')
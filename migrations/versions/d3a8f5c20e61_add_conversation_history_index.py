@@ -0,0 +1,36 @@
+"""add messages index backing paged conversation history
+
+Revision ID: d3a8f5c20e61
+Revises: b92c4f6e1d07
+Create Date: 2026-10-17 17:12:44.086139
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a8f5c20e61'
+down_revision: Union[str, Sequence[str], None] = 'b92c4f6e1d07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns). Keep in sync with __table_args__ in app/models.
+INDEXES = [
+    ('ix_messages_sender_id_receiver_id_listing_id_id', 'messages', ['sender_id', 'receiver_id', 'listing_id', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
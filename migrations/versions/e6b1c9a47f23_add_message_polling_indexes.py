@@ -0,0 +1,37 @@
+"""add messages indexes backing new-message polling
+
+Revision ID: e6b1c9a47f23
+Revises: d3a8f5c20e61
+Create Date: 2026-10-17 17:48:19.273550
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b1c9a47f23'
+down_revision: Union[str, Sequence[str], None] = 'd3a8f5c20e61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns). Keep in sync with __table_args__ in app/models.
+INDEXES = [
+    ('ix_messages_sender_id_id', 'messages', ['sender_id', 'id']),
+    ('ix_messages_receiver_id_id', 'messages', ['receiver_id', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
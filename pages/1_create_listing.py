@@ -2,22 +2,21 @@
 
 # UI Framework 
 import streamlit as st
-import os
-import uuid
-from app.storage import get_upload_subdir
+from app.storage import save_listing_image, image_variant_url
 
 # SQLAlchemy DB Session 
-from app.db import SessionLocal
+from app.db import SessionLocal, engine
+from app.schema import ensure_schema
 # CRUD Function that writes a new listing to the database 
 from app.crud.listings import create_listing, ALLOWED_CONDITIONS, ALLOWED_CATEGORIES
 from app.nav import render_nav_sidebar
 
-# Make sure we have a place to store uploads
-UPLOAD_DIR = get_upload_subdir("listing_images")
-
 # Custom navigation sidebar
 render_nav_sidebar()
 
+# Create/upgrade tables once per process (no-op on later reruns)
+ensure_schema(engine)
+
 # ======= CONSISTENT STYLING WITH MAIN PAGE ======= #
 st.markdown(
     """
@@ -265,18 +264,8 @@ with st.form("create_listing_form", clear_on_submit=True):
             for e in errors:
                 st.error(e)
         else:
-            # Save uploaded files
-            saved_paths = []
-            if images:
-                for img in images:
-                    ext = os.path.splitext(img.name)[1].lower()
-                    filename = f"{uuid.uuid4().hex}{ext}"
-                    file_path = os.path.join(UPLOAD_DIR, filename)
-
-                    with open(file_path, "wb") as f:
-                        f.write(img.getbuffer())
-
-                    saved_paths.append(file_path)
+            # Save uploaded files along with their thumbnail/display variants
+            saved_images = [save_listing_image(img.getbuffer(), img.name) for img in images or []]
 
             db = SessionLocal()
             try:
@@ -287,16 +276,16 @@ with st.form("create_listing_form", clear_on_submit=True):
                     price=price,
                     condition=condition,
                     category=category,
-                    image_urls=saved_paths,   # store local file paths in DB
+                    image_urls=saved_images,   # store local file paths (and variants) in DB
                     user_id=user_id,
                 )
                 st.success(f" Listing created successfully: **{item.title}**")
                 
-                if saved_paths:
+                if saved_images:
                     # Display images in centered carousel style matching main page
                     L, M, R = st.columns([1, 2, 1])
                     with M:
-                        st.image(saved_paths, use_container_width=True)
+                        st.image([image_variant_url(s, "thumbnail") for s in saved_images], width=160)
 
                 
             except Exception as e:
@@ -1,6 +1,7 @@
 # pages/2_Login.py
 import streamlit as st
-from app.db import SessionLocal
+from app.db import SessionLocal, engine
+from app.schema import ensure_schema
 from app.crud.users import authenticate_user, validate_charlotte_email
 from app.nav import render_nav_sidebar
 
@@ -10,6 +11,9 @@ st.set_page_config(page_title="Login - Campus Market", layout="centered")
 # Custom nav sidebar
 render_nav_sidebar()
 
+# Create/upgrade tables once per process (no-op on later reruns)
+ensure_schema(engine)
+
 st.markdown(
     """
     <style>
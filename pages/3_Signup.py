@@ -1,6 +1,7 @@
 # pages/3_Signup.py
 import streamlit as st
-from app.db import SessionLocal
+from app.db import SessionLocal, engine
+from app.schema import ensure_schema
 from app.crud.users import create_user, validate_charlotte_email, validate_password
 from app.nav import render_nav_sidebar
 
@@ -10,6 +11,9 @@ st.set_page_config(page_title="Signup - Campus Market", layout="centered")
 # Custom nav sidebar
 render_nav_sidebar()
 
+# Create/upgrade tables once per process (no-op on later reruns)
+ensure_schema(engine)
+
 # Charlotte colors
 st.markdown(
     """
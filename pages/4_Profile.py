@@ -2,16 +2,16 @@
 import streamlit as st
 import os
 import re
-from PIL import Image as PILImage
 import io
-import base64
 import json
 import uuid
 from datetime import datetime
-from app.storage import get_upload_subdir, build_upload_path
+from app.avatars import avatar_data_uri
+from app.storage import get_upload_subdir, build_upload_path, image_variant_url, remove_image_files
 
 # SQLAlchemy imports
-from app.db import SessionLocal
+from app.db import SessionLocal, engine
+from app.schema import ensure_schema
 from sqlalchemy import select
 from app.models.listing import Listing
 from app.models.image import Image
@@ -23,9 +23,11 @@ from app.crud.users import (
     verify_user_password,
 )
 from app.models.message import Message
+from app.crud.listings import delete_listing
 from app.crud.favorites import is_favorited, add_favorite, remove_favorite, get_user_favorites
 from app.models.favorite import Favorite
-from app.nav import render_nav_sidebar
+from app.nav import render_nav_sidebar, render_query_panel
+from app.query_metrics import begin_request
 
 st.divider()
 
@@ -258,21 +260,6 @@ def load_profile_picture(user_id):
     return None
 
 
-def avatar_data_uri(path):
-    """Return a data URI for an image file path (base64)."""
-    try:
-        with open(path, "rb") as f:
-            data = f.read()
-        mime = "image/png"
-        if path.lower().endswith(".jpg") or path.lower().endswith(".jpeg"):
-            mime = "image/jpeg"
-        elif path.lower().endswith(".gif"):
-            mime = "image/gif"
-        b64 = base64.b64encode(data).decode("utf-8")
-        return f"data:{mime};base64,{b64}"
-    except Exception:
-        return None
-
 def delete_listing_safe(listing_id, current_user_id):
     """Safely delete a listing with ownership verification"""
     db = SessionLocal()
@@ -294,17 +281,13 @@ def delete_listing_safe(listing_id, current_user_id):
         
         # Delete associated images
         for img in images:
-            if os.path.exists(img.url):
-                try:
-                    os.remove(img.url)
-                    st.info(f"Deleted image: {os.path.basename(img.url)}")
-                except OSError as e:
-                    st.warning(f"Could not delete image file: {e}")
-            db.delete(img)
+            if remove_image_files(img):
+                st.info(f"Deleted image: {os.path.basename(img.url)}")
+            elif os.path.exists(img.url):
+                st.warning(f"Could not delete image file: {img.url}")
         
-        # Delete the listing
-        db.delete(listing)
-        db.commit()
+        # Delete the listing with its images, favorites and alerts
+        delete_listing(db, listing_id)
         st.success("✅ Listing deleted successfully!")
         return True
         
@@ -389,8 +372,11 @@ def display_listing_card(listing, images, current_user_id):
         img_idx = st.session_state[key_idx]
         total = len(images)
         try:
-            img_path = images[img_idx].url
-            img = PILImage.open(img_path).convert("RGB")
+            # Pre-sized WebP variant; decoding the original every rerun is slow
+            img_path = image_variant_url(images[img_idx], "display")
+            if not os.path.exists(img_path):
+                raise FileNotFoundError(img_path)
+            img = img_path
         except FileNotFoundError:
             img = None
             st.warning("[Image not found]")
@@ -488,6 +474,12 @@ st.set_page_config(page_title="Profile - Campus Market", layout="wide")
 # Custom nav sidebar
 render_nav_sidebar()
 
+# Count this rerun's SQL; render_query_panel() at the end reports it
+begin_request("profile")
+
+# Create/upgrade tables once per process (no-op on later reruns)
+ensure_schema(engine)
+
 # Check if user is logged in
 if "user_id" not in st.session_state or "user_email" not in st.session_state:
     st.error("Please log in to view your profile.")
@@ -777,3 +769,5 @@ with col3:
 with col4:
     if st.button("Reset Password",use_container_width=True):
         st.switch_page("pages/7_Reset_Password.py")
+
+render_query_panel()
@@ -5,11 +5,16 @@ import sys, os
 # Ensure root folder is searchable
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from app.db import SessionLocal
-from app.crud.messages import send_message, get_user_messages
+from app.db import SessionLocal, ReadSessionLocal, engine
+from app.schema import ensure_schema
+from app.crud.messages import (
+    MAX_MESSAGE_PAGE_SIZE, send_message, get_conversations, get_conversation_page,
+    get_latest_message_id, get_messages_since, mark_conversation_read,
+)
 from app.models.user import User
 from app.models.listing import Listing
-from app.nav import render_nav_sidebar
+from app.nav import render_nav_sidebar, render_query_panel
+from app.query_metrics import begin_request, profile_request
 
 
 st.set_page_config(page_title="Messages", page_icon="💬", layout="wide")
@@ -17,6 +22,12 @@ st.set_page_config(page_title="Messages", page_icon="💬", layout="wide")
 # Custom nav sidebar
 render_nav_sidebar()
 
+# Count this rerun's SQL; render_query_panel() at the end reports it
+begin_request("messages")
+
+# Create/upgrade tables once per process (no-op on later reruns)
+ensure_schema(engine)
+
 st.markdown(
     """
     <style>
@@ -162,8 +173,8 @@ USER_ID = st.session_state["user_id"]
 RETURN_TO_MAIN = st.session_state.get("return_to_main_after_send", False)
 
 def render_messages(messages, current_user_id):
-    """Render messages as chat bubbles with timestamps."""
-    for msg in sorted(messages, key=lambda m: m.created_at):
+    """Render messages (oldest first) as chat bubbles with timestamps."""
+    for msg in messages:
         is_me = msg.sender_id == current_user_id
         align = "flex-end" if is_me else "flex-start"
         bubble_color = "#DCF8C6" if is_me else "#FFFFFF"
@@ -192,10 +203,11 @@ def render_messages(messages, current_user_id):
 
 
 # ------------------------------
-# LOAD ALL MESSAGES
+# DATABASE SESSIONS
 # ------------------------------
-db = SessionLocal()
-all_msgs = get_user_messages(db, USER_ID)
+# Conversation list and history are read-only; sending uses write_db
+db = ReadSessionLocal()
+write_db = SessionLocal()
 
 # Values sent from main page (Contact Seller button)
 forced_other_id = st.session_state.get("open_chat_with_user")
@@ -214,13 +226,8 @@ if st.session_state["clear_first_message"] == True:
 # If user clicked "Contact Seller", force this conversation
 if forced_other_id and forced_listing_id:
 
-    # Filter messages for this exact conversation
-    conversation_msgs = [
-        m for m in all_msgs
-        if ((m.sender_id == USER_ID and m.receiver_id == forced_other_id) or
-            (m.sender_id == forced_other_id and m.receiver_id == USER_ID)) and
-           m.listing_id == forced_listing_id
-    ]
+    # Latest messages of this exact conversation
+    conversation_msgs = get_conversation_page(db, USER_ID, forced_other_id, forced_listing_id).items
 
     seller = db.query(User).filter(User.id == forced_other_id).first()
     listing = db.query(Listing).filter(Listing.id == forced_listing_id).first()
@@ -272,7 +279,7 @@ if forced_other_id and forced_listing_id:
         else:
             try:
                 send_message(
-                    db=db,
+                    db=write_db,
                     sender_id=USER_ID,
                     receiver_id=forced_other_id,
                     listing_id=forced_listing_id,
@@ -305,23 +312,9 @@ if forced_other_id and forced_listing_id:
                 st.error(str(e))
 
     db.close()
+    write_db.close()
     st.stop()
 
-# ------------------------------
-# GROUP MESSAGES BY CONVERSATION
-# Key = (other_user_id, listing_id)
-# ------------------------------
-conversations = {}
-
-for m in all_msgs:
-    other_id = m.receiver_id if m.sender_id == USER_ID else m.sender_id
-    convo_key = (other_id, m.listing_id)
-
-    if convo_key not in conversations:
-        conversations[convo_key] = []
-
-    conversations[convo_key].append(m)
-
 # Helper for displaying username
 def get_username(user: User) -> str:
     if getattr(user, "display_name", None):
@@ -338,43 +331,28 @@ def get_username(user: User) -> str:
 # Sidebar: conversation list
 st.sidebar.header("Your Conversations")
 
-conversation_labels = {}
-
-# Build the conversation labels and remember latest message timestamp
-for (other_id, listing_id), msgs in conversations.items():
-    other_user = db.query(User).filter(User.id == other_id).first()
-    listing = db.query(Listing).filter(Listing.id == listing_id).first()
-
-    username = get_username(other_user) if other_user else f"User {other_id}"
-    listing_title = listing.title if listing else "No Listing"
-
-    label = f"{username} — {listing_title}"
-    conversation_labels[label] = (other_id, listing_id, max(msg.created_at for msg in msgs))
-
-# Sort labels by latest message timestamp descending
-sorted_labels = sorted(conversation_labels.items(), key=lambda x: x[1][2], reverse=True)
+# One row per conversation from the conversations summary table, already
+# sorted by latest message; no per-conversation user or listing lookups
+conversations = get_conversations(db, USER_ID)
+# Filled in once the open chat is marked read, so its count is current
+sidebar_list = st.sidebar.container()
 
 # Check if the user has any previous conversations
-if not sorted_labels:
+if not conversations:
     st.title("Messages")
     st.info("You have no conversations yet. Start a conversation by clicking 'Contact Seller' on a listing!")
     db.close()
+    write_db.close()
     st.stop()
 
-# Sidebar buttons for each conversation
-for label, (other_id, listing_id, _) in sorted_labels:
-    if st.sidebar.button(label, key=f"conv_{other_id}_{listing_id}", use_container_width=True):
-        st.session_state["selected_conversation"] = (other_id, listing_id)
-
 # ------------------------------
 # Default to most recent conversation
 # ------------------------------
 if "selected_conversation" not in st.session_state:
-    most_recent = sorted_labels[0][1]  # (other_id, listing_id, latest_timestamp)
-    st.session_state["selected_conversation"] = (most_recent[0], most_recent[1])
+    most_recent = conversations[0]
+    st.session_state["selected_conversation"] = (most_recent.other_user_id, most_recent.listing_id)
 
 selected_other_id, selected_listing_id = st.session_state["selected_conversation"]
-selected_messages = sorted(conversations[(selected_other_id, selected_listing_id)], key=lambda m: m.created_at)
 
 
 #st.sidebar.header("Your Conversations")
@@ -435,13 +413,97 @@ st.markdown("---")
 # ------------------------------
 # DISPLAY MESSAGES
 # ------------------------------
+# Only the latest page is loaded; "Load older messages" adds one page per
+# click. Just the number of older pages is kept: the cursors are followed
+# from the current latest page on each rerun, so new arrivals leave no gap.
+older_pages_key = f"older_pages_{selected_other_id}_{selected_listing_id}"
+# Polling starts from here; read before the pages so nothing falls in between
+st.session_state["live_last_seen_id"] = get_latest_message_id(db, USER_ID)
+chat_pages = [get_conversation_page(db, USER_ID, selected_other_id, selected_listing_id)]
+for _ in range(st.session_state.get(older_pages_key, 0)):
+    if chat_pages[-1].next_before_id is None:
+        break
+    chat_pages.append(get_conversation_page(db, USER_ID, selected_other_id, selected_listing_id,
+                                            before_id=chat_pages[-1].next_before_id))
+
+# Opening a chat marks it read up to the newest message shown: one UPDATE and one commit
+# however many were unread. A message newer than the latest page stays unread.
+selected_summary = next((c for c in conversations
+                         if (c.other_user_id, c.listing_id) == (selected_other_id, selected_listing_id)), None)
+if selected_summary and selected_summary.unread_count and chat_pages[0].items:
+    marked = mark_conversation_read(write_db, USER_ID, selected_other_id, selected_listing_id,
+                                    up_to_id=chat_pages[0].items[-1].id)
+    conversations = [c._replace(unread_count=max(c.unread_count - marked, 0)) if c is selected_summary else c
+                     for c in conversations]
+
+def _select_conversation(other_user_id, listing_id):
+    st.session_state["selected_conversation"] = (other_user_id, listing_id)
+
+# Sidebar buttons for each conversation, with the unread count when there is one
+with sidebar_list:
+    for convo in conversations:
+        label = f"{convo.other_name} — {convo.listing_title or 'No Listing'}"
+        if convo.unread_count:
+            label += f" ({convo.unread_count} new)"
+        st.button(label, key=f"conv_{convo.other_user_id}_{convo.listing_id}", help=convo.preview,
+                  use_container_width=True, on_click=_select_conversation,
+                  args=(convo.other_user_id, convo.listing_id))
+
 chat_box = st.container()
 
-# Optional: ensure messages sorted by time
-selected_messages = sorted(selected_messages, key=lambda m: m.created_at)
+with chat_box:
+    if chat_pages[-1].next_before_id is not None:
+        if st.button("Load older messages", key=f"load_{older_pages_key}"):
+            st.session_state[older_pages_key] = len(chat_pages)
+            st.rerun()
+    for page in reversed(chat_pages):
+        render_messages(page.items, USER_ID)
+
+# ------------------------------
+# LIVE UPDATES
+# ------------------------------
+# A fragment polls get_messages_since every MESSAGES_POLL_SECONDS and reruns
+# on its own, so an open chat costs one indexed query per tick instead of a
+# full page reload. New messages for this chat are appended below the loaded
+# pages; a message for any other chat reloads the page so the sidebar shows it.
+POLL_SECONDS = float(os.getenv("MESSAGES_POLL_SECONDS", "3"))
+latest_items = chat_pages[0].items
+st.session_state["live_shown_id"] = latest_items[-1].id if latest_items else 0
+st.session_state["live_messages"] = []
+
+def _in_selected_chat(msg) -> bool:
+    return ({msg.sender_id, msg.receiver_id} == {USER_ID, selected_other_id}
+            and msg.listing_id == selected_listing_id)
+
+@st.fragment(run_every=POLL_SECONDS)
+def live_messages():
+    with profile_request("messages: poll"):
+        poll_db = ReadSessionLocal()
+        try:
+            new_msgs = get_messages_since(poll_db, USER_ID, st.session_state["live_last_seen_id"])
+        finally:
+            poll_db.close()
+    if new_msgs:
+        st.session_state["live_last_seen_id"] = new_msgs[-1].id
+        if len(new_msgs) == MAX_MESSAGE_PAGE_SIZE or not all(_in_selected_chat(m) for m in new_msgs):
+            st.rerun()
+        st.session_state["live_messages"].extend(
+            m for m in new_msgs if m.id > st.session_state["live_shown_id"]
+        )
+        # The chat is open, so what just arrived in it has been seen
+        if any(m.receiver_id == USER_ID and m.sender_id == selected_other_id for m in new_msgs):
+            # Marking read is a write: SessionLocal, not ReadSessionLocal. The
+            # page's write_db is closed by the time the fragment reruns.
+            write_db = SessionLocal()
+            try:
+                mark_conversation_read(write_db, USER_ID, selected_other_id, selected_listing_id,
+                                       up_to_id=new_msgs[-1].id)
+            finally:
+                write_db.close()
+    render_messages(st.session_state["live_messages"], USER_ID)
 
 with chat_box:
-    render_messages(selected_messages, USER_ID)
+    live_messages()
 
 #with chat_box:
     #for msg in selected_messages:  # oldest → newest
@@ -498,7 +560,7 @@ if st.button("Send Message", use_container_width=True):
     else:
         try:
             send_message(
-                db=db,
+                db=write_db,
                 sender_id=USER_ID,
                 receiver_id=selected_other_id,
                 listing_id=selected_listing_id,
@@ -516,3 +578,6 @@ if st.button("Send Message", use_container_width=True):
             st.error(f"Error sending message: {str(e)}")
 
 db.close()
+write_db.close()
+
+render_query_panel()
@@ -1,6 +1,7 @@
 # pages/7_Reset_Password.py
 import streamlit as st
-from app.db import SessionLocal
+from app.db import SessionLocal, engine
+from app.schema import ensure_schema
 from app.crud.users import reset_password_by_email, validate_charlotte_email, validate_password
 from app.nav import render_nav_sidebar
 
@@ -9,6 +10,9 @@ st.set_page_config(page_title="Reset Password - Campus Market", layout="centered
 # Custom nav sidebar
 render_nav_sidebar()
 
+# Create/upgrade tables once per process (no-op on later reruns)
+ensure_schema(engine)
+
 # Charlotte colors
 st.markdown(
     """
@@ -3,16 +3,23 @@ import os
 import json
 from datetime import datetime
 #how does update and leave a review work together is there a way we can just make update your review replace leave a review after someone has filed out that form?
-from app.db import SessionLocal
+from app.db import SessionLocal, engine
+from app.schema import ensure_schema
+from app.pool_metrics import get_pool_stats
 from app.models.listing import Listing
 from app.models.image import Image
 from app.nav import render_nav_sidebar
+from app.storage import remove_image_files
+from app.crud.listings import delete_listing
 
 st.set_page_config(page_title="Admin Reports - Campus Market", layout="wide")
 
 # Custom nav sidebar
 render_nav_sidebar()
 
+# Create/upgrade tables once per process (no-op on later reruns)
+ensure_schema(engine)
+
 # Simple admin check based on config/admins.json
 ADMINS_PATH = os.path.join("config", "admins.json")
 REPORTS_PATH = os.path.join("reports", "reports.jsonl")
@@ -120,18 +127,13 @@ else:
                                 # remove image files from disk
                                 try:
                                     for img in list(listing.images):
-                                        try:
-                                            if img.url and os.path.exists(img.url):
-                                                os.remove(img.url)
-                                        except Exception:
-                                            pass
+                                        remove_image_files(img)
                                 except Exception:
                                     pass
 
                                 # delete listing record
                                 try:
-                                    db.delete(listing)
-                                    db.commit()
+                                    delete_listing(db, listing_id)
                                 except Exception as e:
                                     db.rollback()
                                     st.error(f"Failed to delete listing: {e}")
@@ -165,6 +167,15 @@ else:
                         st.session_state.pop(f"confirm_delete_{rep.get('id')}", None)
                         st.info("Deletion cancelled.")
 
+# Database connection pool health (checkouts, overflow, wait times)
+st.markdown("---")
+with st.expander("Database connection pool"):
+    pool_stats = get_pool_stats(engine)
+    histogram = pool_stats.pop("wait_histogram", None)
+    st.json(pool_stats)
+    if histogram:
+        st.bar_chart(histogram)
+
 # Provide download links
 st.markdown("---")
 if os.path.exists(REPORTS_PATH):
@@ -1,17 +1,19 @@
 # pages/Public_Profile.py
 import streamlit as st
 import os
-from PIL import Image as PILImage
-from app.db import SessionLocal
+from app.db import SessionLocal, ReadSessionLocal, engine
+from app.schema import ensure_schema
 from app.models.user import User
 from app.models.listing import Listing
 from app.models.image import Image
 from app.models.review import Review
+from app.storage import image_variant_url
 from app.crud.reviews import (
     get_reviews_for_user, get_user_average_rating, create_review,
     has_user_reviewed, update_review, delete_review
 )
-from app.nav import render_nav_sidebar
+from app.nav import render_nav_sidebar, render_query_panel
+from app.query_metrics import begin_request
 from sqlalchemy import select
 import json
 from datetime import datetime
@@ -21,6 +23,12 @@ st.set_page_config(page_title="Public Profile - Campus Market", layout="wide")
 # Custom nav sidebar (public page not listed in nav items)
 render_nav_sidebar()
 
+# Count this rerun's SQL; render_query_panel() at the end reports it
+begin_request("public_profile")
+
+# Create/upgrade tables once per process (no-op on later reruns)
+ensure_schema(engine)
+
 st.markdown(
     """
     <style>
@@ -235,7 +243,9 @@ except (ValueError, TypeError):
     st.error("Invalid user ID.")
     st.stop()
 
-db = SessionLocal()
+# Page reads go to the read-only session; review writes use write_db
+db = ReadSessionLocal()
+write_db = SessionLocal()
 
 try:
     # Fetch user
@@ -296,8 +306,11 @@ try:
                 img_idx = st.session_state[key_idx]
                 total = len(listing.images)
                 try:
-                    img_path = listing.images[img_idx].url
-                    img = PILImage.open(img_path).convert("RGB")
+                    # Pre-sized WebP variant; decoding the original every rerun is slow
+                    img_path = image_variant_url(listing.images[img_idx], "display")
+                    if not os.path.exists(img_path):
+                        raise FileNotFoundError(img_path)
+                    img = img_path
                 except FileNotFoundError:
                     img = None
                     st.warning("[Image not found]")
@@ -412,7 +425,7 @@ try:
                     else:
                         try:
                             create_review(
-                                db,
+                                write_db,
                                 reviewer_id=current_user_id,
                                 reviewed_user_id=user.id,
                                 rating=rating,
@@ -442,7 +455,7 @@ try:
                 
                 if submit:
                     try:
-                        update_review(db, existing_review.id, rating=rating, comment=comment)
+                        update_review(write_db, existing_review.id, rating=rating, comment=comment)
                         st.success("Review updated successfully!")
                         st.rerun()
                     except Exception as e:
@@ -450,3 +463,6 @@ try:
 
 finally:
     db.close()
+    write_db.close()
+
+render_query_panel()
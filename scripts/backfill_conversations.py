@@ -0,0 +1,39 @@
+"""
+Rebuild conversations (the Messages sidebar summaries) from the messages table.
+
+The messages CRUD keeps the summaries current on every send and read; run
+this once on a database that had messages before the table existed, or any
+time messages were changed outside app/crud/messages.py.
+
+Usage:
+    python -m scripts.backfill_conversations
+
+Uses DATABASE_URL like the app and prints how many summary rows were written.
+"""
+import sys
+from pathlib import Path
+
+# Ensure app package is importable
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.db import engine, SessionLocal
+from app.schema import ensure_schema
+from app.crud.messages import rebuild_conversations
+import app.models  # noqa: F401  (registers the conversations table)
+
+
+def main() -> int:
+    ensure_schema(engine)
+    db = SessionLocal()
+    try:
+        written = rebuild_conversations(db)
+    finally:
+        db.close()
+    print(f"Conversations rebuilt; {written} summary row(s) written.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
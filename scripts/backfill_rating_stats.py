@@ -0,0 +1,38 @@
+"""
+Rebuild user_rating_stats (per-user review totals) from the reviews table.
+
+The reviews CRUD keeps the totals current on every create/update/delete; run
+this once on a database that had reviews before the table existed, or any
+time reviews were changed outside app/crud/reviews.py.
+
+Usage:
+    python -m scripts.backfill_rating_stats
+
+Uses DATABASE_URL like the app and prints how many users' totals were fixed.
+"""
+import sys
+from pathlib import Path
+
+# Ensure app package is importable
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.db import engine, SessionLocal
+from app.schema import ensure_schema
+from app.crud.reviews import rebuild_rating_stats
+
+
+def main() -> int:
+    ensure_schema(engine)
+    db = SessionLocal()
+    try:
+        fixed = rebuild_rating_stats(db)
+    finally:
+        db.close()
+    print(f"Rating totals rebuilt; {fixed} user(s) updated.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
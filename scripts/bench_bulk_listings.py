@@ -0,0 +1,84 @@
+"""
+Compare seeding listings one create_listing call at a time with create_listings_bulk.
+
+create_listing commits and refreshes per listing; create_listings_bulk
+validates the whole batch, then inserts listings and images with
+INSERT ... RETURNING / executemany in one transaction. Both run on a fresh
+SQLite file with the app's PRAGMA profile, one image per listing.
+
+Usage:
+    python -m scripts.bench_bulk_listings [--listings 100000] [--loop 1000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy.orm import sessionmaker
+
+# Ensure app package is importable
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.db import Base, build_engine, sqlite_pragmas_from_env
+from app.models.user import User
+from app.crud.listings import ALLOWED_CATEGORIES, ALLOWED_CONDITIONS, create_listing, create_listings_bulk
+
+
+def make_rows(user_id: int, n: int) -> list[dict]:
+    return [
+        dict(
+            title=f"Listing {i}",
+            description=f"Demo listing number {i}, pickup on campus.",
+            price=float(i % 500),
+            user_id=user_id,
+            condition=ALLOWED_CONDITIONS[i % len(ALLOWED_CONDITIONS)],
+            category=ALLOWED_CATEGORIES[i % len(ALLOWED_CATEGORIES)],
+            image_urls=[f"shared_uploads/listing_images/demo_{i}.jpg"],
+        )
+        for i in range(n)
+    ]
+
+
+def fresh_session(tmp: str, name: str):
+    engine = build_engine(f"sqlite:///{os.path.join(tmp, name)}", sqlite_pragmas_from_env())
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    seller = User(email="seller@charlotte.edu", hashed_password="x")
+    db.add(seller)
+    db.commit()
+    return engine, db, seller.id
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--listings", type=int, default=100_000, help="listings for the bulk run")
+    parser.add_argument("--loop", type=int, default=1000, help="listings for the per-call run")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, db, user_id = fresh_session(tmp, "loop.db")
+        rows = make_rows(user_id, args.loop)
+        start = time.perf_counter()
+        for row in rows:
+            create_listing(db, **row)
+        loop_s = time.perf_counter() - start
+        db.close(); engine.dispose()
+
+        engine, db, user_id = fresh_session(tmp, "bulk.db")
+        rows = make_rows(user_id, args.listings)
+        start = time.perf_counter()
+        create_listings_bulk(db, rows)
+        bulk_s = time.perf_counter() - start
+        db.close(); engine.dispose()
+
+    print(f"create_listing loop   {args.loop:>8} listings  {loop_s:8.2f} s  {args.loop / loop_s:10.0f} listings/s")
+    print(f"create_listings_bulk  {args.listings:>8} listings  {bulk_s:8.2f} s  {args.listings / bulk_s:10.0f} listings/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Measure the schema work done per page run, before and after ensure_schema.
+
+Before, every Streamlit rerun of home.py ran create_all, a PRAGMA
+table_info check inside a write transaction and the FTS check. Now
+app.schema.ensure_schema does that once per process. This replays both on a
+copy of the demo database and reports the SQL statements and time per rerun.
+
+Usage:
+    python -m scripts.bench_schema_bootstrap [--reruns 200]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import event, text
+
+# Ensure app package is importable
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.db import Base, build_engine, sqlite_pragmas_from_env
+from app.schema import LEGACY_COLUMNS, ensure_schema
+from app.search_index import ensure_listing_fts
+
+DEMO_DB = ROOT / "campus_market_global.db"
+
+
+def legacy_rerun(engine):
+    """The schema work home.py used to do on every rerun."""
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for table, columns in LEGACY_COLUMNS.items():
+            cols = [row[1] for row in conn.execute(text(f"PRAGMA table_info({table});"))]
+            for name, ddl in columns.items():
+                if name not in cols:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl};"))
+    ensure_listing_fts(engine)
+
+
+def measure(engine, rerun, reruns: int) -> tuple[float, float]:
+    """Return (ms per rerun, SQL statements per rerun)."""
+    statements = []
+    listener = lambda conn, cursor, stmt, params, ctx, many: statements.append(stmt)
+    event.listen(engine, "before_cursor_execute", listener)
+    start = time.perf_counter()
+    for _ in range(reruns):
+        rerun(engine)
+    elapsed = time.perf_counter() - start
+    event.remove(engine, "before_cursor_execute", listener)
+    return elapsed / reruns * 1000.0, len(statements) / reruns
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--reruns", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "market.db")
+        shutil.copy(DEMO_DB, path)
+        engine = build_engine(f"sqlite:///{path}", sqlite_pragmas_from_env())
+
+        first_ms, first_sql = measure(engine, ensure_schema, 1)
+        before_ms, before_sql = measure(engine, legacy_rerun, args.reruns)
+        after_ms, after_sql = measure(engine, ensure_schema, args.reruns)
+        engine.dispose()
+
+    print(f"first ensure_schema call     {first_ms:8.3f} ms  {first_sql:5.1f} statements")
+    print(f"per rerun, before (legacy)   {before_ms:8.3f} ms  {before_sql:5.1f} statements")
+    print(f"per rerun, after             {after_ms:8.3f} ms  {after_sql:5.1f} statements")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Benchmark concurrent reads and writes with and without the SQLite PRAGMA profile.
+
+Mimics several Streamlit sessions at once: reader threads page through the
+home feed while writer threads send messages and toggle favorites, each
+commit in its own session. Runs with SQLite's defaults (rollback journal,
+synchronous=FULL), with the profile from app/db.py, and with that profile
+plus the opt-in WAL journal, each on a fresh temporary database file.
+
+Usage:
+    python -m scripts.bench_sqlite_profile [--seconds 5] [--readers 4] [--writers 4]
+
+Prints reads/s, writes/s and how many operations failed with
+"database is locked" for each run.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+# Ensure app package is importable
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.db import Base, build_engine, sqlite_pragmas_from_env
+from app.models.user import User
+from app.crud.listings import create_listing, get_listings_page
+from app.crud.favorites import add_favorite, remove_favorite
+from app.crud.messages import send_message
+
+N_USERS = 20
+N_LISTINGS = 200
+
+
+def _seed(Session):
+    db = Session()
+    try:
+        users = [User(email=f"bench{i}@charlotte.edu", hashed_password="x") for i in range(N_USERS)]
+        db.add_all(users); db.commit()
+        for i in range(N_LISTINGS):
+            create_listing(db, title=f"Item {i}", description="bench", price=float(i),
+                           image_urls=[], user_id=users[i % N_USERS].id)
+        return [u.id for u in users]
+    finally:
+        db.close()
+
+
+def run(pragmas: dict, seconds: float, readers: int, writers: int) -> dict:
+    """Run the mixed workload against a fresh database; returns throughput counters."""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", pragmas)
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+        user_ids = _seed(Session)
+
+        counts = {"reads": 0, "writes": 0, "locked": 0}
+        lock = threading.Lock()
+        stop = time.monotonic() + seconds
+
+        def _count(key):
+            with lock:
+                counts[key] += 1
+
+        def reader(n):
+            while time.monotonic() < stop:
+                db = Session()
+                try:
+                    get_listings_page(db, limit=20)
+                    _count("reads")
+                except OperationalError:
+                    _count("locked")
+                finally:
+                    db.close()
+
+        def writer(n):
+            me, other = user_ids[n % N_USERS], user_ids[(n + 1) % N_USERS]
+            listing_id = n + 1
+            while time.monotonic() < stop:
+                db = Session()
+                try:
+                    send_message(db, me, other, "still available?")
+                    add_favorite(db, me, listing_id)
+                    remove_favorite(db, me, listing_id)
+                    _count("writes")
+                except OperationalError:
+                    db.rollback()
+                    _count("locked")
+                finally:
+                    db.close()
+
+        threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+        threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        engine.dispose()
+    return {key: value / seconds if key != "locked" else value for key, value in counts.items()}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    profile = sqlite_pragmas_from_env()
+    runs = [("sqlite defaults", {}), ("app profile", profile),
+            ("app profile+WAL", dict(profile, journal_mode="WAL"))]
+    for label, pragmas in runs:
+        result = run(pragmas, args.seconds, args.readers, args.writers)
+        print(f"{label:16} reads/s {result['reads']:8.1f}   writes/s {result['writes']:7.1f}   "
+              f"locked {result['locked']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
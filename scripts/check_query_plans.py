@@ -0,0 +1,163 @@
+"""
+Run EXPLAIN QUERY PLAN over the app's hot read queries and fail on table scans.
+
+The SQL is captured by calling the real CRUD functions (and the query shapes
+the pages build inline), so the check follows the code: if a new filter or
+ORDER BY stops using an index, it shows up here. The calls are read-only and
+work against an empty database.
+
+Usage:
+    python -m scripts.check_query_plans
+
+Uses DATABASE_URL like the app and brings its schema up to date first, as the
+pages do (``ensure_schema``; a no-op with SCHEMA_BOOTSTRAP=off). Exits with status 1 if any hot query falls
+back to a full table scan. Only SQLite query plans are understood.
+"""
+import re
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+# Ensure app package is importable
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.db import engine as default_engine
+from app.schema import ensure_schema
+from app.models.listing import Listing
+from app.models.image import Image
+from app.crud import listings as listings_crud
+from app.crud.favorites import is_favorited, get_user_favorites, get_favorited_listing_ids
+from app.crud.messages import get_conversations, get_conversation_page, get_latest_message_id, get_messages_since, get_user_messages, get_received_messages
+from app.crud.reviews import get_reviews_for_user, get_user_average_rating, has_user_reviewed, get_average_ratings
+from app.crud.saved_searches import get_saved_searches, get_saved_search_matches
+
+# "SCAN listings", optionally walking a whole index in order ("SCAN t USING
+# INDEX ix"): every row is visited. SEARCH lines and virtual tables (FTS) are
+# fine.
+_TABLE_SCAN_RE = re.compile(r"^SCAN (\w+)(?: USING (?:COVERING )?INDEX \w+)?$")
+# SQLAlchemy's name for an anonymous subquery; scanning one reads its result
+_SUBQUERY_RE = re.compile(r"^anon_\d+$")
+
+HOT_QUERIES = {
+    "home: newest listings page": lambda db: listings_crud.get_listings_page(db, limit=10),
+    "home: next listings page": lambda db: listings_crud.get_listings_page(
+        db, cursor=listings_crud._encode_cursor("newest", [1000]), limit=10),
+    "home: filtered search page": lambda db: listings_crud.search_listings_page(
+        db, min_price=5.0, max_price=50.0, conditions=["Good"], categories=["Books"], limit=10),
+    "home: category page": lambda db: listings_crud.search_listings_page(db, categories=["Books"], limit=10),
+    "home: cheapest first page": lambda db: listings_crud.get_listings_page(db, limit=10, sort="price_asc"),
+    "home: priciest first next page": lambda db: listings_crud.get_listings_page(
+        db, cursor=listings_crud._encode_cursor("price_desc", [50.0, 1000]), limit=10, sort="price_desc"),
+    "home: cheapest in category page": lambda db: listings_crud.search_listings_page(
+        db, categories=["Books"], limit=10, sort="price_asc"),
+    "home: keyword search page": lambda db: listings_crud.search_listings_page(db, keyword="calculator", limit=10),
+    "home: keyword search": lambda db: listings_crud.search_listings(db, keyword="calculator"),
+    "profile: listings by owner": lambda db: db.query(Listing).filter(Listing.user_id == 1).all(),
+    "listing images": lambda db: db.query(Image).filter(Image.listing_id == 1).all(),
+    "favorites: is_favorited": lambda db: is_favorited(db, 1, 1),
+    "favorites: get_user_favorites": lambda db: get_user_favorites(db, 1),
+    "messages: get_user_messages": lambda db: get_user_messages(db, 1),
+    "messages: get_received_messages": lambda db: get_received_messages(db, 1),
+    "messages: sidebar conversations": lambda db: get_conversations(db, 1),
+    "messages: latest chat page": lambda db: get_conversation_page(db, 1, 2, 1),
+    "messages: older chat page": lambda db: get_conversation_page(db, 1, 2, None, before_id=1000),
+    "messages: poll for new messages": lambda db: get_messages_since(db, 1, 1000),
+    "messages: latest message id": lambda db: get_latest_message_id(db, 1),
+    "reviews: get_reviews_for_user": lambda db: get_reviews_for_user(db, 1),
+    "reviews: get_user_average_rating": lambda db: get_user_average_rating(db, 1),
+    "reviews: has_user_reviewed": lambda db: has_user_reviewed(db, 1, 2),
+    "home: feed owner ratings": lambda db: get_average_ratings(db, [1, 2, 3]),
+    "home: feed favorites": lambda db: get_favorited_listing_ids(db, 1, [1, 2, 3]),
+    "home: saved searches": lambda db: get_saved_searches(db, 1),
+    "home: saved search alerts": lambda db: get_saved_search_matches(db, 1),
+}
+
+# Unfiltered ORDER BY ... LIMIT pages: SQLite walks the table or an index in
+# sort order and stops after LIMIT rows, so a bare SCAN is the right plan.
+# Only these queries get that exemption; a filtered query that scans in
+# order may read the whole table looking for rare matches.
+ORDERED_WALKS = {
+    "home: newest listings page",
+    "home: cheapest first page",
+}
+
+
+@contextmanager
+def capture_statements(engine):
+    """Collect (statement, parameters) for every SELECT run on engine."""
+    captured = []
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _before)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, "before_cursor_execute", _before)
+
+
+def table_scans(conn, statement, parameters, ordered_walk: bool = False) -> list[str]:
+    """Return the plan lines of statement that scan a whole table.
+
+    With ordered_walk (queries in ORDERED_WALKS), a bare scan is tolerated
+    when the statement has a LIMIT and needs no temp B-tree for sorting.
+    """
+    plan = [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+    # Scanning a materialized subquery reads its result, not a table; the
+    # subquery's own plan lines are checked like any other
+    materialized = {line.split()[1] for line in plan if line.startswith("MATERIALIZE ")}
+    # sqlite_master lookups (FTS availability check) are schema reads, not data
+    scans = [
+        line for line in plan
+        if (match := _TABLE_SCAN_RE.match(line)) and line != "SCAN sqlite_master"
+        and match.group(1) not in materialized and not _SUBQUERY_RE.match(match.group(1))
+    ]
+    if (scans and ordered_walk and " LIMIT " in statement.upper()
+            and not any("TEMP B-TREE" in line for line in plan)):
+        return []
+    return scans
+
+
+def find_table_scans(engine) -> dict[str, list[str]]:
+    """Map hot query name -> offending plan lines; empty if every query uses an index."""
+    if engine.dialect.name != "sqlite":
+        raise RuntimeError("EXPLAIN QUERY PLAN checks only support SQLite")
+    Session = sessionmaker(bind=engine)
+    failures = {}
+    for name, run in HOT_QUERIES.items():
+        db = Session()
+        try:
+            with capture_statements(engine) as captured:
+                run(db)
+            with engine.connect() as conn:
+                scans = [line for stmt, params in captured
+                         for line in table_scans(conn, stmt, params, ordered_walk=name in ORDERED_WALKS)]
+        finally:
+            db.close()
+        if not captured:
+            scans = ["no SELECT was issued"]
+        if scans:
+            failures[name] = scans
+    return failures
+
+
+def main() -> int:
+    ensure_schema(default_engine)
+    failures = find_table_scans(default_engine)
+    if not failures:
+        print(f"All {len(HOT_QUERIES)} hot queries use an index.")
+        return 0
+    for name, scans in failures.items():
+        print(f"TABLE SCAN in '{name}': {'; '.join(scans)}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
-from app.db import SessionLocal
+from app.db import SessionLocal, engine
+from app.schema import ensure_schema
 from app.crud.users import create_user
 import json
 import os
@@ -18,6 +19,7 @@ if __name__ == "__main__":
     email = sys.argv[1]
     password = sys.argv[2]
 
+    ensure_schema(engine)
     db = SessionLocal()
     try:
         try:
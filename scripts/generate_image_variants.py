@@ -0,0 +1,53 @@
+"""
+Generate thumbnail/display variants for listing images uploaded before them.
+
+New uploads get their variants when the listing is created; this fills in
+Image rows whose thumbnail_url/display_url are still empty. Rows whose file
+is missing or unreadable are left alone (pages fall back to the original).
+
+Usage:
+    python -m scripts.generate_image_variants
+
+Uses DATABASE_URL like the app and brings its schema up to date first
+(``ensure_schema`` adds the variant columns to older databases). Prints how
+many images were processed.
+"""
+import os
+import sys
+from pathlib import Path
+
+# Ensure app package is importable
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.db import SessionLocal, engine
+from app.models.image import Image
+from app.schema import ensure_schema
+from app.storage import generate_image_variants
+
+
+def main() -> int:
+    ensure_schema(engine)
+    db = SessionLocal()
+    done = skipped = 0
+    try:
+        pending = db.query(Image).filter(
+            (Image.thumbnail_url.is_(None)) | (Image.display_url.is_(None))
+        ).all()
+        for image in pending:
+            stored = generate_image_variants(image.url) if os.path.exists(image.url) else None
+            if stored is None or stored.display_url is None:
+                skipped += 1
+                continue
+            image.thumbnail_url, image.display_url = stored.thumbnail_url, stored.display_url
+            done += 1
+        db.commit()
+    finally:
+        db.close()
+    print(f"Generated variants for {done} image(s); skipped {skipped}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
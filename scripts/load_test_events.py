@@ -0,0 +1,216 @@
+"""
+Load test: how many idle event-stream connections one backend worker holds.
+
+Starts one uvicorn worker for app.backend on a fresh temporary database, opens
+N concurrent Server-Sent Events streams (GET /users/{id}/events) all
+subscribed to one user, and leaves them idle. It then sends that user one
+message and times its delivery to every stream.
+
+Usage:
+    python -m scripts.load_test_events [--connections 1000] [--idle 5] [--port 8765]
+
+Prints the connections the hub reports, the worker's resident memory before
+and after (and per connection), and the fan-out latency of the message.
+Both ends run on this machine, so each connection costs two file
+descriptors; the open-file limit is raised to its hard maximum first.
+"""
+import argparse
+import asyncio
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from sqlalchemy.orm import sessionmaker
+
+# Ensure app package is importable
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.db import Base, build_engine
+from app.models.user import User
+
+
+def _raise_file_limit() -> int:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard != resource.RLIM_INFINITY and soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+
+
+def _rss_mb(pid: int) -> float | None:
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        return None
+    return None
+
+
+def _seed(url: str) -> tuple[int, int]:
+    engine = build_engine(url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        sender = User(email="loadtest-sender@charlotte.edu", hashed_password="x")
+        receiver = User(email="loadtest-receiver@charlotte.edu", hashed_password="x")
+        db.add_all([sender, receiver]); db.commit()
+        return sender.id, receiver.id
+    finally:
+        db.close()
+        engine.dispose()
+
+
+async def _hold_stream(host: str, port: int, user_id: int, ready: asyncio.Event, received: list, errors: list):
+    """Keep one event stream open; record when message events arrive.
+
+    A bare HTTP/1.1 request over asyncio streams rather than an httpx client:
+    thousands of httpx streams in one process cost more than the server being
+    measured.
+    """
+    writer = None
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(f"GET /users/{user_id}/events HTTP/1.1\r\nHost: {host}\r\n"
+                     f"Accept: text/event-stream\r\n\r\n".encode("ascii"))
+        status = await reader.readline()
+        if b" 200 " not in status:
+            raise RuntimeError(status.decode("latin-1").strip())
+        ready.set()
+        # chunk-size lines are interleaved with the events; only event names matter here
+        while line := await reader.readline():
+            if line.startswith(b"event: message"):
+                received.append(time.perf_counter())
+    except asyncio.CancelledError:
+        raise
+    except Exception as exc:
+        errors.append(repr(exc))
+        ready.set()
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+async def _wait_for_connections(client, expected: int, timeout: float) -> int:
+    deadline = time.monotonic() + timeout
+    connections = 0
+    while time.monotonic() < deadline:
+        connections = (await client.get("/events/stats")).json()["connections"]
+        if connections >= expected:
+            break
+        await asyncio.sleep(0.2)
+    return connections
+
+
+async def _run_load(host: str, port: int, pid: int, sender_id: int, receiver_id: int,
+                    n_connections: int, idle: float) -> dict:
+    async with httpx.AsyncClient(base_url=f"http://{host}:{port}", timeout=None) as client:
+        rss_before = _rss_mb(pid)
+        received, errors = [], []
+        readies = [asyncio.Event() for _ in range(n_connections)]
+        started = time.perf_counter()
+        tasks = [
+            asyncio.create_task(_hold_stream(host, port, receiver_id, ready, received, errors))
+            for ready in readies
+        ]
+        await asyncio.gather(*(ready.wait() for ready in readies))
+        connections = await _wait_for_connections(client, n_connections - len(errors), timeout=30)
+        connect_seconds = time.perf_counter() - started
+
+        await asyncio.sleep(idle)
+        rss_idle = _rss_mb(pid)
+        still_open = (await client.get("/events/stats")).json()["connections"]
+
+        sent_at = time.perf_counter()
+        response = await client.post("/messages", json={"sender_id": sender_id, "receiver_id": receiver_id,
+                                                        "content": "load test"})
+        response.raise_for_status()
+        deadline = time.monotonic() + 30
+        while len(received) < still_open and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        latencies = sorted((t - sent_at) * 1000.0 for t in received)
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    return {
+        "connections": connections,
+        "connect_s": connect_seconds,
+        "still_open": still_open,
+        "errors": errors,
+        "rss_before": rss_before,
+        "rss_idle": rss_idle,
+        "delivered": len(latencies),
+        "p50_ms": statistics.median(latencies) if latencies else None,
+        "max_ms": latencies[-1] if latencies else None,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--idle", type=float, default=5.0, help="seconds to hold the streams idle")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    file_limit = _raise_file_limit()
+    if file_limit != resource.RLIM_INFINITY and 2 * args.connections + 100 > file_limit:
+        print(f"Open-file limit is {file_limit}; {args.connections} connections need about "
+              f"{2 * args.connections + 100}. Lower --connections or raise the limit.")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'events.db')}"
+        sender_id, receiver_id = _seed(url)
+        env = dict(os.environ, DATABASE_URL=url)
+        env.pop("ASYNC_DATABASE_URL", None)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.backend:app", "--port", str(args.port),
+             "--log-level", "warning", "--no-access-log"],
+            cwd=ROOT, env=env,
+        )
+        host = "127.0.0.1"
+        base_url = f"http://{host}:{args.port}"
+        try:
+            for _ in range(100):
+                try:
+                    httpx.get(f"{base_url}/events/stats", timeout=1)
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.1)
+            else:
+                print("Backend did not start.")
+                return 1
+            result = asyncio.run(_run_load(host, args.port, server.pid, sender_id, receiver_id,
+                                           args.connections, args.idle))
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+    print(f"{result['connections']} of {args.connections} streams connected in {result['connect_s']:.2f}s; "
+          f"{result['still_open']} still open after {args.idle:.0f}s idle")
+    if result["errors"]:
+        print(f"{len(result['errors'])} failed, e.g. {result['errors'][0]}")
+    if result["rss_before"] is not None and result["rss_idle"] is not None:
+        per_conn = (result["rss_idle"] - result["rss_before"]) * 1024.0 / max(result["still_open"], 1)
+        print(f"worker RSS {result['rss_before']:.1f} MB -> {result['rss_idle']:.1f} MB "
+              f"(~{per_conn:.1f} KB per idle connection)")
+    if result["delivered"]:
+        print(f"message delivered to {result['delivered']} streams: "
+              f"p50 {result['p50_ms']:.1f} ms, max {result['max_ms']:.1f} ms")
+    else:
+        print("message was not delivered to any stream")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
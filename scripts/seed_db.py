@@ -1,10 +1,11 @@
-from app.db import SessionLocal, Base, engine
+from app.db import SessionLocal, engine
+from app.schema import ensure_schema
 from app.crud.listings import create_listing
 from app.models.listing import Listing  # Needed for duplicate check
 
 def seed_database():
     """Populate the database with initial demo data if empty."""
-    Base.metadata.create_all(bind=engine)
+    ensure_schema(engine)
     db = SessionLocal()
 
     try:
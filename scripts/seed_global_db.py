@@ -22,11 +22,10 @@ ROOT = Path(__file__).resolve().parent.parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from app.storage import get_upload_subdir
-from app.db import Base
+from app.storage import get_upload_subdir, generate_image_variants
+from app.schema import bootstrap_schema
 from app.models.user import User
-from app.models.listing import Listing
-from app.models.image import Image
+from app.crud.listings import create_listings_bulk
 from app.crud.users import hash_password
 
 
@@ -88,7 +87,7 @@ def seed():
     engine = create_engine(DB_URL, connect_args={"check_same_thread": False})
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-    Base.metadata.create_all(bind=engine)
+    bootstrap_schema(engine)
 
     db = SessionLocal()
     try:
@@ -186,6 +185,7 @@ def seed():
             ),
         ]
 
+        rows = []
         for data in listings:
             target_paths = []
             image_sources = data.get("image_sources") or []
@@ -204,7 +204,7 @@ def seed():
                 create_placeholder_image(dest, data["title"], data["price"])
                 target_paths.append(dest)
 
-            listing = Listing(
+            rows.append(dict(
                 title=data["title"],
                 description=data["description"],
                 price=data["price"],
@@ -213,13 +213,11 @@ def seed():
                 user_id=user_by_email[data["user_email"]],
                 contact_email=data["contact_email"],
                 contact_phone=data["contact_phone"],
-            )
-            db.add(listing)
-            db.flush()  # get listing.id
-            for img_path in target_paths:
-                db.add(Image(url=str(img_path), listing_id=listing.id))
+                image_urls=[generate_image_variants(str(img_path)) for img_path in target_paths],
+            ))
 
-        db.commit()
+        # One transaction for all listings and their images
+        create_listings_bulk(db, rows)
         print(f"Seeded demo data into {DB_PATH}")
     finally:
         db.close()
@@ -0,0 +1,266 @@
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.async_db import build_async_engine, to_async_url
+from app.db import Base, build_engine
+from app.models.user import User
+from app.crud import async_favorites, async_listings, async_messages, async_reviews
+from app.crud.listings import create_listing
+from app.crud.reviews import get_user_average_rating
+from app.message_hub import hub
+from app.result_cache import get_result_cache
+
+# --- File-backed database shared by a sync and an async engine ---
+
+@pytest.fixture
+def db_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'market.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    return url
+
+
+@pytest.fixture
+def users(db_url):
+    engine = create_engine(db_url)
+    db = sessionmaker(bind=engine)()
+    seller = User(email="seller@charlotte.edu", hashed_password="x")
+    buyer = User(email="buyer@charlotte.edu", hashed_password="x")
+    db.add_all([seller, buyer]); db.commit()
+    ids = seller.id, buyer.id
+    db.close(); engine.dispose()
+    return ids
+
+
+def run(db_url, fn):
+    """Run fn(session_factory) on a fresh event loop with an aiosqlite engine."""
+    async def main():
+        engine = create_async_engine(to_async_url(db_url), poolclass=NullPool)
+        try:
+            return await fn(async_sessionmaker(bind=engine, expire_on_commit=False))
+        finally:
+            await engine.dispose()
+    return asyncio.run(main())
+
+
+def test_to_async_url():
+    assert to_async_url("sqlite:///./market.db") == "sqlite+aiosqlite:///./market.db"
+    assert to_async_url("postgresql://u:p@db/market") == "postgresql+asyncpg://u:p@db/market"
+    assert to_async_url("sqlite+aiosqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+    with pytest.raises(ValueError):
+        to_async_url("mysql://u:p@db/market")
+
+
+def test_listing_validation_matches_sync(db_url, users):
+    seller_id, _ = users
+
+    async def scenario(Session):
+        async with Session() as db:
+            for kwargs in ({"price": -1}, {"price": "abc"}, {"condition": "Broken"}, {"category": "Cars"}):
+                fields = {"title": "T", "description": "D", "price": 5.0, "user_id": seller_id, **kwargs}
+                with pytest.raises(ValueError) as async_err:
+                    await async_listings.create_listing(db, **fields)
+                with pytest.raises(ValueError) as sync_err:
+                    await db.run_sync(create_listing, **fields)
+                assert str(async_err.value) == str(sync_err.value)
+    run(db_url, scenario)
+
+
+def test_create_read_and_page_listings(db_url, users):
+    seller_id, _ = users
+
+    async def scenario(Session):
+        async with Session() as db:
+            assert (await async_listings.get_listings_page(db, limit=5)).items == []
+            created = await async_listings.create_listing(
+                db, title="Desk lamp", description="LED", price=12.5, user_id=seller_id,
+                image_urls=["static/uploads/lamp.jpg"], category="Electronics",
+            )
+            assert [img.url for img in created.images] == ["static/uploads/lamp.jpg"]
+        async with Session() as db:
+            listing = await async_listings.get_listing(db, created.id)
+            assert listing.title == "Desk lamp" and len(listing.images) == 1
+            # the create bumped the catalogue version, so the cached empty page is gone
+            page = await async_listings.get_listings_page(db, limit=5)
+            assert [l.title for l in page.items] == ["Desk lamp"]
+            hits = await async_listings.search_listings_page(db, keyword="lamp", categories=["Electronics"])
+            assert [l.id for l in hits.items] == [created.id]
+            updated = await async_listings.update_listing(db, created.id, price=10)
+            assert updated.price == 10.0
+            with pytest.raises(ValueError, match="non-negative"):
+                await async_listings.update_listing(db, created.id, price=-3)
+    run(db_url, scenario)
+
+
+def test_favorites(db_url, users):
+    seller_id, buyer_id = users
+
+    async def scenario(Session):
+        async with Session() as db:
+            listing = await async_listings.create_listing(db, title="Chair", description="Oak", price=30,
+                                                          user_id=seller_id)
+            assert not await async_favorites.is_favorited(db, buyer_id, listing.id)
+            await async_favorites.add_favorite(db, buyer_id, listing.id)
+            assert await async_favorites.is_favorited(db, buyer_id, listing.id)
+            assert await async_favorites.get_favorited_listing_ids(db, buyer_id, [listing.id, 999]) == {listing.id}
+            await async_favorites.remove_favorite(db, buyer_id, listing.id)
+            assert await async_favorites.get_user_favorites(db, buyer_id) == []
+    run(db_url, scenario)
+
+
+def test_messages(db_url, users):
+    seller_id, buyer_id = users
+
+    async def scenario(Session):
+        async with Session() as db:
+            with pytest.raises(ValueError, match="Receiver does not exist"):
+                await async_messages.send_message(db, buyer_id, 999, "Hi")
+            with pytest.raises(ValueError, match="cannot be empty"):
+                await async_messages.send_message(db, buyer_id, seller_id, "   ")
+            msg = await async_messages.send_message(db, buyer_id, seller_id, "Is this still available?")
+            received = await async_messages.get_received_messages(db, seller_id)
+            assert [m.id for m in received] == [msg.id]
+            assert received[0].sender.email == "buyer@charlotte.edu"
+            [summary] = await async_messages.get_conversations(db, seller_id)
+            assert (summary.other_user_id, summary.unread_count) == (buyer_id, 1)
+            assert summary.preview == "Is this still available?"
+            assert (await async_messages.mark_as_read(db, msg.id)).is_read
+            assert (await async_messages.get_conversations(db, seller_id))[0].unread_count == 0
+    run(db_url, scenario)
+
+
+def test_reviews_keep_rating_stats(db_url, users):
+    seller_id, buyer_id = users
+
+    async def scenario(Session):
+        async with Session() as db:
+            with pytest.raises(ValueError, match="cannot review yourself"):
+                await async_reviews.create_review(db, seller_id, seller_id, 5)
+            with pytest.raises(ValueError, match="between 1.0 and 5.0"):
+                await async_reviews.create_review(db, buyer_id, seller_id, 6)
+            review = await async_reviews.create_review(db, buyer_id, seller_id, 4, "Smooth pickup")
+            assert await async_reviews.has_user_reviewed(db, buyer_id, seller_id)
+            await async_reviews.update_review(db, review.id, rating=2)
+            assert await async_reviews.get_user_average_rating(db, seller_id) == 2.0
+            # the sync read path sees the same running totals
+            assert await db.run_sync(get_user_average_rating, seller_id) == 2.0
+            assert await async_reviews.delete_review(db, review.id)
+            assert await async_reviews.get_average_ratings(db, [seller_id]) == {}
+    run(db_url, scenario)
+
+
+def test_concurrent_sessions(db_url, users):
+    seller_id, _ = users
+
+    async def scenario(Session):
+        async with Session() as db:
+            listing = await async_listings.create_listing(db, title="Bike", description="Road", price=80,
+                                                          user_id=seller_id)
+
+        async def read():
+            async with Session() as db:
+                return (await async_listings.get_listing(db, listing.id)).title
+
+        return await asyncio.gather(*(read() for _ in range(10)))
+    assert run(db_url, scenario) == ["Bike"] * 10
+
+
+def test_concurrent_first_index_loads_do_not_block_the_loop(db_url, users):
+    seller_id, _ = users
+
+    async def scenario(Session):
+        async def suggest():
+            async with Session() as db:
+                return [s.text for s in await async_listings.get_search_suggestions(db, "bi")]
+
+        async def fuzzy():
+            async with Session() as db:
+                return len((await async_listings.search_listings_page(db, keyword="bike", fuzzy=True)).items)
+
+        async def create(i):
+            async with Session() as db:
+                return (await async_listings.create_listing(db, title=f"Bike {i}", description="Road", price=80,
+                                                            user_id=seller_id)).title
+
+        # each engine loads its autocomplete, fuzzy and saved-search indexes on first use
+        return await asyncio.gather(*(suggest() for _ in range(3)), *(fuzzy() for _ in range(3)),
+                                    *(create(i) for i in range(3)))
+
+    results = []
+    # a deadlock blocks the event loop itself, so watch it from another thread
+    worker = threading.Thread(target=lambda: results.append(run(db_url, scenario)), daemon=True)
+    worker.start()
+    worker.join(timeout=30)
+    assert not worker.is_alive(), "first index loads deadlocked the event loop"
+    assert results[0][6:] == ["Bike 0", "Bike 1", "Bike 2"]
+
+
+def test_async_reads_share_the_sync_engines_caches_off_the_loop(db_url, users):
+    seller_id, _ = users
+    sync_engine = build_engine(db_url)
+    SyncSession = sessionmaker(bind=sync_engine)
+    read_threads = []
+    event.listen(sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, stmt, params, ctx, many: read_threads.append(threading.get_ident()))
+
+    async def scenario():
+        engine = build_async_engine(to_async_url(db_url), sync_engine=sync_engine)
+        Session = async_sessionmaker(bind=engine, expire_on_commit=False)
+        try:
+            async with Session() as db:
+                first = await async_listings.search_listings_page(db, keyword="kayak", fuzzy=True)
+                # A Streamlit page writes through the sync engine
+                with SyncSession() as sync_db:
+                    create_listing(sync_db, title="Kayak", description="Two seats", price=150.0,
+                                   image_urls=[], user_id=seller_id)
+                    assert get_result_cache(sync_db) is get_result_cache(db.sync_session)
+                second = await async_listings.search_listings_page(db, keyword="kayak", fuzzy=True)
+                return first, second, threading.get_ident()
+        finally:
+            await engine.dispose()
+
+    first, second, loop_thread = asyncio.run(scenario())
+    sync_engine.dispose()
+    assert first.items == [] and [l.title for l in second.items] == ["Kayak"]
+    # The sync write ran on the loop thread; the reads ran in worker threads
+    assert set(read_threads) - {loop_thread}
+
+
+def test_messages_are_published_after_commit(db_url, users):
+    seller_id, buyer_id = users
+
+    async def scenario(Session):
+        seller_stream, buyer_stream = hub.subscribe(seller_id), hub.subscribe(buyer_id)
+        try:
+            async with Session() as db:
+                msg = await async_messages.send_message(db, buyer_id, seller_id, "Still for sale?")
+                event = await seller_stream.get()
+                assert (event["type"], event["message"].id) == ("message", msg.id)
+                assert await seller_stream.get() == {"type": "unread", "unread_count": 1}
+                # the sender's other tabs hear about it too, without an unread bump
+                assert (await buyer_stream.get())["message"].id == msg.id
+                assert buyer_stream.queue.empty()
+
+                await async_messages.mark_as_read(db, msg.id)
+                assert await seller_stream.get() == {"type": "unread", "unread_count": 0}
+                await async_messages.mark_as_read(db, msg.id)
+                assert seller_stream.queue.empty()
+
+                later = [await async_messages.send_message(db, buyer_id, seller_id, f"Offer {i}") for i in range(3)]
+                while not seller_stream.queue.empty():
+                    seller_stream.queue.get_nowait()
+                assert await async_messages.mark_conversation_read(db, seller_id, buyer_id, None, later[-1].id) == 3
+                assert await seller_stream.get() == {"type": "unread", "unread_count": 0}
+                assert await async_messages.mark_conversation_read(db, seller_id, buyer_id, None, later[-1].id) == 0
+                assert seller_stream.queue.empty()
+        finally:
+            hub.unsubscribe(seller_stream)
+            hub.unsubscribe(buyer_stream)
+    run(db_url, scenario)
@@ -0,0 +1,93 @@
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.models.user import User
+from app.autocomplete import AutocompleteIndex, Suggestion
+from app.crud.listings import create_listing, delete_listing, get_search_suggestions, update_listing
+
+# --- Setup in-memory test database ---
+
+@pytest.fixture(scope="function")
+def test_db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def owner(test_db):
+    user = User(email="suggest_owner@charlotte.edu", hashed_password="x")
+    test_db.add(user); test_db.commit(); test_db.refresh(user)
+    return user
+
+
+def _add(db, owner, title, category="Other"):
+    return create_listing(db, title=title, description="Pickup on campus", price=10.0,
+                          image_urls=[], user_id=owner.id, category=category)
+
+
+def _texts(suggestions):
+    return [s.text for s in suggestions]
+
+
+def test_completes_by_frequency(test_db, owner):
+    _add(test_db, owner, "Graphing calculator")
+    _add(test_db, owner, "Scientific calculator")
+    _add(test_db, owner, "Calculus textbook", "Books")
+    suggestions = get_search_suggestions(test_db, "calc")
+    assert suggestions[0] == Suggestion("calculator", 2, "word")
+    assert _texts(suggestions) == ["calculator", "calculus"]
+
+
+def test_keeps_earlier_words_and_offers_categories(test_db, owner):
+    _add(test_db, owner, "Graphing calculator", "Electronics")
+    assert _texts(get_search_suggestions(test_db, "Graphing CA")) == ["graphing calculator"]
+    assert Suggestion("Electronics", 1, "category") in get_search_suggestions(test_db, "elec")
+    assert get_search_suggestions(test_db, "graphing ") == []
+    assert get_search_suggestions(test_db, "") == []
+
+
+def test_updates_incrementally_on_writes(test_db, owner):
+    get_search_suggestions(test_db, "l")  # load the index before writing
+    lamp = _add(test_db, owner, "Desk lamp")
+    assert _texts(get_search_suggestions(test_db, "la")) == ["lamp"]
+    update_listing(test_db, lamp.id, title="Desk laptop stand")
+    assert _texts(get_search_suggestions(test_db, "la")) == ["laptop"]
+    delete_listing(test_db, lamp.id)
+    assert get_search_suggestions(test_db, "la") == []
+
+
+def test_memoized_short_prefixes_track_counts():
+    index = AutocompleteIndex()
+    index.load([(1, "bike", None), (2, "bike lock", None), (3, "bowl", None)])
+    assert _texts(index.suggest("b")) == ["bike", "bowl"]
+    index.upsert(4, "bowl", None)
+    index.upsert(5, "bowl", None)
+    assert _texts(index.suggest("b")) == ["bowl", "bike"]
+    index.remove(4)
+    index.remove(5)
+    index.remove(3)
+    assert index.suggest("b") == [Suggestion("bike", 2, "word")]
+
+
+def test_lookup_is_fast():
+    index = AutocompleteIndex()
+    index.load((i, f"item{i % 5000} widget{i % 700}", "Other") for i in range(50_000))
+    index.suggest("i")
+    start = time.perf_counter()
+    for _ in range(200):
+        index.suggest("item12")
+        index.suggest("w")
+    assert (time.perf_counter() - start) / 400 < 0.001
+
+
+def test_invalid_limit():
+    with pytest.raises(ValueError):
+        AutocompleteIndex().suggest("a", limit=0)
@@ -0,0 +1,81 @@
+import base64
+import io
+import os
+
+import pytest
+from PIL import Image as PILImage
+
+from app.avatars import DEFAULT_AVATAR_PIXELS, AvatarCache, render_avatar
+
+
+def _picture(path, size=(1200, 600), color=(0, 80, 53)):
+    PILImage.new("RGB", size, color).save(path, "JPEG")
+    return str(path)
+
+
+def _decode(uri):
+    header, b64 = uri.split(",", 1)
+    assert header == "data:image/webp;base64"
+    return PILImage.open(io.BytesIO(base64.b64decode(b64)))
+
+
+def test_avatar_is_a_small_square(tmp_path):
+    uri = AvatarCache().data_uri(_picture(tmp_path / "me.jpg"))
+    img = _decode(uri)
+    assert img.size == (DEFAULT_AVATAR_PIXELS, DEFAULT_AVATAR_PIXELS)
+    assert len(uri) < os.path.getsize(tmp_path / "me.jpg")
+
+
+def test_repeat_renders_are_hits(tmp_path):
+    path = _picture(tmp_path / "me.jpg")
+    cache = AvatarCache()
+    uris = {cache.data_uri(path) for _ in range(30)}
+    assert len(uris) == 1
+    assert (cache.hits, cache.misses) == (29, 1)
+
+
+def test_replaced_picture_is_rerendered(tmp_path):
+    path = _picture(tmp_path / "me.jpg")
+    cache = AvatarCache()
+    first = cache.data_uri(path)
+    _picture(tmp_path / "me.jpg", size=(500, 500), color=(200, 0, 0))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert cache.data_uri(path) != first
+    assert cache.misses == 2
+
+
+def test_memory_bound_evicts_least_recent(tmp_path):
+    paths = [_picture(tmp_path / f"{i}.jpg", color=(i * 40, 0, 0)) for i in range(4)]
+    one = len(AvatarCache().data_uri(paths[0]))
+    cache = AvatarCache(max_bytes=one * 2 + one // 2)
+    cache.data_uri(paths[0]); cache.data_uri(paths[1])
+    cache.data_uri(paths[0])  # paths[1] is now least recent
+    cache.data_uri(paths[2])
+    assert len(cache) == 2 and cache.nbytes <= cache.max_bytes
+    cache.data_uri(paths[0])
+    assert cache.hits == 2
+    cache.data_uri(paths[1])
+    assert cache.misses == 4
+
+
+def test_missing_or_broken_files_give_none(tmp_path):
+    broken = tmp_path / "broken.png"
+    broken.write_bytes(b"not an image")
+    cache = AvatarCache()
+    assert cache.data_uri(None) is None
+    assert cache.data_uri(str(tmp_path / "gone.jpg")) is None
+    assert cache.data_uri(str(broken)) is None
+    assert len(cache) == 0
+
+
+def test_transparency_is_kept(tmp_path):
+    path = tmp_path / "clear.png"
+    PILImage.new("RGBA", (100, 100), (0, 0, 0, 0)).save(path)
+    with PILImage.open(io.BytesIO(render_avatar(str(path)))) as img:
+        assert img.mode == "RGBA"
+
+
+def test_invalid_bound():
+    with pytest.raises(ValueError):
+        AvatarCache(max_bytes=0)
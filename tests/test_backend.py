@@ -0,0 +1,99 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.async_db import to_async_url
+from app.backend import app, get_db
+from app.db import Base
+from app.models.user import User
+from app.query_metrics import instrument_engine
+
+# --- Backend wired to a temporary database through the get_db dependency ---
+
+@pytest.fixture
+def client(tmp_path):
+    url = f"sqlite:///{tmp_path / 'market.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all([User(email="seller@charlotte.edu", hashed_password="x"),
+                User(email="buyer@charlotte.edu", hashed_password="x")])
+    db.commit(); db.close(); engine.dispose()
+
+    async_engine = create_async_engine(to_async_url(url), poolclass=NullPool)
+    instrument_engine(async_engine.sync_engine)
+    Session = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+    async def override_get_db():
+        async with Session() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+
+
+def test_listing_endpoints(client):
+    body = {"user_id": 1, "title": "Desk lamp", "description": "LED", "price": 12.5,
+            "category": "Electronics", "image_urls": ["static/uploads/lamp.jpg"]}
+    created = client.post("/listings", json=body)
+    assert created.status_code == 201
+    listing_id = created.json()["id"]
+    assert created.json()["images"][0]["url"] == "static/uploads/lamp.jpg"
+
+    fetched = client.get(f"/listings/{listing_id}")
+    assert fetched.json()["title"] == "Desk lamp"
+    # app.query_metrics counts the request's SQL
+    assert int(fetched.headers["X-SQL-Queries"]) >= 1
+    page = client.get("/listings", params={"keyword": "lamp", "category": ["Electronics"], "facets": True}).json()
+    assert [l["id"] for l in page["items"]] == [listing_id] and page["next_cursor"] is None
+    assert page["facets"]["categories"]["Electronics"] == 1
+    assert [l["id"] for l in client.get("/users/1/listings").json()] == [listing_id]
+
+
+def test_listing_errors(client):
+    bad = client.post("/listings", json={"user_id": 1, "title": "T", "description": "D", "price": -1})
+    assert bad.status_code == 400 and bad.json()["detail"] == "Price cannot be negative"
+    # a missing listing is a 404, not the redirect used for unknown paths
+    assert client.get("/listings/999").status_code == 404
+    created = client.post("/listings", json={"user_id": 1, "title": "T", "description": "D", "price": 1}).json()
+    assert client.post(f"/listings/{created['id']}/sold", params={"user_id": 2}).status_code == 403
+    assert client.post(f"/listings/{created['id']}/sold", params={"user_id": 1}).json()["is_sold"] is True
+
+
+def test_favorites_messages_and_reviews(client):
+    listing = client.post("/listings", json={"user_id": 1, "title": "Chair", "description": "Oak",
+                                             "price": 30}).json()
+    assert client.put(f"/users/2/favorites/{listing['id']}").status_code == 200
+    assert client.put(f"/users/2/favorites/{listing['id']}").status_code == 200
+    assert client.get("/users/2/favorites").json() == [listing["id"]]
+    client.delete(f"/users/2/favorites/{listing['id']}")
+    assert client.get("/users/2/favorites").json() == []
+
+    sent = client.post("/messages", json={"sender_id": 2, "receiver_id": 1, "content": "Still available?"})
+    assert sent.status_code == 201
+    assert client.post("/messages", json={"sender_id": 2, "receiver_id": 1, "content": " "}).status_code == 400
+    assert client.post(f"/messages/{sent.json()['id']}/read").json()["is_read"] is True
+    assert [m["content"] for m in client.get("/users/1/messages").json()] == ["Still available?"]
+    client.post("/messages", json={"sender_id": 1, "receiver_id": 2, "content": "Yes"})
+    [convo] = client.get("/users/1/conversations").json()
+    assert (convo["other_user_id"], convo["preview"], convo["unread_count"]) == (2, "Yes", 0)
+    page = client.get("/users/1/conversations/2/messages", params={"limit": 1}).json()
+    assert [m["content"] for m in page["items"]] == ["Yes"]
+    older = client.get("/users/1/conversations/2/messages", params={"before_id": page["next_before_id"]}).json()
+    assert ([m["content"] for m in older["items"]], older["next_before_id"]) == (["Still available?"], None)
+    assert client.get("/users/1/conversations/2/messages", params={"limit": 0}).status_code == 400
+    since = client.get("/users/1/messages/since", params={"last_seen_id": sent.json()["id"]}).json()
+    assert [m["content"] for m in since] == ["Yes"]
+    read = client.post("/users/2/conversations/1/read", params={"up_to_id": since[0]["id"]})
+    assert read.json() == {"marked": 1}
+    assert client.get("/users/2/conversations").json()[0]["unread_count"] == 0
+
+    review = {"reviewer_id": 2, "reviewed_user_id": 1, "rating": 4.0, "comment": "Great"}
+    assert client.post("/reviews", json=review).status_code == 201
+    assert client.post("/reviews", json=review).status_code == 409
+    assert client.get("/users/1/reviews").json()["average_rating"] == 4.0
@@ -0,0 +1,143 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.models.user import User
+from app.models.listing import Listing
+from app.models.image import Image
+from app.models.favorite import Favorite
+from app.models.message import Message
+from app.models.saved_search import SavedSearchMatch
+from app.crud.favorites import add_favorite
+from app.crud.messages import send_message
+from app.crud.saved_searches import create_saved_search
+from app.crud.listings import (
+    ForbiddenAction, cached_listing_read, create_listings_bulk, delete_listing, delete_listings_bulk,
+    get_listings_page, get_search_suggestions, mark_sold_bulk, search_listings,
+)
+
+# --- Setup in-memory test database ---
+
+@pytest.fixture(scope="function")
+def test_db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    TestingSessionLocal = sessionmaker(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    yield db
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def users(test_db):
+    seller = User(email="bulk_seller@charlotte.edu", hashed_password="x")
+    buyer = User(email="bulk_buyer@charlotte.edu", hashed_password="x")
+    test_db.add_all([seller, buyer]); test_db.commit()
+    return seller, buyer
+
+
+def _rows(seller, n, **kw):
+    return [dict(title=f"Lamp {i}", description="Desk lamp", price=float(i), user_id=seller.id,
+                 image_urls=[f"img/lamp_{i}.jpg"], **kw) for i in range(n)]
+
+
+def test_bulk_create_in_one_transaction(test_db, users):
+    seller, _ = users
+    commits = []
+    event.listen(test_db, "after_commit", lambda session: commits.append(1))
+    ids = create_listings_bulk(test_db, _rows(seller, 50, category="Electronics"))
+
+    assert len(ids) == 50 and len(commits) == 1
+    assert test_db.query(Listing).count() == 50
+    first = test_db.get(Listing, ids[0])
+    assert (first.title, first.condition, first.category) == ("Lamp 0", "Good", "Electronics")
+    assert [img.url for img in first.images] == ["img/lamp_0.jpg"]
+    # FTS follows via triggers
+    assert len(search_listings(test_db, keyword="lamp")) == 50
+
+
+def test_bulk_create_validates_everything_first(test_db, users):
+    seller, _ = users
+    rows = _rows(seller, 3)
+    rows[2]["price"] = -5
+    with pytest.raises(ValueError, match="Listing 2: Price cannot be negative"):
+        create_listings_bulk(test_db, rows)
+    with pytest.raises(ValueError, match="Listing 0: Unknown field"):
+        create_listings_bulk(test_db, [dict(_rows(seller, 1)[0], colour="red")])
+    assert test_db.query(Listing).count() == 0
+    assert create_listings_bulk(test_db, []) == []
+
+
+def test_bulk_writes_keep_caches_and_indexes_current(test_db, users):
+    seller, _ = users
+    assert cached_listing_read(test_db, get_listings_page, limit=5).items == []
+    # load the fuzzy and autocomplete indexes before the bulk write
+    assert search_listings(test_db, keyword="lampp", fuzzy=True) == []
+    assert get_search_suggestions(test_db, "lam") == []
+
+    ids = create_listings_bulk(test_db, _rows(seller, 3))
+    assert len(cached_listing_read(test_db, get_listings_page, limit=5).items) == 3
+    assert len(search_listings(test_db, keyword="lampp", fuzzy=True)) == 3
+    assert [s.text for s in get_search_suggestions(test_db, "lam")] == ["lamp"]
+
+    assert delete_listings_bulk(test_db, ids[:2]) == 2
+    assert len(cached_listing_read(test_db, get_listings_page, limit=5).items) == 1
+    assert [l.id for l in search_listings(test_db, keyword="lampp", fuzzy=True)] == [ids[2]]
+
+
+def test_bulk_create_percolates_saved_searches(test_db, users):
+    seller, buyer = users
+    create_saved_search(test_db, buyer.id, keyword="lamp")
+    create_saved_search(test_db, seller.id, keyword="lamp")
+    create_listings_bulk(test_db, _rows(seller, 4))
+    # the seller's own saved search is skipped
+    assert test_db.query(SavedSearchMatch).filter_by(user_id=buyer.id).count() == 4
+    assert test_db.query(SavedSearchMatch).filter_by(user_id=seller.id).count() == 0
+
+
+@pytest.mark.parametrize("delete", ["single", "bulk"])
+def test_single_and_bulk_delete_cascade_the_same_way(test_db, users, delete):
+    seller, buyer = users
+    create_saved_search(test_db, buyer.id, keyword="lamp")
+    ids = create_listings_bulk(test_db, _rows(seller, 3))
+    add_favorite(test_db, buyer.id, ids[0])
+    msg = send_message(test_db, buyer.id, seller.id, "Still available?", listing_id=ids[0])
+
+    if delete == "single":
+        assert delete_listing(test_db, ids[0]) and delete_listing(test_db, ids[1])
+        assert delete_listing(test_db, 9999) is False
+    else:
+        assert delete_listings_bulk(test_db, [ids[0], ids[1], 9999]) == 2
+    assert [l.id for l in test_db.query(Listing)] == [ids[2]]
+    assert test_db.query(Image).count() == 1
+    assert test_db.query(Favorite).count() == 0
+    assert [m.listing_id for m in test_db.query(SavedSearchMatch)] == [ids[2]]
+    test_db.refresh(msg)
+    assert msg.listing_id is None
+
+
+def test_bulk_ownership_checks(test_db, users):
+    seller, buyer = users
+    ids = create_listings_bulk(test_db, _rows(seller, 2))
+    with pytest.raises(ForbiddenAction):
+        mark_sold_bulk(test_db, ids, user_id=buyer.id)
+    with pytest.raises(ForbiddenAction):
+        delete_listings_bulk(test_db, ids, user_id=buyer.id)
+    assert test_db.query(Listing).filter(Listing.is_sold.is_(True)).count() == 0
+
+    assert mark_sold_bulk(test_db, ids, user_id=seller.id) == 2
+    # already sold: nothing changes
+    assert mark_sold_bulk(test_db, ids) == 0
+    assert all(l.is_sold for l in test_db.query(Listing))
+
+
+def test_bulk_ids_line_up_after_deletes(test_db, users):
+    seller, _ = users
+    first = create_listings_bulk(test_db, _rows(seller, 3))
+    delete_listings_bulk(test_db, [first[2]])
+    ids = create_listings_bulk(test_db, [dict(r, title=f"Desk {i}") for i, r in enumerate(_rows(seller, 3))])
+    for i, listing_id in enumerate(ids):
+        listing = test_db.get(Listing, listing_id)
+        assert listing.title == f"Desk {i}" and [img.url for img in listing.images] == [f"img/lamp_{i}.jpg"]
@@ -0,0 +1,241 @@
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.models.conversation import Conversation
+from app.models.listing import Listing
+from app.models.message import Message
+from app.models.user import User
+from app.crud.listings import delete_listings_bulk
+from app.crud.messages import (
+    PREVIEW_LENGTH, MessagePage, conversation_upsert, get_conversation_page, get_conversations, get_unread_message_count, mark_as_read,
+    mark_conversation_read, rebuild_conversations, send_message,
+)
+from app.schema import bootstrap_schema
+
+# --- Setup in-memory test database ---
+
+@pytest.fixture(scope="function")
+def engine():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def test_db(engine):
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def people(test_db):
+    seller = User(email="seller@charlotte.edu", hashed_password="x", display_name="Sam")
+    buyer = User(email="buyer@charlotte.edu", hashed_password="x", display_name="")
+    other = User(email="other@charlotte.edu", hashed_password="x", full_name="Olive Other")
+    test_db.add_all([seller, buyer, other]); test_db.commit()
+    lamp = Listing(user_id=seller.id, title="Desk Lamp", description="Bright", price=10.0)
+    chair = Listing(user_id=seller.id, title="Chair", description="Comfy", price=25.0)
+    test_db.add_all([lamp, chair]); test_db.commit()
+    return seller, buyer, other, lamp, chair
+
+
+def _rows(db):
+    return sorted(
+        (c.user_id, c.other_user_id, c.listing_id, c.last_message_id, c.last_message_preview,
+         c.last_sender_id, c.unread_count)
+        for c in db.scalars(select(Conversation))
+    )
+
+
+def test_send_message_maintains_both_sides(test_db, people):
+    seller, buyer, other, lamp, chair = people
+    first = send_message(test_db, buyer.id, seller.id, "Is the lamp available?", listing_id=lamp.id)
+    reply = send_message(test_db, seller.id, buyer.id, "Yes it is", listing_id=lamp.id)
+    send_message(test_db, buyer.id, seller.id, "Great, tomorrow?", listing_id=lamp.id)
+    latest = send_message(test_db, other.id, seller.id, "Chair?", listing_id=chair.id)
+
+    inbox = get_conversations(test_db, seller.id)
+    assert [(c.other_user_id, c.listing_id) for c in inbox] == [(other.id, chair.id), (buyer.id, lamp.id)]
+    assert (inbox[0].other_name, inbox[0].listing_title, inbox[0].preview) == ("Olive Other", "Chair", "Chair?")
+    assert inbox[0].last_message_at == test_db.get(Message, latest.id).created_at
+    # blank display names fall back to the email, as on the pages
+    assert inbox[1].other_name == "buyer@charlotte.edu"
+    assert [c.unread_count for c in inbox] == [1, 2]
+    assert get_unread_message_count(test_db, seller.id) == 3
+
+    [buyer_view] = get_conversations(test_db, buyer.id)
+    assert (buyer_view.other_name, buyer_view.unread_count, buyer_view.last_sender_id) == ("Sam", 1, buyer.id)
+
+    mark_as_read(test_db, first.id)
+    mark_as_read(test_db, first.id)  # already read: no double count
+    mark_as_read(test_db, reply.id)
+    assert [c.unread_count for c in get_conversations(test_db, seller.id)] == [1, 1]
+    assert get_conversations(test_db, buyer.id)[0].unread_count == 0
+
+
+def test_each_side_is_one_upsert(engine, test_db, people):
+    seller, buyer, *_ = people
+    send_message(test_db, buyer.id, seller.id, "Hi")
+    statements = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, stmt, params, ctx, many: statements.append(stmt))
+    send_message(test_db, buyer.id, seller.id, "Still there?")
+    writes = [stmt for stmt in statements if "conversations" in stmt.split("(")[0]]
+    assert len(writes) == 2 and all("ON CONFLICT" in stmt for stmt in writes)
+    assert [c.unread_count for c in get_conversations(test_db, seller.id)] == [2]
+
+
+def test_conversation_upsert_compiles_for_postgres(test_db, people):
+    seller, buyer, *_ = people
+    msg = send_message(test_db, buyer.id, seller.id, "Hi")
+    sql = str(conversation_upsert("postgresql", msg, seller.id, buyer.id, 1).compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (user_id, other_user_id, coalesce(listing_id, 0)) DO UPDATE" in sql
+
+
+def test_listing_and_no_listing_chats_are_separate(test_db, people):
+    seller, buyer, _, lamp, _ = people
+    send_message(test_db, buyer.id, seller.id, "About the lamp", listing_id=lamp.id)
+    send_message(test_db, buyer.id, seller.id, "Unrelated question")
+    send_message(test_db, buyer.id, seller.id, "Another one")
+
+    inbox = get_conversations(test_db, seller.id)
+    assert [(c.listing_id, c.listing_title, c.unread_count) for c in inbox] == [(None, None, 2), (lamp.id, "Desk Lamp", 1)]
+    assert test_db.query(Conversation).count() == 4
+
+
+def test_preview_is_truncated_and_self_messages_have_one_row(test_db, people):
+    seller = people[0]
+    send_message(test_db, seller.id, seller.id, "x" * 500)
+    [note] = get_conversations(test_db, seller.id)
+    assert (len(note.preview), note.unread_count) == (PREVIEW_LENGTH, 0)
+
+
+def test_rebuild_matches_incremental_rows(test_db, people):
+    seller, buyer, other, lamp, chair = people
+    msgs = [
+        send_message(test_db, buyer.id, seller.id, "one", listing_id=lamp.id),
+        send_message(test_db, seller.id, buyer.id, "two", listing_id=lamp.id),
+        send_message(test_db, other.id, seller.id, "three", listing_id=chair.id),
+        send_message(test_db, other.id, buyer.id, "four"),
+    ]
+    mark_as_read(test_db, msgs[0].id)
+    expected = _rows(test_db)
+
+    assert rebuild_conversations(test_db) == len(expected) == 6
+    test_db.expire_all()
+    assert _rows(test_db) == expected
+
+    # Only the named users' rows are rewritten
+    test_db.query(Conversation).update({Conversation.unread_count: 9})
+    test_db.commit()
+    assert rebuild_conversations(test_db, [seller.id]) == 2
+    test_db.expire_all()
+    assert {c.unread_count for c in test_db.scalars(select(Conversation).where(Conversation.user_id == seller.id))} == {0, 1}
+    assert get_conversations(test_db, buyer.id)[0].unread_count == 9
+
+
+def test_bulk_delete_merges_chats_into_no_listing_conversation(test_db, people):
+    seller, buyer, _, lamp, chair = people
+    send_message(test_db, buyer.id, seller.id, "lamp?", listing_id=lamp.id)
+    send_message(test_db, buyer.id, seller.id, "chair?", listing_id=chair.id)
+    send_message(test_db, buyer.id, seller.id, "hello")
+
+    delete_listings_bulk(test_db, [lamp.id, chair.id], user_id=seller.id)
+
+    [merged] = get_conversations(test_db, seller.id)
+    assert (merged.listing_id, merged.preview, merged.unread_count) == (None, "hello", 3)
+    assert get_conversations(test_db, buyer.id)[0].listing_id is None
+
+
+def test_bootstrap_backfills_conversations_for_existing_messages(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    legacy = [t for t in Base.metadata.sorted_tables if t.name != "conversations"]
+    Base.metadata.create_all(bind=engine, tables=legacy)
+    db = sessionmaker(bind=engine)()
+    a = User(email="a@charlotte.edu", hashed_password="x")
+    b = User(email="b@charlotte.edu", hashed_password="x")
+    db.add_all([a, b]); db.commit()
+    db.add_all([Message(sender_id=a.id, receiver_id=b.id, content="hi"),
+                Message(sender_id=b.id, receiver_id=a.id, content="hey", is_read=True)])
+    db.commit()
+
+    bootstrap_schema(engine)
+    assert [(c.other_user_id, c.preview, c.unread_count) for c in get_conversations(db, b.id)] == [(a.id, "hey", 1)]
+    db.close()
+    engine.dispose()
+
+
+def test_conversation_pages_walk_back_to_the_first_message(test_db, people):
+    seller, buyer, other, lamp, _ = people
+    sent = []
+    for i in range(7):
+        sender, receiver = (buyer, seller) if i % 2 == 0 else (seller, buyer)
+        sent.append(send_message(test_db, sender.id, receiver.id, f"lamp {i}", listing_id=lamp.id).id)
+    # same pair without the listing, and another user: neither shows up
+    send_message(test_db, buyer.id, seller.id, "no listing")
+    send_message(test_db, other.id, seller.id, "lamp?", listing_id=lamp.id)
+
+    page = get_conversation_page(test_db, seller.id, buyer.id, lamp.id, limit=3)
+    assert [m.id for m in page.items] == sent[4:]
+    seen = [m.id for m in page.items]
+    while page.next_before_id is not None:
+        page = get_conversation_page(test_db, seller.id, buyer.id, lamp.id, before_id=page.next_before_id, limit=3)
+        seen = [m.id for m in page.items] + seen
+    assert seen == sent
+
+    # the other side sees the same chat
+    assert [m.id for m in get_conversation_page(test_db, buyer.id, seller.id, lamp.id).items] == sent
+    assert [m.content for m in get_conversation_page(test_db, seller.id, buyer.id).items] == ["no listing"]
+
+
+def test_conversation_page_edge_cases(test_db, people):
+    seller = people[0]
+    notes = [send_message(test_db, seller.id, seller.id, f"note {i}").id for i in range(3)]
+    page = get_conversation_page(test_db, seller.id, seller.id, limit=3)
+    # a chat with yourself is one direction, not the same rows twice
+    assert ([m.id for m in page.items], page.next_before_id) == (notes, None)
+    assert get_conversation_page(test_db, seller.id, people[1].id) == MessagePage([], None)
+    with pytest.raises(ValueError, match="limit"):
+        get_conversation_page(test_db, seller.id, seller.id, limit=0)
+
+
+def test_mark_conversation_read_is_one_update_and_one_commit(engine, test_db, people):
+    seller, buyer, other, lamp, _ = people
+    sent = [send_message(test_db, buyer.id, seller.id, f"lamp {i}", listing_id=lamp.id).id for i in range(250)]
+    send_message(test_db, seller.id, buyer.id, "reply", listing_id=lamp.id)
+    send_message(test_db, buyer.id, seller.id, "no listing")
+    send_message(test_db, other.id, seller.id, "from someone else", listing_id=lamp.id)
+    late = send_message(test_db, buyer.id, seller.id, "arrived after opening", listing_id=lamp.id)
+
+    statements = []
+    def record(conn, cursor, statement, *args):
+        statements.append(statement.split()[0].upper())
+    seller_id, buyer_id, lamp_id = seller.id, buyer.id, lamp.id  # load before counting
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        assert mark_conversation_read(test_db, seller_id, buyer_id, lamp_id, up_to_id=sent[-1]) == 250
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert statements == ["UPDATE", "UPDATE"]
+
+    unread = {(c.other_user_id, c.listing_id): c.unread_count for c in get_conversations(test_db, seller.id)}
+    assert unread == {(buyer.id, lamp.id): 1, (buyer.id, None): 1, (other.id, lamp.id): 1}
+    assert test_db.get(Message, late.id).is_read is False
+    # the buyer's side and their unread reply are untouched
+    assert get_conversations(test_db, buyer.id)[0].unread_count == 1
+    assert mark_conversation_read(test_db, seller.id, buyer.id, lamp.id, up_to_id=sent[-1]) == 0
+
+    assert mark_conversation_read(test_db, seller.id, buyer.id, lamp.id, up_to_id=late.id) == 1
+    assert get_unread_message_count(test_db, seller.id) == 2
+
+
+def test_mark_conversation_read_with_yourself(test_db, people):
+    seller = people[0]
+    note = send_message(test_db, seller.id, seller.id, "note to self")
+    assert mark_conversation_read(test_db, seller.id, seller.id, None, up_to_id=note.id) == 1
+    assert get_conversations(test_db, seller.id)[0].unread_count == 0
@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import text
+
+from app.db import build_engine, sqlite_pragmas_from_env
+
+
+def test_default_profile():
+    assert sqlite_pragmas_from_env({}) == {
+        "synchronous": "NORMAL", "busy_timeout": 5000,
+        "cache_size": -20000, "mmap_size": 268435456, "temp_store": "MEMORY",
+    }
+
+
+def test_env_overrides_and_disables():
+    pragmas = sqlite_pragmas_from_env({"SQLITE_JOURNAL_MODE": "delete", "SQLITE_MMAP_SIZE": "",
+                                       "SQLITE_BUSY_TIMEOUT_MS": "250"})
+    assert pragmas["journal_mode"] == "DELETE"
+    assert pragmas["busy_timeout"] == 250
+    assert "mmap_size" not in pragmas
+
+
+@pytest.mark.parametrize("env", [{"SQLITE_SYNCHRONOUS": "sometimes"},
+                                 {"SQLITE_CACHE_SIZE": "big"},
+                                 {"SQLITE_TEMP_STORE": "MEMORY; DROP TABLE users"}])
+def test_invalid_values_are_rejected(env):
+    with pytest.raises(ValueError):
+        sqlite_pragmas_from_env(env)
+
+
+def test_default_profile_keeps_the_files_journal_mode(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'shared.db'}", sqlite_pragmas_from_env({}))
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+    engine.dispose()
+    assert not (tmp_path / "shared.db-wal").exists()
+
+
+def test_profile_applied_to_every_connection(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'profile.db'}",
+                          sqlite_pragmas_from_env({"SQLITE_JOURNAL_MODE": "wal"}))
+    for _ in range(2):
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+            assert conn.execute(text("PRAGMA temp_store")).scalar() == 2  # MEMORY
+        engine.dispose()
+
+
+def test_no_profile_keeps_sqlite_defaults(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'plain.db'}")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "delete"
@@ -0,0 +1,115 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.models.user import User
+from app.crud.feed import build_listing_cards
+from app.crud.favorites import add_favorite
+from app.crud.listings import cached_listing_read, create_listing, get_listings_page
+from app.crud.reviews import create_review, get_average_ratings
+
+# --- Setup in-memory test database ---
+
+@pytest.fixture(scope="function")
+def engine():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def test_db(engine):
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def people(test_db):
+    sellers = [User(email=f"seller{i}@charlotte.edu", hashed_password="x", full_name=f"Seller {i}")
+               for i in range(3)]
+    viewer = User(email="viewer@charlotte.edu", hashed_password="x", display_name="viewer")
+    test_db.add_all(sellers + [viewer]); test_db.commit()
+    return sellers, viewer
+
+
+def _seed(db, sellers, n):
+    return [
+        create_listing(db, title=f"Item {i}", description="desc", price=5.0 + i, image_urls=[f"{i}.jpg"],
+                       user_id=sellers[i % len(sellers)].id)
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def count_queries(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, stmt, params, ctx, many: statements.append(stmt))
+    return statements
+
+
+def test_card_fields(test_db, people):
+    sellers, viewer = people
+    listings = _seed(test_db, sellers, 3)
+    create_review(test_db, viewer.id, sellers[0].id, 4.0)
+    create_review(test_db, sellers[1].id, sellers[0].id, 5.0)
+    add_favorite(test_db, viewer.id, listings[1].id)
+
+    cards = build_listing_cards(test_db, listings, viewer_id=viewer.id)
+    assert [c.listing.id for c in cards] == [l.id for l in listings]
+    assert cards[0].owner_name == "Seller 0"
+    assert cards[0].owner_rating == 4.5
+    assert cards[1].owner_rating is None
+    assert [c.is_favorited for c in cards] == [False, True, False]
+    assert [img.url for img in cards[2].listing.images] == ["2.jpg"]
+
+
+def test_favorites_hidden_for_owner_and_anonymous(test_db, people):
+    sellers, _ = people
+    listings = _seed(test_db, sellers, 3)
+    assert {c.is_favorited for c in build_listing_cards(test_db, listings)} == {None}
+    own = build_listing_cards(test_db, listings, viewer_id=sellers[0].id)
+    assert [c.is_favorited for c in own] == [None, False, False]
+
+
+@pytest.mark.parametrize("n", [3, 12])
+def test_query_count_is_constant(test_db, people, count_queries, n):
+    sellers, viewer = people
+    _seed(test_db, sellers, n)
+    page = cached_listing_read(test_db, get_listings_page, limit=n)
+    viewer_id = viewer.id
+    count_queries.clear()
+    build_listing_cards(test_db, page.items, viewer_id=viewer_id)
+    # owners, ratings, favorites
+    assert len(count_queries) == 3
+
+
+def test_orm_rows_need_one_extra_query(test_db, people, count_queries):
+    sellers, viewer = people
+    _seed(test_db, sellers, 6)
+    rows = get_listings_page(test_db, limit=6).items
+    viewer_id = viewer.id
+    count_queries.clear()
+    cards = build_listing_cards(test_db, rows, viewer_id=viewer_id)
+    assert len(count_queries) == 4  # + images
+    assert all(len(c.listing.images) == 1 for c in cards)
+
+
+def test_missing_owner_falls_back(test_db, people):
+    sellers, _ = people
+    listing = _seed(test_db, sellers, 1)[0]
+    test_db.query(User).filter(User.id == sellers[0].id).delete()
+    test_db.commit()
+    card = build_listing_cards(test_db, [listing])[0]
+    assert not card.owner_exists
+    assert card.owner_name == f"User {sellers[0].id}"
+
+
+def test_average_ratings_batch(test_db, people):
+    sellers, viewer = people
+    create_review(test_db, viewer.id, sellers[2].id, 3.0)
+    assert get_average_ratings(test_db, [s.id for s in sellers]) == {sellers[2].id: 3.0}
+    assert get_average_ratings(test_db, []) == {}
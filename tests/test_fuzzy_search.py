@@ -0,0 +1,121 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.models.user import User
+from app.models.listing import Listing
+import app.crud.listings as listings_crud
+from app.crud.listings import (
+    create_listing, update_listing, delete_listing, search_listings, search_listings_page,
+    get_search_facets,
+)
+from app.fuzzy_index import FuzzyListingIndex, get_fuzzy_index
+
+# --- Setup in-memory test database ---
+
+@pytest.fixture(scope="function")
+def test_db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    TestingSessionLocal = sessionmaker(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    yield db
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def owner(test_db):
+    u = User(email="fuzzy_owner@charlotte.edu", hashed_password="x")
+    test_db.add(u); test_db.commit(); test_db.refresh(u)
+    return u
+
+
+def _make(db, owner, title, description="desc", price=10.0, **kw):
+    return create_listing(db, title=title, description=description, price=price,
+                          image_urls=[], user_id=owner.id, **kw)
+
+
+def test_misspelled_keyword_matches(test_db, owner):
+    _make(test_db, owner, "TI-84 Calculator", "Graphing calculator")
+    _make(test_db, owner, "Desk Chair", "Ergonomic")
+
+    assert search_listings(test_db, keyword="calculater") == []
+    results = search_listings(test_db, keyword="calculater", fuzzy=True)
+    assert [l.title for l in results] == ["TI-84 Calculator"]
+
+
+def test_threshold_is_honored(test_db, owner):
+    _make(test_db, owner, "Mini Fridge")
+    assert search_listings(test_db, keyword="frodge", fuzzy=True, threshold=80)
+    assert search_listings(test_db, keyword="frodge", fuzzy=True, threshold=95) == []
+
+
+def test_best_match_first_and_filters_apply(test_db, owner):
+    _make(test_db, owner, "Mountain Bike", price=150.0, category="Hobby")
+    _make(test_db, owner, "Bikes Rack", price=20.0, category="Other")
+    _make(test_db, owner, "Biker Jacket", price=60.0, category="Clothing")
+
+    results = search_listings(test_db, keyword="bike", fuzzy=True, threshold=70)
+    assert results[0].title == "Mountain Bike"
+    assert {l.title for l in results} == {"Mountain Bike", "Bikes Rack", "Biker Jacket"}
+
+    results = search_listings(test_db, keyword="bike", fuzzy=True, threshold=70, max_price=100.0,
+                              categories=["Clothing"])
+    assert [l.title for l in results] == ["Biker Jacket"]
+
+
+def test_filters_apply_before_the_candidate_cap(test_db, owner, monkeypatch):
+    monkeypatch.setattr(listings_crud, "FUZZY_CANDIDATE_LIMIT", 2)
+    for i in range(5):
+        _make(test_db, owner, "Bike", price=100.0 + i, category="Hobby")
+    _make(test_db, owner, "Biker Jacket", price=60.0, category="Clothing")
+    _make(test_db, owner, "Bikes Rack", price=20.0, category="Clothing")
+
+    # Five better scoring Hobby bikes come first in the index
+    params = dict(keyword="bike", fuzzy=True, threshold=70, categories=["Clothing"])
+    assert {l.title for l in search_listings(test_db, **params)} == {"Biker Jacket", "Bikes Rack"}
+    page = search_listings_page(test_db, limit=1, **params)
+    assert len(page.items) == 1 and page.next_cursor is not None
+    assert get_search_facets(test_db, **params)["total"] == 2
+
+    # The cap still bounds the result once the filters are applied
+    assert len(search_listings(test_db, keyword="bike", fuzzy=True, threshold=70)) == 2
+
+
+def test_index_refreshes_incrementally(test_db, owner):
+    first = _make(test_db, owner, "Xbox Series S")
+    index = get_fuzzy_index(test_db)
+    assert len(index) == 1
+
+    second = _make(test_db, owner, "Graphing Calculator")
+    assert get_fuzzy_index(test_db) is index
+    assert len(index) == 2
+    assert [l.id for l in search_listings(test_db, keyword="calculater", fuzzy=True)] == [second.id]
+
+    update_listing(test_db, first.id, title="Playstation 5")
+    assert search_listings(test_db, keyword="xbax", fuzzy=True) == []
+    assert [l.id for l in search_listings(test_db, keyword="playstatoin", fuzzy=True)] == [first.id]
+
+    delete_listing(test_db, second.id)
+    assert len(index) == 1
+    assert search_listings(test_db, keyword="calculater", fuzzy=True) == []
+
+
+def test_rolled_back_changes_are_not_indexed(test_db, owner):
+    get_fuzzy_index(test_db)
+    test_db.add(Listing(title="Phantom Item", description="x", price=1.0, user_id=owner.id))
+    test_db.flush()
+    test_db.rollback()
+    assert len(get_fuzzy_index(test_db)) == 0
+
+
+def test_index_reuses_freed_slots():
+    index = FuzzyListingIndex()
+    index.load([(1, "Road Bike", ""), (2, "Desk Lamp", "")])
+    index.remove(1)
+    index.upsert(3, "Laptop Stand", "")
+    assert [h[0] for h in index.search("laptap", threshold=75)] == [3]
+    assert 1 not in [h[0] for h in index.search("bike", threshold=0)]
+    assert len(index) == 2
@@ -0,0 +1,86 @@
+import os
+
+import pytest
+from PIL import Image as PILImage
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.models.user import User
+from app.crud.listings import create_listing, get_listing, update_listing
+from app.result_cache import snapshot_listings
+from app.storage import (
+    IMAGE_VARIANTS, StoredImage, generate_image_variants, image_variant_url,
+    remove_image_files, save_listing_image,
+)
+
+# --- Setup in-memory test database ---
+
+@pytest.fixture(scope="function")
+def test_db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(autouse=True)
+def upload_root(tmp_path, monkeypatch):
+    monkeypatch.setenv("UPLOADS_BASE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _jpeg_bytes(size=(2400, 1600), tmp=None):
+    path = tmp / "source.jpg"
+    PILImage.new("RGB", size, (0, 80, 53)).save(path, "JPEG")
+    return path.read_bytes()
+
+
+def test_save_writes_bounded_webp_variants(upload_root):
+    stored = save_listing_image(_jpeg_bytes(tmp=upload_root), "Fridge.JPG")
+    assert stored.url.startswith(str(upload_root / "listing_images")) and stored.url.endswith(".jpg")
+    for variant, size in IMAGE_VARIANTS.items():
+        path = getattr(stored, f"{variant}_url")
+        with PILImage.open(path) as img:
+            assert img.format == "WEBP"
+            assert max(img.size) == size
+            assert img.size[0] / img.size[1] == pytest.approx(1.5, rel=0.01)
+    assert os.path.getsize(stored.display_url) < os.path.getsize(stored.url)
+
+
+def test_small_images_are_not_upscaled(upload_root):
+    stored = save_listing_image(_jpeg_bytes((200, 100), upload_root), "tiny.jpg")
+    with PILImage.open(stored.display_url) as img:
+        assert img.size == (200, 100)
+
+
+def test_unreadable_upload_keeps_original_only(upload_root):
+    stored = save_listing_image(b"not an image", "broken.png")
+    assert stored == StoredImage(stored.url)
+    assert os.path.exists(stored.url)
+    assert image_variant_url(stored) == stored.url
+    assert sorted(os.listdir(upload_root / "listing_images")) == [os.path.basename(stored.url)]
+
+
+def test_listing_records_variants(test_db, upload_root):
+    user = User(email="seller@charlotte.edu", hashed_password="x")
+    test_db.add(user); test_db.commit()
+    stored = save_listing_image(_jpeg_bytes(tmp=upload_root), "desk.jpg")
+    listing = create_listing(test_db, title="Desk", description="d", price=10.0,
+                             image_urls=[stored, "legacy.jpg"], user_id=user.id)
+    update_listing(test_db, listing.id, add_images=[generate_image_variants(stored.url)])
+
+    images = get_listing(test_db, listing.id).images
+    assert image_variant_url(images[0]) == stored.display_url
+    assert image_variant_url(images[0], "thumbnail") == stored.thumbnail_url
+    assert image_variant_url(images[1]) == "legacy.jpg"
+    snapshot = snapshot_listings(test_db, [listing])[0]
+    assert [image_variant_url(i) for i in snapshot.images] == [i.display_url or i.url for i in images]
+
+
+def test_remove_image_files(upload_root):
+    stored = save_listing_image(_jpeg_bytes(tmp=upload_root), "lamp.jpg")
+    assert sorted(remove_image_files(stored)) == sorted(stored)
+    assert remove_image_files(stored) == []
@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.index_registry import IndexRegistry
+
+# --- Setup in-memory test database ---
+
+@pytest.fixture(scope="function")
+def test_db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _apply(index, changes):
+    for op, value in changes:
+        if op == "remove":
+            index.discard(value)
+        else:
+            index.add(value)
+
+
+def test_changes_committed_during_a_load_are_replayed(test_db):
+    def build(db):
+        loaded = {1, 2}
+        # Another session commits after the load read the table
+        registry.apply(db, [("add", 3), ("remove", 1)])
+        return loaded
+
+    registry = IndexRegistry(build, _apply)
+    assert registry.get(test_db) == {2, 3}
+
+    registry.apply(test_db, [("add", 4)])
+    assert registry.get(test_db) == {2, 3, 4}
+
+
+def test_expired_index_is_reloaded(test_db):
+    clock = FakeClock()
+    rows = {1}
+    registry = IndexRegistry(lambda db: set(rows), _apply, ttl=60.0, clock=clock)
+    first = registry.get(test_db)
+
+    # A write from another process never reaches this registry's hooks
+    rows.add(2)
+    clock.now = 30.0
+    assert registry.get(test_db) is first
+
+    clock.now = 61.0
+    assert registry.get(test_db) == {1, 2}
+
+
+def test_failed_load_is_not_published(test_db):
+    calls = []
+
+    def build(db):
+        calls.append(db)
+        if len(calls) == 1:
+            raise RuntimeError("database is locked")
+        return {1}
+
+    registry = IndexRegistry(build, _apply)
+    with pytest.raises(RuntimeError):
+        registry.get(test_db)
+    # Changes committed with no load in flight have nowhere to go
+    registry.apply(test_db, [("add", 2)])
+    assert registry.get(test_db) == {1}
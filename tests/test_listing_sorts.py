@@ -0,0 +1,100 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.models.user import User
+from app.crud.listings import (
+    create_listing, get_listings, get_listings_page, search_listings, search_listings_page,
+)
+
+# --- Setup in-memory test database ---
+
+@pytest.fixture(scope="function")
+def test_db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def listings(test_db):
+    owner = User(email="sort_owner@charlotte.edu", hashed_password="x")
+    test_db.add(owner); test_db.commit(); test_db.refresh(owner)
+    rows = [
+        ("Desk lamp", "Bright desk lamp", 15.0, "Furniture"),
+        ("Office chair", "Pairs well with a lamp", 40.0, "Furniture"),
+        ("Lamp shade", "Lamp shade for a floor lamp", 15.0, "Furniture"),
+        ("Physics textbook", "Hardcover", 60.0, "Books"),
+        ("Floor lamp", "Tall", 25.0, "Furniture"),
+    ]
+    return [
+        create_listing(test_db, title=t, description=d, price=p, category=c,
+                       image_urls=[], user_id=owner.id)
+        for t, d, p, c in rows
+    ]
+
+
+def _walk(fetch):
+    """Follow next_cursor until exhausted; return every listing in order."""
+    items, cursor = [], None
+    while True:
+        page = fetch(cursor)
+        items += page.items
+        if page.next_cursor is None:
+            return items
+        cursor = page.next_cursor
+
+
+def test_get_listings_sorts(test_db, listings):
+    ids = [l.id for l in listings]
+    assert [l.id for l in get_listings(test_db)] == ids[::-1]
+    assert [l.id for l in get_listings(test_db, sort="oldest")] == ids
+    # Equal prices fall back to id in the same direction
+    assert [l.price for l in get_listings(test_db, sort="price_asc")] == [15.0, 15.0, 25.0, 40.0, 60.0]
+    assert [l.title for l in get_listings(test_db, sort="price_desc")][:2] == ["Physics textbook", "Office chair"]
+
+
+def test_relevance_ranks_title_hits_first(test_db, listings):
+    titles = [l.title for l in search_listings(test_db, keyword="lamp")]
+    assert titles[-1] == "Office chair"  # only mentions lamp in the description
+    assert set(titles[:3]) == {"Desk lamp", "Lamp shade", "Floor lamp"}
+    # Without a keyword relevance means newest
+    assert [l.id for l in search_listings(test_db, categories=["Furniture"])] == \
+        [l.id for l in listings if l.category == "Furniture"][::-1]
+
+
+def test_search_with_price_sort(test_db, listings):
+    results = search_listings(test_db, keyword="lamp", sort="price_desc")
+    assert [l.price for l in results] == [40.0, 25.0, 15.0, 15.0]
+
+
+@pytest.mark.parametrize("sort", ["newest", "oldest", "price_asc", "price_desc"])
+def test_keyset_pages_match_full_sort(test_db, listings, sort):
+    paged = _walk(lambda c: get_listings_page(test_db, cursor=c, limit=2, sort=sort))
+    assert [l.id for l in paged] == [l.id for l in get_listings(test_db, sort=sort)]
+
+
+def test_relevance_pages(test_db, listings):
+    paged = _walk(lambda c: search_listings_page(test_db, keyword="lamp", cursor=c, limit=1))
+    assert [l.id for l in paged] == [l.id for l in search_listings(test_db, keyword="lamp")]
+
+
+def test_fuzzy_relevance_pages(test_db, listings):
+    paged = _walk(lambda c: search_listings_page(test_db, keyword="lmap", fuzzy=True, threshold=50,
+                                                 cursor=c, limit=2))
+    full = search_listings(test_db, keyword="lmap", fuzzy=True, threshold=50)
+    assert paged and [l.id for l in paged] == [l.id for l in full]
+
+
+def test_invalid_sort(test_db, listings):
+    with pytest.raises(ValueError):
+        get_listings(test_db, sort="cheapest")
+    with pytest.raises(ValueError):
+        search_listings(test_db, keyword="lamp", sort="random")
+    page = get_listings_page(test_db, limit=1, sort="price_asc")
+    with pytest.raises(ValueError):
+        get_listings_page(test_db, cursor=page.next_cursor, sort="price_desc")
@@ -0,0 +1,67 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app import backend
+from app.message_hub import RESYNC_EVENT, MessageHub, hub
+
+
+def _message(msg_id, sender_id=2, receiver_id=1):
+    return SimpleNamespace(id=msg_id, sender_id=sender_id, receiver_id=receiver_id, listing_id=None,
+                           content=f"message {msg_id}", created_at=datetime(2026, 1, 1), is_read=False)
+
+
+def test_publish_reaches_every_connection_of_the_user():
+    async def scenario():
+        local = MessageHub(queue_size=4)
+        first, second, other = local.subscribe(1), local.subscribe(1), local.subscribe(2)
+        assert local.publish(1, {"type": "unread", "unread_count": 3}) == 2
+        assert await first.get() == await second.get() == {"type": "unread", "unread_count": 3}
+        assert other.queue.empty()
+        assert local.publish(99, {"type": "unread", "unread_count": 1}) == 0
+
+        local.unsubscribe(first)
+        local.unsubscribe(first)  # twice is harmless
+        assert local.stats() == {"users": 2, "connections": 2, "published": 2, "dropped": 0}
+        local.unsubscribe(second)
+        assert not local.has_subscribers(1)
+    asyncio.run(scenario())
+
+
+def test_slow_reader_gets_a_resync_instead_of_an_unbounded_backlog():
+    async def scenario():
+        local = MessageHub(queue_size=3)
+        slow, fast = local.subscribe(1), local.subscribe(1)
+        for i in range(3):
+            local.publish(1, {"type": "unread", "unread_count": i})
+            await fast.get()
+        # the fourth event overflows only the reader that never drained its queue
+        assert local.publish(1, {"type": "unread", "unread_count": 3}) == 1
+        assert (slow.queue.qsize(), slow.overflows, local.dropped) == (1, 1, 1)
+        assert await slow.get() == RESYNC_EVENT
+        assert await fast.get() == {"type": "unread", "unread_count": 3}
+    asyncio.run(scenario())
+
+
+def test_event_stream_catches_up_then_pushes(monkeypatch):
+    monkeypatch.setattr(backend, "EVENTS_HEARTBEAT_SECONDS", 0.01)
+
+    async def scenario():
+        sub = hub.subscribe(1)
+        stream = backend._event_stream(sub, [_message(5)], last_id=4)
+        assert (await anext(stream)).startswith("event: message\nid: 5\ndata: {")
+        assert await anext(stream) == ": ping\n\n"
+
+        hub.publish(1, {"type": "message", "message": _message(5)})  # already sent in the catch-up
+        hub.publish(1, {"type": "message", "message": _message(6)})
+        hub.publish(1, {"type": "unread", "unread_count": 2})
+        hub.publish(1, RESYNC_EVENT)
+        assert '"content":"message 6"' in await anext(stream)
+        assert await anext(stream) == 'event: unread\ndata: {"unread_count":2}\n\n'
+        assert await anext(stream) == 'event: resync\ndata: {"last_seen_id":6}\n\n'
+
+        await stream.aclose()
+        assert not hub.has_subscribers(1)
+    asyncio.run(scenario())
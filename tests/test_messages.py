@@ -13,6 +13,8 @@ from app.crud.messages import (
     get_user_messages,
     mark_as_read,
     get_received_messages,
+    get_latest_message_id,
+    get_messages_since,
 )
 
 
@@ -112,3 +114,25 @@ def test_ordering_and_received_messages(db_session):
     received = get_received_messages(db_session, receiver.id)
     assert len(received) == 1
     assert received[0].sender.email == sender.email
+
+
+def test_messages_since_returns_only_newer_mail(db_session):
+    me = create_user(db_session, email="me@example.com")
+    friend = create_user(db_session, email="friend@example.com")
+    stranger = create_user(db_session, email="stranger@example.com")
+    assert get_latest_message_id(db_session, me.id) == 0
+
+    old = send_message(db_session, sender_id=friend.id, receiver_id=me.id, content="old")
+    last_seen = get_latest_message_id(db_session, me.id)
+    assert last_seen == old.id
+    assert get_messages_since(db_session, me.id, last_seen) == []
+
+    incoming = send_message(db_session, sender_id=friend.id, receiver_id=me.id, content="new")
+    send_message(db_session, sender_id=stranger.id, receiver_id=friend.id, content="not mine")
+    outgoing = send_message(db_session, sender_id=me.id, receiver_id=stranger.id, content="sent elsewhere")
+
+    assert [m.id for m in get_messages_since(db_session, me.id, last_seen)] == [incoming.id, outgoing.id]
+    assert [m.id for m in get_messages_since(db_session, me.id, last_seen, limit=1)] == [incoming.id]
+    assert get_latest_message_id(db_session, me.id) == outgoing.id
+    with pytest.raises(ValueError):
+        get_messages_since(db_session, me.id, last_seen, limit=0)
@@ -0,0 +1,109 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.models.user import User
+from app.crud.listings import (
+    create_listing, delete_listing, get_listings_page, search_listings_page,
+)
+
+# --- Setup in-memory test database ---
+
+@pytest.fixture(scope="function")
+def engine():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def test_db(engine):
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def listings(test_db):
+    owner = User(email="page_owner@charlotte.edu", hashed_password="x")
+    test_db.add(owner); test_db.commit(); test_db.refresh(owner)
+    created = []
+    for i in range(7):
+        created.append(create_listing(
+            test_db, title=f"Textbook {i}", description="Used", price=10.0 + i,
+            image_urls=[], user_id=owner.id, category="Books" if i % 2 == 0 else "Other",
+        ))
+    return created
+
+
+def _walk(fetch):
+    """Follow next_cursor until exhausted; return the list of pages."""
+    pages, cursor = [], None
+    while True:
+        page = fetch(cursor)
+        pages.append(page.items)
+        if page.next_cursor is None:
+            return pages
+        cursor = page.next_cursor
+
+
+def test_newest_pages_cover_everything_once(test_db, listings):
+    pages = _walk(lambda c: get_listings_page(test_db, cursor=c, limit=3))
+    assert [len(p) for p in pages] == [3, 3, 1]
+    ids = [l.id for p in pages for l in p]
+    assert ids == sorted((l.id for l in listings), reverse=True)
+
+
+def test_oldest_sort(test_db, listings):
+    page = get_listings_page(test_db, limit=2, sort="oldest")
+    assert [l.id for l in page.items] == [listings[0].id, listings[1].id]
+    assert page.next_cursor
+
+
+def test_exact_fit_has_no_next_cursor(test_db, listings):
+    page = get_listings_page(test_db, limit=7)
+    assert len(page.items) == 7
+    assert page.next_cursor is None
+
+
+def test_cursor_is_stable_when_rows_are_deleted(test_db, listings):
+    first = get_listings_page(test_db, limit=3)
+    # Deleting something already shown must not shift the next page
+    delete_listing(test_db, first.items[0].id)
+    second = get_listings_page(test_db, cursor=first.next_cursor, limit=3)
+    assert [l.id for l in second.items] == [listings[3].id, listings[2].id, listings[1].id]
+
+
+def test_search_page_applies_filters_and_keyword(test_db, listings):
+    pages = _walk(lambda c: search_listings_page(test_db, keyword="textbook", categories=["Books"],
+                                                 cursor=c, limit=2))
+    titles = [l.title for p in pages for l in p]
+    assert titles == ["Textbook 6", "Textbook 4", "Textbook 2", "Textbook 0"]
+
+    assert search_listings_page(test_db, keyword="spaceship").items == []
+
+
+def test_page_query_seeks_instead_of_offset(engine, test_db, listings):
+    statements = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, stmt, params, ctx, many: statements.append((stmt, params)))
+    first = get_listings_page(test_db, limit=3)
+    get_listings_page(test_db, cursor=first.next_cursor, limit=3)
+    stmt, params = statements[-1]
+    assert "listings.id <" in stmt
+    # SQLite always renders "LIMIT ? OFFSET ?"; the offset must stay 0
+    assert params[-2:] == (4, 0)
+
+
+def test_invalid_arguments(test_db, listings):
+    with pytest.raises(ValueError):
+        get_listings_page(test_db, sort="random")
+    with pytest.raises(ValueError):
+        get_listings_page(test_db, limit=0)
+    with pytest.raises(ValueError):
+        get_listings_page(test_db, cursor="not-a-cursor")
+    newest = get_listings_page(test_db, limit=1)
+    with pytest.raises(ValueError):
+        get_listings_page(test_db, cursor=newest.next_cursor, sort="oldest")
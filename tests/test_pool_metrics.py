@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.db import build_engine, pool_options_from_env
+from app.pool_metrics import PoolMetrics, TimedQueuePool, get_pool_stats
+
+
+def test_default_pool_options():
+    assert pool_options_from_env({}) == {
+        "pool_size": 5, "max_overflow": 10, "pool_timeout": 30.0,
+        "pool_recycle": 1800, "pool_pre_ping": True,
+    }
+
+
+@pytest.mark.parametrize("env", [{"DB_POOL_SIZE": "many"}, {"DB_MAX_OVERFLOW": "-1"},
+                                 {"DB_POOL_PRE_PING": "maybe"}])
+def test_invalid_pool_options(env):
+    with pytest.raises(ValueError):
+        pool_options_from_env(env)
+
+
+def test_memory_sqlite_keeps_default_pool():
+    engine = build_engine("sqlite:///:memory:", pool_options=pool_options_from_env({}))
+    assert not isinstance(engine.pool, TimedQueuePool)
+    assert get_pool_stats(engine)["pool"] == type(engine.pool).__name__
+
+
+def test_checkouts_overflow_and_timeouts(tmp_path):
+    options = pool_options_from_env({"DB_POOL_SIZE": "1", "DB_MAX_OVERFLOW": "1", "DB_POOL_TIMEOUT": "0.05"})
+    engine = build_engine(f"sqlite:///{tmp_path / 'pool.db'}", pool_options=options)
+    first, second = engine.connect(), engine.connect()
+    stats = get_pool_stats(engine)
+    assert (stats["pool"], stats["size"], stats["checked_out"], stats["overflow"]) == ("TimedQueuePool", 1, 2, 1)
+
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+    first.close(); second.close()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    stats = get_pool_stats(engine)
+    assert (stats["checkouts"], stats["timeouts"], stats["checked_out"]) == (3, 1, 0)
+    assert sum(stats["wait_histogram"].values()) == 4
+    assert stats["wait_max_ms"] >= 50
+
+
+def test_metrics_survive_dispose(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'pool.db'}", pool_options=pool_options_from_env({}))
+    engine.connect().close()
+    engine.dispose()
+    engine.connect().close()
+    assert get_pool_stats(engine)["checkouts"] == 2
+
+
+def test_histogram_buckets():
+    metrics = PoolMetrics()
+    for seconds in (0.0005, 0.003, 0.003, 7.0):
+        metrics.record_wait(seconds)
+    histogram = metrics.snapshot()["wait_histogram"]
+    assert (histogram["<=1ms"], histogram["<=5ms"], histogram[">5000ms"]) == (1, 2, 1)
@@ -0,0 +1,76 @@
+import json
+import logging
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base, build_engine
+from app.models.user import User
+from app.crud.feed import build_listing_cards
+from app.crud.listings import create_listing, get_listing, get_listings_page
+from app.query_metrics import begin_request, current_profile, end_request, fingerprint, profile_request
+
+# --- Setup instrumented in-memory test database ---
+
+@pytest.fixture
+def test_db():
+    engine = build_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    seller = User(email="seller@charlotte.edu", hashed_password="x")
+    db.add(seller); db.commit()
+    for i in range(8):
+        create_listing(db, title=f"Item {i}", description="d", price=float(i), image_urls=[f"img{i}.jpg"],
+                       user_id=seller.id)
+    yield db
+    db.close()
+
+
+def test_fingerprint_normalizes_literals_and_in_lists():
+    a = fingerprint("SELECT * FROM listings WHERE id IN (?, ?, ?) AND price > 10 AND title = 'Lamp'")
+    b = fingerprint("SELECT *  FROM listings\n WHERE id IN (?, ?) AND price > 2.5 AND title = 'It''s'")
+    assert a == b == "SELECT * FROM listings WHERE id IN (?+) AND price > ? AND title = ?"
+
+
+def test_counts_statements_only_inside_a_profile(test_db):
+    get_listing(test_db, 1)
+    with profile_request("two lookups") as profile:
+        get_listing(test_db, 1)
+        get_listing(test_db, 2)
+    assert profile.count == 2 and len(profile.fingerprints) == 1
+    assert profile.total > 0 and profile.n_plus_one() == []
+    assert current_profile() is None
+
+
+def test_flags_n_plus_one(test_db):
+    ids = [l.id for l in get_listings_page(test_db, limit=8).items]
+    with profile_request("per-row lookups") as profile:
+        for listing_id in ids:
+            get_listing(test_db, listing_id)
+    [flagged] = profile.n_plus_one()
+    assert flagged["count"] == 8 and flagged["fingerprint"].startswith("SELECT listings.id")
+
+
+def test_listing_cards_have_no_n_plus_one(test_db):
+    listings = get_listings_page(test_db, limit=8).items
+    with profile_request("cards") as profile:
+        build_listing_cards(test_db, listings, viewer_id=1)
+    assert profile.n_plus_one(threshold=2) == []
+    assert profile.count <= 5
+
+
+def test_request_lifecycle_logs_a_json_line(test_db, caplog):
+    caplog.set_level(logging.INFO, logger="campus_market.sql")
+    first = begin_request("rerun 1")
+    get_listing(test_db, 1)
+    # a rerun cut short (st.stop / st.rerun) is closed by the next begin_request
+    second = begin_request("rerun 2")
+    assert current_profile() is second and first.elapsed is not None
+    for _ in range(5):
+        get_listing(test_db, 1)
+    assert end_request() is second and end_request() is None
+
+    logged = [json.loads(r.getMessage()) for r in caplog.records]
+    assert [(l["request"], l["queries"]) for l in logged] == [("rerun 1", 1), ("rerun 2", 5)]
+    assert caplog.records[1].levelno == logging.WARNING
+    assert logged[1]["n_plus_one"][0]["count"] == 5
@@ -0,0 +1,72 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from app.db import Base
+from scripts.check_query_plans import find_table_scans
+
+VERSIONS = Path(__file__).resolve().parent.parent / "migrations" / "versions"
+INDEX_MIGRATIONS = [
+    "3b7e9c41d2a8_add_query_indexes.py",
+    "8f2c6d0a91e4_add_category_price_index.py",
+    "d3a8f5c20e61_add_conversation_history_index.py",
+    "e6b1c9a47f23_add_message_polling_indexes.py",
+]
+
+
+@pytest.fixture(scope="function")
+def engine():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+
+
+def _migration_indexes():
+    indexes = []
+    for filename in INDEX_MIGRATIONS:
+        spec = importlib.util.spec_from_file_location(filename[:-3], VERSIONS / filename)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        indexes += module.INDEXES
+    return indexes
+
+
+def test_hot_queries_use_indexes(engine):
+    assert find_table_scans(engine) == {}
+
+
+def test_missing_index_is_reported(engine):
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_reviews_reviewed_user_id_created_at"))
+    failures = find_table_scans(engine)
+    assert failures == {
+        "reviews: get_reviews_for_user": ["SCAN reviews USING INDEX ix_reviews_reviewer_id_reviewed_user_id"],
+    }
+
+
+def test_missing_listing_index_is_reported(engine):
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_listings_price_id"))
+    assert set(find_table_scans(engine)) == {"home: cheapest first page", "home: priciest first next page"}
+
+
+def test_filtered_page_walking_the_primary_key_is_reported(engine):
+    # LIMIT alone does not make a scan cheap: a filtered page may walk
+    # every row looking for rare matches
+    with engine.begin() as conn:
+        for name in ("ix_listings_category_id", "ix_listings_condition_id", "ix_listings_price_id",
+                     "ix_listings_category_price_id"):
+            conn.execute(text(f"DROP INDEX {name}"))
+    failures = find_table_scans(engine)
+    assert failures["home: filtered search page"] == ["SCAN listings"]
+    assert "home: newest listings page" not in failures
+
+
+def test_migration_matches_model_indexes(engine):
+    insp = inspect(engine)
+    for name, table, columns in _migration_indexes():
+        model_indexes = {ix["name"]: ix["column_names"] for ix in insp.get_indexes(table)}
+        assert model_indexes.get(name) == columns, name
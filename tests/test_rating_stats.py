@@ -0,0 +1,126 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.models.user import User
+from app.models.user_rating_stats import UserRatingStats
+from app.crud.reviews import (
+    create_review, delete_review, get_average_ratings, get_user_average_rating,
+    rating_stats_upsert, rebuild_rating_stats, update_review,
+)
+
+# --- Setup in-memory test database ---
+
+@pytest.fixture(scope="function")
+def engine():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def test_db(engine):
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def users(test_db):
+    people = [User(email=f"user{i}@charlotte.edu", hashed_password="x") for i in range(3)]
+    test_db.add_all(people); test_db.commit()
+    return people
+
+
+def _stats(db, user):
+    db.expire_all()
+    stats = db.get(UserRatingStats, user.id)
+    return (stats.rating_sum, stats.rating_count) if stats else None
+
+
+def test_review_writes_keep_totals(test_db, users):
+    a, b, seller = users
+    first = create_review(test_db, a.id, seller.id, 4.0)
+    create_review(test_db, b.id, seller.id, 5.0)
+    assert _stats(test_db, seller) == (9.0, 2)
+    assert get_user_average_rating(test_db, seller.id) == 4.5
+
+    update_review(test_db, first.id, rating=2.0)
+    assert _stats(test_db, seller) == (7.0, 2)
+    update_review(test_db, first.id, comment="changed my mind")
+    assert _stats(test_db, seller) == (7.0, 2)
+
+    delete_review(test_db, first.id)
+    assert _stats(test_db, seller) == (5.0, 1)
+    assert get_user_average_rating(test_db, seller.id) == 5.0
+
+
+def test_last_review_deleted_means_no_rating(test_db, users):
+    a, _, seller = users
+    review = create_review(test_db, a.id, seller.id, 3.0)
+    delete_review(test_db, review.id)
+    assert get_user_average_rating(test_db, seller.id) is None
+    assert get_average_ratings(test_db, [seller.id]) == {}
+
+
+def test_missing_stats_row_is_summed_from_reviews(test_db, users):
+    a, b, seller = users
+    first = create_review(test_db, a.id, seller.id, 4.0)
+    create_review(test_db, b.id, seller.id, 5.0)
+    # Stats lost, e.g. a database from before user_rating_stats existed
+    test_db.query(UserRatingStats).delete()
+    test_db.commit()
+
+    update_review(test_db, first.id, rating=2.0)
+    assert _stats(test_db, seller) == (7.0, 2)
+    delete_review(test_db, first.id)
+    assert _stats(test_db, seller) == (5.0, 1)
+
+
+def test_stats_upsert_compiles_for_postgres():
+    sql = str(rating_stats_upsert("postgresql", 1, 4.0, 1).compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (user_id) DO UPDATE" in sql
+
+
+def test_invalid_update_leaves_totals_alone(test_db, users):
+    a, _, seller = users
+    review = create_review(test_db, a.id, seller.id, 3.0)
+    with pytest.raises(ValueError):
+        update_review(test_db, review.id, rating=9.0)
+    test_db.rollback()
+    assert _stats(test_db, seller) == (3.0, 1)
+
+
+def test_average_reads_do_not_touch_reviews(engine, test_db, users):
+    a, b, seller = users
+    create_review(test_db, a.id, seller.id, 4.0)
+    create_review(test_db, seller.id, b.id, 2.0)
+    ids = [a.id, b.id, seller.id]
+    statements = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, stmt, params, ctx, many: statements.append(stmt))
+    test_db.expire_all()
+    assert get_average_ratings(test_db, ids) == {seller.id: 4.0, b.id: 2.0}
+    assert get_user_average_rating(test_db, a.id) is None
+    assert not any("FROM reviews" in stmt for stmt in statements)
+
+
+def test_rebuild_fixes_drift(test_db, users):
+    a, b, seller = users
+    create_review(test_db, a.id, seller.id, 4.0)
+    create_review(test_db, seller.id, b.id, 2.0)
+    test_db.query(UserRatingStats).filter(UserRatingStats.user_id == seller.id).update(
+        {UserRatingStats.rating_sum: 40.0}
+    )
+    test_db.query(UserRatingStats).filter(UserRatingStats.user_id == b.id).delete()
+    test_db.add(UserRatingStats(user_id=a.id, rating_sum=5.0, rating_count=1))
+    test_db.commit()
+
+    assert rebuild_rating_stats(test_db) == 3
+    assert _stats(test_db, seller) == (4.0, 1)
+    assert _stats(test_db, b) == (2.0, 1)
+    assert _stats(test_db, a) == (0.0, 0)
+    assert rebuild_rating_stats(test_db) == 0
@@ -0,0 +1,77 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db import (
+    Base, ReadOnlySession, build_engine, build_read_engine, session_engine, sqlite_pragmas_from_env,
+)
+from app.models.user import User
+from app.crud.listings import cached_listing_read, create_listing, get_listings_page
+
+# --- Setup file-backed test database (read-only opens need a real file) ---
+
+@pytest.fixture
+def engines(tmp_path):
+    pragmas = sqlite_pragmas_from_env({})
+    write = build_engine(f"sqlite:///{tmp_path / 'market.db'}", pragmas)
+    Base.metadata.create_all(bind=write)
+    read = build_read_engine(write, sqlite_pragmas=pragmas)
+    yield write, read
+    read.dispose()
+    write.dispose()
+
+
+@pytest.fixture
+def sessions(engines):
+    write, read = engines
+    write_db = sessionmaker(bind=write, autoflush=False)()
+    read_db = sessionmaker(bind=read, class_=ReadOnlySession, autoflush=False, expire_on_commit=False)()
+    yield write_db, read_db
+    read_db.close()
+    write_db.close()
+
+
+def test_read_engine_is_read_only(engines):
+    write, read = engines
+    assert read is not write and "mode=ro" in str(read.url)
+    with read.connect() as conn:
+        assert conn.execute(text("PRAGMA query_only")).scalar() == 1
+        with pytest.raises(OperationalError):
+            conn.execute(text("INSERT INTO users (email, hashed_password) VALUES ('a', 'b')"))
+
+
+def test_reads_see_committed_writes(sessions):
+    write_db, read_db = sessions
+    seller = User(email="seller@charlotte.edu", hashed_password="x")
+    write_db.add(seller); write_db.commit()
+    create_listing(write_db, title="Lamp", description="d", price=5.0, image_urls=[], user_id=seller.id)
+    assert [l.title for l in get_listings_page(read_db, limit=5).items] == ["Lamp"]
+
+
+def test_read_session_refuses_to_flush(sessions):
+    _, read_db = sessions
+    read_db.add(User(email="sneaky@charlotte.edu", hashed_password="x"))
+    with pytest.raises(RuntimeError):
+        read_db.flush()
+
+
+def test_caches_are_shared_with_the_write_engine(engines, sessions):
+    write, _ = engines
+    write_db, read_db = sessions
+    assert session_engine(read_db) is write
+    seller = User(email="seller@charlotte.edu", hashed_password="x")
+    write_db.add(seller); write_db.commit()
+    assert cached_listing_read(read_db, get_listings_page, limit=5).items == []
+    create_listing(write_db, title="Desk", description="d", price=20.0, image_urls=[], user_id=seller.id)
+    # the write bumped the catalogue version the read side's cache checks
+    assert [l.title for l in cached_listing_read(read_db, get_listings_page, limit=5).items] == ["Desk"]
+
+
+def test_replica_url_and_memory_fallback(tmp_path):
+    write = build_engine("sqlite:///:memory:")
+    assert build_read_engine(write) is write
+    replica = build_read_engine(write, url=f"sqlite:///{tmp_path / 'replica.db'}")
+    assert session_engine(sessionmaker(bind=replica)()) is write
+    with replica.connect() as conn:
+        assert conn.execute(text("PRAGMA query_only")).scalar() == 1
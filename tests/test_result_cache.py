@@ -0,0 +1,148 @@
+import dataclasses
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.models.user import User
+from app.result_cache import ListingSnapshot, ResultCache, get_result_cache, make_cache_key
+from app.crud.listings import (
+    cached_listing_read, create_listing, delete_listing, get_listing, get_listings_page,
+    mark_listing_sold, search_listings, update_listing,
+)
+
+# --- Setup in-memory test database ---
+
+@pytest.fixture(scope="function")
+def engine():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def test_db(engine):
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def owner(test_db):
+    user = User(email="cache_owner@charlotte.edu", hashed_password="x")
+    test_db.add(user); test_db.commit(); test_db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def listing(test_db, owner):
+    return create_listing(test_db, title="Mini fridge", description="Dorm sized", price=60.0,
+                          image_urls=["a.jpg", "b.jpg"], user_id=owner.id, category="Other")
+
+
+@pytest.fixture
+def count_selects(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, stmt, params, ctx, many: statements.append(stmt))
+    return lambda: len([s for s in statements if s.lstrip().upper().startswith("SELECT")])
+
+
+def test_repeat_read_is_served_from_cache(test_db, listing, count_selects):
+    first = cached_listing_read(test_db, search_listings, keyword="fridge")
+    after_first = count_selects()
+    again = cached_listing_read(test_db, search_listings, keyword="  FRIDGE ")
+    assert again is first
+    assert count_selects() == after_first
+
+
+def test_results_are_detached_snapshots(test_db, listing):
+    page = cached_listing_read(test_db, get_listings_page, limit=5)
+    snap = page.items[0]
+    assert isinstance(snap, ListingSnapshot)
+    assert [img.url for img in snap.images] == ["a.jpg", "b.jpg"]
+    test_db.close()
+    # Still readable once the session that produced it is gone
+    assert snap.title == "Mini fridge"
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        snap.title = "changed"
+
+
+@pytest.mark.parametrize("write", ["update", "sold", "delete", "create", "orm_delete", "orm_image"])
+def test_listing_writes_invalidate(test_db, owner, listing, write):
+    before = cached_listing_read(test_db, get_listings_page, limit=5)
+    version = get_result_cache(test_db).version
+    if write == "update":
+        update_listing(test_db, listing.id, title="Big fridge")
+    elif write == "sold":
+        mark_listing_sold(test_db, listing.id, owner.id)
+    elif write == "delete":
+        delete_listing(test_db, listing.id)
+    elif write == "orm_delete":
+        # pages that delete through the session directly (profile, admin reports)
+        test_db.delete(listing)
+        test_db.commit()
+    elif write == "orm_image":
+        test_db.delete(listing.images[0])
+        test_db.commit()
+    else:
+        create_listing(test_db, title="Toaster", description="Works", price=5.0,
+                       image_urls=[], user_id=owner.id)
+    # One bump per write, from the session hook or the bulk statement
+    assert get_result_cache(test_db).version == version + 1
+    after = cached_listing_read(test_db, get_listings_page, limit=5)
+    assert after != before
+    fresh = get_listings_page(test_db, limit=5)
+    assert [(l.id, l.title, l.is_sold, len(l.images)) for l in after.items] == \
+        [(l.id, l.title, l.is_sold, len(l.images)) for l in fresh.items]
+
+
+def test_rolled_back_writes_keep_the_cache(test_db, listing):
+    before = cached_listing_read(test_db, get_listings_page, limit=5)
+    listing.title = "Never saved"
+    test_db.flush()
+    test_db.rollback()
+    assert cached_listing_read(test_db, get_listings_page, limit=5) is before
+
+
+def test_ttl_expiry_and_lru_bound():
+    now = [0.0]
+    cache = ResultCache(max_entries=2, ttl=10, clock=lambda: now[0])
+    calls = []
+
+    def compute(value):
+        return lambda: calls.append(value) or value
+
+    cache.get_or_compute("a", compute("a"))
+    cache.get_or_compute("b", compute("b"))
+    cache.get_or_compute("a", compute("a"))  # hit, "a" becomes most recent
+    cache.get_or_compute("c", compute("c"))  # evicts "b"
+    assert calls == ["a", "b", "c"]
+    cache.get_or_compute("b", compute("b"))
+    assert calls == ["a", "b", "c", "b"]
+    assert len(cache) == 2
+
+    now[0] = 11
+    cache.get_or_compute("c", compute("c"))
+    assert calls[-1] == "c" and cache.hits == 1
+
+
+def test_result_computed_across_a_write_is_not_stored():
+    cache = ResultCache()
+    cache.get_or_compute("k", lambda: cache.bump_version() or "stale")
+    assert len(cache) == 0
+
+
+def test_cache_key_normalization():
+    a = make_cache_key("search", {"keyword": " Desk  Lamp", "categories": ["Other", "Books"]})
+    b = make_cache_key("search", {"keyword": "desk lamp", "categories": ["Books", "Other"]})
+    assert a == b
+    assert make_cache_key("page", {"cursor": "AbC"}) != make_cache_key("page", {"cursor": "abc"})
+
+
+def test_only_listing_reads_are_cacheable(test_db, listing):
+    with pytest.raises(ValueError):
+        cached_listing_read(test_db, get_listing, listing_id=listing.id)
+    assert get_result_cache(test_db) is get_result_cache(test_db)
@@ -0,0 +1,170 @@
+import random
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.models.user import User
+from app.crud.listings import create_listing, delete_listing
+from app.crud.saved_searches import (
+    create_saved_search, delete_saved_search, get_saved_search_matches,
+    get_saved_searches, mark_saved_search_matches_read,
+)
+import app.saved_search_index as saved_search_index
+from app.models.saved_search import SavedSearch
+from app.saved_search_index import CompiledQuery, SavedSearchIndex, _words
+
+# --- Setup in-memory test database ---
+
+@pytest.fixture(scope="function")
+def engine():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def test_db(engine):
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def users(test_db):
+    buyer = User(email="buyer@charlotte.edu", hashed_password="x")
+    seller = User(email="seller@charlotte.edu", hashed_password="x")
+    test_db.add_all([buyer, seller]); test_db.commit()
+    return buyer, seller
+
+
+def _list(db, seller, title, price=20.0, condition="Good", category="Books", description="On campus"):
+    return create_listing(db, title=title, description=description, price=price, condition=condition,
+                          category=category, image_urls=[], user_id=seller.id)
+
+
+def _alert_titles(db, user):
+    return [m.listing.title for m in get_saved_search_matches(db, user.id)]
+
+
+def test_new_listing_alerts_matching_saved_searches(test_db, users):
+    buyer, seller = users
+    create_saved_search(test_db, buyer.id, keyword="calc textbook", max_price=50.0, categories=["Books"])
+    _list(test_db, seller, "Calculus Textbook", price=30.0)
+    _list(test_db, seller, "Calculus Textbook (hardcover)", price=80.0)     # too expensive
+    _list(test_db, seller, "Calculus Textbook", price=30.0, category="Other")  # wrong category
+    _list(test_db, seller, "Calculator", price=30.0)                          # missing "textbook"
+    assert _alert_titles(test_db, buyer) == ["Calculus Textbook"]
+
+
+def test_listing_and_its_alerts_commit_together(test_db, users):
+    buyer, seller = users
+    create_saved_search(test_db, buyer.id, keyword="lamp")
+    commits = []
+    event.listen(test_db, "after_commit", commits.append)
+    _list(test_db, seller, "Desk lamp")
+    assert len(commits) == 1
+    assert _alert_titles(test_db, buyer) == ["Desk lamp"]
+
+
+def test_filter_only_saved_searches(test_db, users):
+    buyer, seller = users
+    create_saved_search(test_db, buyer.id, conditions=["New"])
+    create_saved_search(test_db, buyer.id, min_price=100.0)
+    _list(test_db, seller, "Mini fridge", price=120.0, condition="Fair", category="Other")
+    _list(test_db, seller, "Mug", price=5.0, condition="New", category="Other")
+    _list(test_db, seller, "Poster", price=5.0, condition="Fair", category="Other")
+    assert sorted(_alert_titles(test_db, buyer)) == ["Mini fridge", "Mug"]
+
+
+def test_sellers_own_searches_are_skipped(test_db, users):
+    buyer, seller = users
+    create_saved_search(test_db, seller.id, keyword="lamp")
+    _list(test_db, seller, "Desk lamp")
+    assert get_saved_search_matches(test_db, seller.id) == []
+
+
+def test_deleted_search_stops_alerting(test_db, users):
+    buyer, seller = users
+    saved = create_saved_search(test_db, buyer.id, keyword="bike")
+    assert delete_saved_search(test_db, saved.id, seller.id) is False
+    assert delete_saved_search(test_db, saved.id, buyer.id) is True
+    _list(test_db, seller, "Road bike")
+    assert get_saved_search_matches(test_db, buyer.id) == []
+    assert get_saved_searches(test_db, buyer.id) == []
+
+
+def test_mark_read_and_deleted_listings(test_db, users):
+    buyer, seller = users
+    create_saved_search(test_db, buyer.id, keyword="chair")
+    first = _list(test_db, seller, "Office chair")
+    _list(test_db, seller, "Camping chair")
+    delete_listing(test_db, first.id)
+    assert _alert_titles(test_db, buyer) == ["Camping chair"]
+    # the deleted listing's alert went with it
+    assert mark_saved_search_matches_read(test_db, buyer.id) == 1
+    assert get_saved_search_matches(test_db, buyer.id) == []
+    assert len(get_saved_search_matches(test_db, buyer.id, unread_only=False)) == 1
+
+
+def test_expired_index_sees_searches_saved_elsewhere(engine, test_db, users, monkeypatch):
+    buyer, seller = users
+    _list(test_db, seller, "Warm up the index")
+    # Another process saves a search; this process's hooks never see it
+    with engine.begin() as conn:
+        conn.execute(SavedSearch.__table__.insert().values(user_id=buyer.id, keyword="kayak"))
+    _list(test_db, seller, "Kayak")
+    assert _alert_titles(test_db, buyer) == []
+
+    monkeypatch.setattr(saved_search_index._registry, "ttl", 0.0)
+    _list(test_db, seller, "Kayak paddle")
+    assert _alert_titles(test_db, buyer) == ["Kayak paddle"]
+
+
+def test_percolation_cost_does_not_grow_with_saved_searches(engine, test_db, users):
+    buyer, seller = users
+    for i in range(20):
+        create_saved_search(test_db, buyer.id, keyword=f"widget{i}")
+    selects = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, stmt, params, ctx, many: selects.append(stmt)
+                 if stmt.startswith("SELECT") and "saved_searches" in stmt else None)
+    _list(test_db, seller, "widget7 spare part")
+    assert len(selects) <= 1  # at most the one-off index load
+    assert _alert_titles(test_db, buyer) == ["widget7 spare part"]
+
+
+def test_invalid_saved_searches(test_db, users):
+    buyer, _ = users
+    with pytest.raises(ValueError):
+        create_saved_search(test_db, buyer.id)
+    with pytest.raises(ValueError):
+        create_saved_search(test_db, buyer.id, categories=["Cars"])
+    with pytest.raises(ValueError):
+        create_saved_search(test_db, buyer.id, min_price=50.0, max_price=10.0)
+
+
+def test_index_agrees_with_full_evaluation():
+    rng = random.Random(7)
+    vocab = ["lamp", "laptop", "desk", "calculator", "calculus", "bike", "book", "books"]
+    conditions, categories = ["New", "Good", "Fair"], ["Books", "Other"]
+    queries = []
+    for qid in range(300):
+        terms = tuple(sorted({w[:rng.randint(2, len(w))] for w in rng.sample(vocab, rng.randint(0, 2))}))
+        low = rng.choice([None, 10.0, 30.0])
+        queries.append(CompiledQuery(
+            qid, 1, terms, low, rng.choice([None, 50.0]),
+            rng.choice([None, frozenset(rng.sample(conditions, 2))]),
+            rng.choice([None, frozenset([rng.choice(categories)])]),
+        ))
+    index = SavedSearchIndex()
+    for q in queries:
+        index.add(q)
+    for _ in range(200):
+        title = " ".join(rng.sample(vocab, 2))
+        fields = (title, "", rng.choice([5.0, 20.0, 40.0, 70.0]), rng.choice(conditions), rng.choice(categories))
+        words = set(_words(title))
+        expected = {q.id for q in queries if q.matches(words, *fields[2:])}
+        assert {q.id for q in index.match(*fields)} == expected
@@ -0,0 +1,73 @@
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.orm import Session
+
+from app.db import Base
+from app.models.user_rating_stats import UserRatingStats
+from app.schema import bootstrap_schema, ensure_schema
+from app.search_index import FTS_TABLE
+
+
+def _file_engine(tmp_path, name="market.db"):
+    return create_engine(f"sqlite:///{tmp_path / name}", connect_args={"check_same_thread": False})
+
+
+def test_bootstrap_runs_once_per_process(tmp_path):
+    engine = _file_engine(tmp_path)
+    assert ensure_schema(engine) is True
+    tables = set(inspect(engine).get_table_names())
+    assert {"users", "listings", "images", "favorites", "messages", "reviews", FTS_TABLE} <= tables
+
+    statements = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, stmt, params, ctx, many: statements.append(stmt))
+    for _ in range(5):
+        assert ensure_schema(engine) is False
+    # a second engine on the same URL (e.g. after a code reload) is covered too
+    assert ensure_schema(_file_engine(tmp_path)) is False
+    assert statements == []
+
+
+def test_legacy_columns_are_added(tmp_path):
+    engine = _file_engine(tmp_path, "legacy.db")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE listings (id INTEGER PRIMARY KEY, title VARCHAR(100) NOT NULL, "
+                          "description TEXT, price FLOAT, user_id INTEGER, condition VARCHAR(20), "
+                          "is_sold BOOLEAN, created_at DATETIME, contact_email VARCHAR, contact_phone VARCHAR)"))
+        conn.execute(text("INSERT INTO listings (id, title, price) VALUES (1, 'Old lamp', 5.0)"))
+        conn.execute(text("CREATE TABLE images (id INTEGER PRIMARY KEY, url VARCHAR(255) NOT NULL, listing_id INTEGER)"))
+    ensure_schema(engine)
+    insp = inspect(engine)
+    assert "category" in {c["name"] for c in insp.get_columns("listings")}
+    assert {"thumbnail_url", "display_url"} <= {c["name"] for c in insp.get_columns("images")}
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT category FROM listings")).scalar() == "Other"
+
+
+def test_bootstrap_can_be_left_to_alembic(tmp_path, monkeypatch):
+    monkeypatch.setenv("SCHEMA_BOOTSTRAP", "off")
+    engine = _file_engine(tmp_path, "managed.db")
+    assert ensure_schema(engine) is True
+    assert inspect(engine).get_table_names() == []
+
+
+def test_existing_database_gets_new_indexes_and_rating_stats(tmp_path):
+    engine = _file_engine(tmp_path, "existing.db")
+    Base.metadata.create_all(bind=engine)
+    # an install from before the composite indexes and the rating totals
+    with engine.begin() as conn:
+        for table in ("messages", "listings"):
+            for index in inspect(conn).get_indexes(table):
+                conn.execute(text(f"DROP INDEX {index['name']}"))
+        conn.execute(text("DROP TABLE user_rating_stats"))
+        conn.execute(text("INSERT INTO users (id, email, hashed_password) VALUES (1, 'a@charlotte.edu', 'x'), "
+                          "(2, 'b@charlotte.edu', 'x')"))
+        conn.execute(text("INSERT INTO reviews (reviewer_id, reviewed_user_id, rating) VALUES (1, 2, 4.0), (1, 2, 5.0)"))
+
+    bootstrap_schema(engine)
+    insp = inspect(engine)
+    for table in ("messages", "listings"):
+        expected = {index.name for index in Base.metadata.tables[table].indexes}
+        assert expected <= {index["name"] for index in insp.get_indexes(table)}
+    with Session(bind=engine) as db:
+        [stats] = db.query(UserRatingStats).all()
+        assert (stats.user_id, stats.rating_sum, stats.rating_count) == (2, 9.0, 2)
@@ -0,0 +1,98 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.models.user import User
+from app.crud.listings import create_listing, get_search_facets, search_listings_page
+
+# --- Setup in-memory test database ---
+
+@pytest.fixture(scope="function")
+def engine():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def test_db(engine):
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def listings(test_db):
+    owner = User(email="facet_owner@charlotte.edu", hashed_password="x")
+    test_db.add(owner); test_db.commit(); test_db.refresh(owner)
+    rows = [
+        ("Calculus textbook", 20.0, "Good", "Books"),
+        ("Graphing calculator", 45.0, "Like New", "Electronics"),
+        ("Chemistry textbook", 80.0, "Good", "Books"),
+        ("Desk lamp", 15.0, "Fair", "Furniture"),
+        ("Standing desk", 600.0, "New", "Furniture"),
+    ]
+    return [
+        create_listing(test_db, title=t, description="Campus pickup", price=p,
+                       condition=c, category=cat, image_urls=[], user_id=owner.id)
+        for t, p, c, cat in rows
+    ]
+
+
+def _bucket_counts(facets):
+    return {b["label"]: b["count"] for b in facets["price_buckets"]}
+
+
+def test_unfiltered_counts(test_db, listings):
+    facets = get_search_facets(test_db)
+    assert facets["total"] == 5
+    assert facets["categories"]["Books"] == 2
+    assert facets["categories"]["Furniture"] == 2
+    assert facets["categories"]["Clothing"] == 0
+    assert facets["conditions"]["Good"] == 2
+    assert _bucket_counts(facets) == {
+        "Under $25": 2, "$25–$50": 1, "$50–$100": 1,
+        "$100–$250": 0, "$250–$500": 0, "$500+": 1,
+    }
+
+
+def test_each_facet_ignores_its_own_filter(test_db, listings):
+    facets = get_search_facets(test_db, categories=["Books"], conditions=["Good"], max_price=50.0)
+    assert facets["total"] == 1
+    # Categories: condition + price applied, category selection ignored
+    assert facets["categories"]["Books"] == 1
+    assert facets["categories"]["Electronics"] == 0
+    # Conditions: category + price applied, condition selection ignored
+    assert facets["conditions"] == {"New": 0, "Like New": 0, "Good": 1, "Fair": 0, "For Parts": 0}
+    # Price: category + condition applied, price range ignored
+    assert _bucket_counts(facets)["$50–$100"] == 1
+
+
+def test_keyword_narrows_every_facet(test_db, listings):
+    facets = get_search_facets(test_db, keyword="textbook")
+    assert facets["total"] == 2
+    assert facets["categories"]["Books"] == 2
+    assert facets["categories"]["Electronics"] == 0
+    assert get_search_facets(test_db, keyword="spaceship")["total"] == 0
+
+
+def test_fuzzy_keyword_counts(test_db, listings):
+    facets = get_search_facets(test_db, keyword="calculater", fuzzy=True)
+    assert facets["categories"]["Electronics"] == 1
+
+
+def test_facets_are_one_query(engine, test_db, listings):
+    statements = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, stmt, params, ctx, many: statements.append(stmt))
+    get_search_facets(test_db, categories=["Books"], min_price=10.0)
+    assert len([s for s in statements if "GROUP BY" in s]) == 1
+
+
+def test_page_carries_facets_on_request(test_db, listings):
+    assert search_listings_page(test_db, categories=["Books"], limit=1).facets is None
+    page = search_listings_page(test_db, categories=["Books"], limit=1, with_facets=True)
+    assert len(page.items) == 1
+    assert page.facets["total"] == 2
@@ -0,0 +1,142 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.models.user import User
+from app.crud.listings import create_listing, update_listing, delete_listing, search_listings
+from app.search_index import build_match_query, ensure_listing_fts, fts_available
+
+# --- Setup in-memory test database ---
+
+@pytest.fixture(scope="function")
+def test_db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    TestingSessionLocal = sessionmaker(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    yield db
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def owner(test_db):
+    u = User(email="fts_owner@charlotte.edu", hashed_password="x")
+    test_db.add(u); test_db.commit(); test_db.refresh(u)
+    return u
+
+
+def _make(db, owner, title, description, price=10.0, **kw):
+    return create_listing(db, title=title, description=description, price=price,
+                          image_urls=[], user_id=owner.id, **kw)
+
+
+def test_index_created_with_schema(test_db):
+    assert fts_available(test_db)
+
+
+def test_title_hits_rank_above_description_hits(test_db, owner):
+    _make(test_db, owner, "Desk Lamp", "Works great next to a calculator")
+    _make(test_db, owner, "TI-84 Calculator", "Graphing calculator for calculus")
+    results = search_listings(test_db, keyword="calculator")
+    assert [l.title for l in results] == ["TI-84 Calculator", "Desk Lamp"]
+
+
+def test_prefix_and_multiword_match(test_db, owner):
+    _make(test_db, owner, "Calculus Textbook", "Stewart 8th edition")
+    _make(test_db, owner, "Chemistry Textbook", "Lab manual included")
+    results = search_listings(test_db, keyword="calc text")
+    assert [l.title for l in results] == ["Calculus Textbook"]
+
+
+def test_index_follows_update_and_delete(test_db, owner):
+    listing = _make(test_db, owner, "Mini Fridge", "Clean, cold")
+    assert search_listings(test_db, keyword="fridge")
+
+    update_listing(test_db, listing.id, title="Microwave", description="800W")
+    assert search_listings(test_db, keyword="fridge") == []
+    assert [l.id for l in search_listings(test_db, keyword="microwave")] == [listing.id]
+
+    delete_listing(test_db, listing.id)
+    assert search_listings(test_db, keyword="microwave") == []
+
+
+def test_filters_apply_on_top_of_fts(test_db, owner):
+    _make(test_db, owner, "Road Bike", "Aluminum frame", price=300.0, condition="Good", category="Hobby")
+    _make(test_db, owner, "Kids Bike", "Training wheels", price=40.0, condition="Fair", category="Hobby")
+    _make(test_db, owner, "Bike Lock", "U-lock with keys", price=20.0, condition="New", category="Other")
+
+    results = search_listings(test_db, keyword="bike", max_price=100.0, categories=["Hobby"])
+    assert [l.title for l in results] == ["Kids Bike"]
+
+    results = search_listings(test_db, keyword="bike", conditions=["Good", "New"])
+    assert {l.title for l in results} == {"Road Bike", "Bike Lock"}
+
+
+def test_punctuation_is_not_fts_syntax(test_db, owner):
+    _make(test_db, owner, "TI-84 Calculator", "Graphing")
+    assert build_match_query('ti-84 "OR') == '"ti"* "84"* "or"*'
+    assert search_listings(test_db, keyword="TI-84")
+    # Nothing searchable left: fall back to substring matching instead of erroring
+    assert search_listings(test_db, keyword="!!!") == []
+
+
+def test_ensure_builds_index_for_existing_database():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        # Simulate a database created before the index existed
+        for name in ("listings_fts_ai", "listings_fts_ad", "listings_fts_au"):
+            conn.execute(text(f"DROP TRIGGER {name}"))
+        conn.execute(text("DROP TABLE listings_fts"))
+        conn.execute(text("INSERT INTO users (id, email, hashed_password) VALUES (1, 'a@charlotte.edu', 'x')"))
+        conn.execute(text(
+            "INSERT INTO listings (title, description, price, user_id) "
+            "VALUES ('Xbox Series S', 'One controller', 210, 1)"
+        ))
+
+    assert ensure_listing_fts(engine) is True
+    db = sessionmaker(bind=engine)()
+    try:
+        assert [l.title for l in search_listings(db, keyword="xbox")] == ["Xbox Series S"]
+    finally:
+        db.close()
+
+
+def _run_fts_migration(engine, step):
+    path = Path(__file__).resolve().parent.parent / "migrations" / "versions" / "f2d9b7c3a158_add_listings_fts.py"
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    with engine.begin() as conn, Operations.context(MigrationContext.configure(conn)):
+        getattr(module, step)()
+
+
+def test_migration_builds_index_for_alembic_managed_database():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    # SCHEMA_BOOTSTRAP=off: the index only exists if a migration creates it
+    _run_fts_migration(engine, "downgrade")
+    with engine.begin() as conn:
+        assert conn.execute(text("SELECT count(*) FROM sqlite_master WHERE name LIKE 'listings_fts%'")).scalar() == 0
+        conn.execute(text("INSERT INTO users (id, email, hashed_password) VALUES (1, 'a@charlotte.edu', 'x')"))
+        conn.execute(text(
+            "INSERT INTO listings (title, description, price, user_id) "
+            "VALUES ('Xbox Series S', 'One controller', 210, 1)"
+        ))
+
+    _run_fts_migration(engine, "upgrade")
+    db = sessionmaker(bind=engine)()
+    try:
+        assert [l.title for l in search_listings(db, keyword="xbox")] == ["Xbox Series S"]
+        # the triggers keep it current afterwards
+        _make(db, db.get(User, 1), "Nintendo Switch", "Two joycons")
+        assert [l.title for l in search_listings(db, keyword="switch")] == ["Nintendo Switch"]
+    finally:
+        db.close()